@@ -0,0 +1,127 @@
+"""Measures the throughput of each FrameSelector tier on a video clip.
+
+Usage: uv run python benchmarks/bench_frame_selector.py [video] [--frames N] [--stride N]
+
+Frames are decoded and cropped up-front so that only the selector is timed.
+The strided scan is then compared against a frame-by-frame scan, including
+decoding, on the same frames.
+"""
+import argparse
+import time
+
+import cv2
+from skimage.metrics import structural_similarity as ssim
+
+from glyphs.frame_selector import FrameSelector
+from glyphs.scan import scan
+from glyphs.video import Video, crop_subtitle
+
+DEFAULT_VIDEO = "test_clips/ep5_30s_to_60s.mkv"
+
+def load_frames(file: str, limit: int) -> list:
+    video = cv2.VideoCapture(file)
+    height = int(video.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    frames = []
+    while len(frames) < limit:
+        success, frame = video.read()
+        if not success:
+            break
+        frames.append(crop_subtitle(frame, height).copy())
+    video.release()
+    return frames
+
+def legacy_select(frames):
+    """The selector before the cascade: full SSIM map and two Canny passes on every frame."""
+    previous = None
+    for frame in frames:
+        frame = cv2.GaussianBlur(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+        if previous is not None:
+            ssim(frame, previous, full=True)
+            edges1 = cv2.Canny(frame, 50, 150)
+            edges2 = cv2.Canny(previous, 50, 150)
+            cv2.matchTemplate(edges1, edges2, cv2.TM_CCORR_NORMED)
+        previous = frame
+
+def tier(name):
+    """Runs one tier, including computing its inputs, on every consecutive pair of frames."""
+    def run(frames):
+        selector = FrameSelector()
+        previous = None
+        for frame in frames:
+            current = selector.features(frame)
+            if previous is not None:
+                if name == "thumbnail":
+                    cv2.norm(previous.thumbnail(None), current.thumbnail(None), cv2.NORM_INF)
+                elif name == "ssim":
+                    ssim(previous.blurred(None), current.blurred(None))
+                else:
+                    cv2.matchTemplate(current.edges(None), previous.edges(None), cv2.TM_CCORR_NORMED)
+            previous = current
+    return run
+
+def cascade_select(frames):
+    selector = FrameSelector()
+    selected = sum(selector.select(frame) for frame in frames)
+    return selector, selected
+
+class CountingVideo(Video):
+    """Counts the frames decoded through the iterator."""
+    decoded = 0
+
+    def __next__(self):
+        frame = super().__next__()
+        self.decoded += 1
+        return frame
+
+def measure_scan(file: str, frames: int, stride: int):
+    """Runs scan() with decoding, returning (seconds, decoded, comparisons, selected)."""
+    video = CountingVideo(file, 0, frames)
+    height = video.frame_height()
+    selector = FrameSelector()
+    start = time.perf_counter()
+    selected = sum(1 for _ in scan(video, selector, lambda f: crop_subtitle(f, height), stride))
+    seconds = time.perf_counter() - start
+    return seconds, video.decoded, sum(selector.tier_exits.values()), selected
+
+def measure(fn, frames) -> float:
+    start = time.perf_counter()
+    fn(frames)
+    return len(frames) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("video", nargs="?", default=DEFAULT_VIDEO)
+    parser.add_argument("--frames", type=int, default=1000, help="maximum number of frames to load")
+    parser.add_argument("--stride", type=int, default=8, help="stride compared against a frame-by-frame scan")
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames)
+    if len(frames) == 0:
+        raise Exception(f"cannot read frames from {args.video}")
+    print(f"{args.video}: {len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]}")
+
+    benchmarks = [
+        ("legacy select", legacy_select),
+        ("tier 1: thumbnail diff", tier("thumbnail")),
+        ("tier 2: scalar ssim", tier("ssim")),
+        ("tier 3: edge match", tier("edges")),
+        ("cascade select", lambda frames: cascade_select(frames)),
+    ]
+    for name, fn in benchmarks:
+        print(f"  {name:<24} {measure(fn, frames):>10.1f} frames/sec")
+
+    selector, selected = cascade_select(frames)
+    print(f"  selected {selected}/{len(frames)} frames")
+    for name, count in selector.tier_exits.most_common():
+        print(f"  decided by {name:<13} {count:>10} ({100 * count / len(frames):.1f}%)")
+
+    print("scan including decoding:")
+    for stride in [1, args.stride]:
+        seconds, decoded, comparisons, selected = measure_scan(args.video, len(frames), stride)
+        print(
+            f"  stride {stride:<3} {seconds:>7.2f}s {len(frames) / seconds:>8.1f} frames/sec "
+            f"decoded={decoded} comparisons={comparisons} selected={selected}"
+        )
+
+if __name__ == "__main__":
+    main()
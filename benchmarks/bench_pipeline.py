@@ -0,0 +1,235 @@
+"""Runs the full pipeline on a synthetic video with known subtitles.
+
+Usage: uv run python benchmarks/bench_pipeline.py [--seconds N] [--width W --height H]
+       [--subtitles-per-minute N] [--output results.json] [--compare baseline.json] [glyphs options]
+
+The video is rendered with OpenCV: a slowly scrolling texture with subtitles
+of random words drawn at the bottom, so the benchmark needs no copyrighted
+media and can be as long as needed. Videos are cached in --video-dir by their
+parameters, with their ground truth beside them.
+
+Reports the throughput, the OCR calls per subtitle (from the profile of the
+run), the peak RSS of the main process and of the largest worker, and how
+many cues came out with the right text and timing. The results are written
+as JSON, and --compare prints the change of each metric against an earlier
+result. Any option of `glyphs` can be given to benchmark it.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import resource
+import subprocess
+import tempfile
+import time
+
+import cv2
+import numpy as np
+import srt
+from nltk import edit_distance
+
+from glyphs.cli import Arguments, add_processing_arguments
+from glyphs.main import process_video, processing_options
+
+WORDS = (
+    "the a we you they it this that what where when why how not never always "
+    "come go see look know think want need take make give find tell ask work "
+    "home night morning road river city friend mother father brother sister "
+    "tonight tomorrow again together quickly really maybe sorry thanks please"
+).split()
+
+# Font scale and thickness of the subtitles in a 720 pixel high frame.
+FONT_SCALE = 1.2
+FONT_THICKNESS = 2
+
+def plan_cues(seconds: float, per_minute: float, rng: random.Random) -> list[dict]:
+    """Places subtitles of 2 to 7 random words, lasting 1 to 4 seconds, with
+    gaps so that there are about `per_minute` of them each minute."""
+    period = 60 / per_minute
+    cues = []
+    now = rng.uniform(0.2, period)
+    while True:
+        duration = min(rng.uniform(1, 4), 0.8 * period)
+        if now + duration > seconds:
+            return cues
+        words = [rng.choice(WORDS) for _ in range(rng.randint(2, 7))]
+        cues.append({"start": now, "end": now + duration, "text": " ".join(words)})
+        now += duration + max(0.2, rng.uniform(0.5, 1.5) * (period - duration))
+
+def render_cue(text: str, width: int, height: int) -> tuple:
+    """Draws `text` outlined and centered at the bottom of the frame, returning
+    the rows it covers, its pixels and the mask of the drawn pixels."""
+    scale = FONT_SCALE * height / 720
+    thickness = max(1, round(FONT_THICKNESS * height / 720))
+    (text_width, text_height), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_DUPLEX, scale, thickness)
+    x = max(0, (width - text_width) // 2)
+    bottom = height - height // 16
+    top = max(0, bottom - text_height - baseline - 4 * thickness)
+    overlay = np.zeros((bottom + 4 * thickness - top, width, 3), dtype=np.uint8)
+    origin = (x, overlay.shape[0] - baseline - 4 * thickness)
+    cv2.putText(overlay, text, origin, cv2.FONT_HERSHEY_DUPLEX, scale, (1, 1, 1), thickness + 4)  # Outline
+    cv2.putText(overlay, text, origin, cv2.FONT_HERSHEY_DUPLEX, scale, (255, 255, 255), thickness)
+    mask = overlay.any(axis=2, keepdims=True)
+    return top, overlay, mask
+
+def generate_video(path: str, seconds: float, width: int, height: int, fps: float, per_minute: float, motion: int, seed: int) -> list[dict]:
+    """Writes the synthetic video to `path` and returns its cues."""
+    rng = random.Random(seed)
+    cues = plan_cues(seconds, per_minute, rng)
+    frames = [(round(cue["start"] * fps), round(cue["end"] * fps)) for cue in cues]  # [first, stop)
+    for cue, (first, stop) in zip(cues, frames):  # The times at which the cue really shows
+        cue["start"], cue["end"] = first / fps, stop / fps
+    noise = np.random.default_rng(seed).integers(0, 160, (height // 16 + 1, width // 8 + 1, 3), dtype=np.uint8)
+    background = cv2.resize(noise, (width, height), interpolation=cv2.INTER_CUBIC)
+    background = np.concatenate([background, background], axis=1)  # Scrolls around
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    if not writer.isOpened():
+        raise Exception(f"cannot write video {path}")
+    cue, rendered = 0, None
+    for i in range(round(seconds * fps)):
+        while cue < len(cues) and frames[cue][1] <= i:
+            cue, rendered = cue + 1, None
+        offset = (i * motion) % width
+        frame = background[:, offset:offset + width].copy()
+        if cue < len(cues) and frames[cue][0] <= i:
+            if rendered is None:
+                rendered = render_cue(cues[cue]["text"], width, height)
+            top, overlay, mask = rendered
+            np.copyto(frame[top:top + overlay.shape[0]], overlay, where=mask)
+        writer.write(frame)
+    writer.release()
+    return cues
+
+def synthetic_video(args) -> tuple[str, list[dict]]:
+    """Returns the path and cues of the video for `args`, generating it
+    unless it is already in the cache."""
+    name = f"synthetic_{args.seconds:g}s_{args.width}x{args.height}_{args.fps:g}fps_{args.subtitles_per_minute:g}pm_{args.motion}px_{args.seed}"
+    path = os.path.join(args.video_dir, name + ".mp4")
+    truth_path = os.path.join(args.video_dir, name + ".json")
+    if os.path.exists(path) and os.path.exists(truth_path):
+        with open(truth_path) as f:
+            return path, json.load(f)
+    os.makedirs(args.video_dir, exist_ok=True)
+    start = time.perf_counter()
+    cues = generate_video(path, args.seconds, args.width, args.height, args.fps, args.subtitles_per_minute, args.motion, args.seed)
+    with open(truth_path, "w") as f:
+        json.dump(cues, f)
+    print(f"generated {path} in {time.perf_counter() - start:.1f}s")
+    return path, cues
+
+def normalize(text: str) -> str:
+    return re.sub(r"[^0-9a-z]", "", text.lower())
+
+def accuracy(truth: list[dict], output: list[srt.Subtitle]) -> dict:
+    """Matches each true cue to the output cue which overlaps it the most.
+
+    A cue is correct when the matched text is the same, ignoring case, spaces
+    and punctuation. The timing errors are those of the correct cues.
+    """
+    overlap = lambda cue, sub: min(cue["end"], sub.end.total_seconds()) - max(cue["start"], sub.start.total_seconds())
+    correct = set()
+    start_errors, end_errors = [], []
+    distance, length = 0, 0
+    for cue in truth:
+        best = max(output, key=lambda sub: overlap(cue, sub), default=None)
+        text = normalize(cue["text"])
+        length += len(text)
+        if best is None or overlap(cue, best) <= 0:
+            distance += len(text)
+            continue
+        distance += edit_distance(text, normalize(best.content))
+        if normalize(best.content) == text:
+            correct.add(best.index)
+            start_errors.append(abs(best.start.total_seconds() - cue["start"]))
+            end_errors.append(abs(best.end.total_seconds() - cue["end"]))
+    mean = lambda values: sum(values) / len(values) if values else None
+    return {
+        "cues": len(truth),
+        "output_cues": len(output),
+        "cue_recall": len(start_errors) / len(truth) if truth else None,
+        "cue_precision": len(correct) / len(output) if output else None,
+        "character_accuracy": 1 - distance / length if length else None,
+        "mean_start_error_seconds": mean(start_errors),
+        "mean_end_error_seconds": mean(end_errors),
+    }
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(baseline: dict, result: dict):
+    """Prints every numeric metric which is in both results."""
+    for section in ["performance", "accuracy"]:
+        for name, value in result[section].items():
+            old = baseline.get(section, {}).get(name)
+            if isinstance(value, (int, float)) and isinstance(old, (int, float)):
+                change = f"{100 * (value - old) / old:+.1f}%" if old else ""
+                print(f"  {name:<28} {old:>12.4g} -> {value:<12.4g} {change}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=120, help="length of the video (default: %(default)s)")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--fps", type=float, default=24)
+    parser.add_argument("--subtitles-per-minute", type=float, default=20)
+    parser.add_argument("--motion", type=int, default=0, help="pixels the background scrolls each frame, which makes frame selection harder (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--video-dir", default=os.path.join(tempfile.gettempdir(), "glyphs-bench"), help="cache of generated videos")
+    parser.add_argument("--output", default="bench_pipeline.json", help="file the results are written to")
+    parser.add_argument("--compare", default=None, help="earlier results to compare against")
+    add_processing_arguments(parser)
+    parser.set_defaults(lang="en")
+    args = parser.parse_args()
+
+    path, truth = synthetic_video(args)
+    options = processing_options(Arguments(files=[], **{field: getattr(args, field) for field in Arguments._fields[1:]}))
+    with tempfile.TemporaryDirectory() as profile_dir:
+        keep_profile = options["profile"] is not None
+        if not keep_profile:
+            options["profile"] = os.path.join(profile_dir, "run")
+        start = time.perf_counter()
+        output = process_video(path, **options)
+        seconds = time.perf_counter() - start
+        with open(options["profile"] + ".json") as f:
+            counters = json.load(f)["counters"]
+    if not keep_profile:
+        options["profile"] = None
+
+    subtitles = list(srt.parse(output))
+    kilobytes = 1024  # ru_maxrss is in kilobytes on Linux
+    result = {
+        "commit": git_commit(),
+        "video": {
+            "seconds": args.seconds, "width": args.width, "height": args.height, "fps": args.fps,
+            "subtitles_per_minute": args.subtitles_per_minute, "motion": args.motion, "seed": args.seed,
+        },
+        "options": options,
+        "cpus": os.cpu_count(),
+        "performance": {
+            "wall_seconds": seconds,
+            "video_seconds_per_second": args.seconds / seconds,
+            "frames_per_second": counters.get("frames_decoded", 0) / seconds,
+            "frames_selected": counters.get("frames_selected", 0),
+            "ocr_frames": counters.get("ocr_frames", 0),
+            "ocr_calls_per_subtitle": counters.get("ocr_frames", 0) / len(truth) if truth else None,
+            "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * kilobytes,
+            "peak_worker_rss_bytes": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * kilobytes,
+        },
+        "accuracy": accuracy(truth, subtitles),
+    }
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=1)
+    print(json.dumps({section: result[section] for section in ["performance", "accuracy"]}, indent=1))
+    print(f"results written to {args.output}")
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"compared with {args.compare}:")
+        compare(baseline, result)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Measures the TextGate against OCR on the frames a FrameSelector picks from a clip.
+
+Usage: uv run python benchmarks/tune_text_gate.py [video] [--frames N] [--lang LANG]
+
+Each selected frame is labelled by whether OCR finds any text in it. For a
+grid of gate settings this reports how many frames would skip OCR, and how
+many frames with text the gate would wrongly reject, which drops their
+subtitles. Pick the settings with no missed text and the most skips.
+"""
+import argparse
+import itertools
+import time
+
+import cv2
+
+from glyphs.frame_selector import FrameSelector
+from glyphs.ocr import OCR, OCRSettings
+from glyphs.text_gate import TextGate
+from glyphs.video import crop_subtitle
+
+DEFAULT_VIDEO = "test_clips/ep5_30s_to_60s.mkv"
+
+CONTRASTS = [40, 60, 80]
+STROKE_WIDTHS = [11, 15, 21]
+MIN_TEXT_WIDTHS = [0.5, 1, 2]
+
+def selected_frames(file: str, limit: int) -> list:
+    video = cv2.VideoCapture(file)
+    height = int(video.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    selector = FrameSelector()
+    frames = []
+    for _ in range(limit):
+        success, frame = video.read()
+        if not success:
+            break
+        frame = crop_subtitle(frame, height)
+        if selector.select(frame):
+            frames.append(frame.copy())
+    video.release()
+    return frames
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("video", nargs="?", default=DEFAULT_VIDEO)
+    parser.add_argument("--frames", type=int, default=10000, help="maximum number of frames to scan")
+    parser.add_argument("--lang", default="ch", help="language of the OCR model")
+    args = parser.parse_args()
+
+    frames = selected_frames(args.video, args.frames)
+    if len(frames) == 0:
+        raise Exception(f"cannot read frames from {args.video}")
+    labels = [len(results) > 0 for results in OCR(OCRSettings(lang=args.lang)).run_batch(frames)]
+    print(f"{args.video}: {len(frames)} selected frames, {labels.count(False)} without text")
+
+    print(f"  {'contrast':>8} {'stroke':>6} {'width':>5} {'skipped':>8} {'missed':>6} {'ms/frame':>8}")
+    for contrast, stroke_width, min_text_width in itertools.product(CONTRASTS, STROKE_WIDTHS, MIN_TEXT_WIDTHS):
+        gate = TextGate(contrast=contrast, stroke_width=stroke_width, min_text_width=min_text_width)
+        start = time.perf_counter()
+        passed = [gate.has_text(frame) for frame in frames]
+        elapsed = (time.perf_counter() - start) * 1000 / len(frames)
+        skipped = passed.count(False)
+        missed = sum(1 for text, p in zip(labels, passed) if text and not p)
+        print(f"  {contrast:>8} {stroke_width:>6} {min_text_width:>5} {skipped:>8} {missed:>6} {elapsed:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+from .cache import CacheManager, OCRCache, image_key, key_distance, text_region
@@ -0,0 +1,149 @@
+import cv2
+import numpy as np
+import pickle
+import sqlite3
+import threading
+
+from collections import OrderedDict
+from multiprocessing.managers import BaseManager
+
+# Size, in pixels, that text regions are resized to before hashing.
+HASH_HEIGHT = 32
+HASH_WIDTH = 256
+
+# Number of low-frequency DCT coefficients kept on each axis. Text lines are
+# much wider than they are tall, so more horizontal frequencies are kept.
+HASH_ROWS = 8
+HASH_COLUMNS = 32
+
+# Keys within this Hamming distance are considered the same text. Out of 255
+# bits; a single changed character is typically 40 or more bits away.
+MAX_KEY_DISTANCE = 24
+
+def text_region(image, box=None):
+    """Returns the (min_x, min_y, max_x, max_y) box of the text in `image`.
+
+    A known `box` is used as-is. Otherwise the region is the extent of the
+    rows and columns with a significant share of the Canny edges, which
+    trims the flat background around a subtitle. Returns None if there are
+    no edges at all.
+    """
+    if box is not None:
+        return tuple(int(v) for v in box)
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    edges = cv2.Canny(image, 50, 150) > 0
+    rows = edges.sum(axis=1)
+    columns = edges.sum(axis=0)
+    if rows.sum() == 0:
+        return None
+    ys = np.nonzero(rows >= 0.1 * rows.max())[0]
+    xs = np.nonzero(columns > 0)[0]
+    return int(xs[0]), int(ys[0]), int(xs[-1]) + 1, int(ys[-1]) + 1
+
+def image_key(image, region) -> bytes:
+    """Computes a 255-bit perceptual hash of the text inside `region`.
+
+    Only the text region is hashed, and it is binarized with Otsu's
+    threshold first, so the same text over a different background or with
+    compression noise hashes to nearby keys. Compare keys with `key_distance`.
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    min_x, min_y, max_x, max_y = region
+    _, mask = cv2.threshold(
+        image[min_y:max_y, min_x:max_x], 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU
+    )
+    resized = cv2.resize(mask, (HASH_WIDTH, HASH_HEIGHT), interpolation=cv2.INTER_AREA)
+    coefficients = cv2.dct(resized.astype(np.float32))[:HASH_ROWS, :HASH_COLUMNS].flatten()
+    coefficients = coefficients[1:]  # The DC term only measures the amount of text
+    bits = coefficients > np.median(coefficients)
+    return np.packbits(np.append(bits, False)).tobytes()
+
+def key_distance(a: bytes, b: bytes) -> int:
+    """Hamming distance between two keys from `image_key`."""
+    return int(np.unpackbits(np.frombuffer(a, np.uint8) ^ np.frombuffer(b, np.uint8)).sum())
+
+class OCRCache:
+    """A content-addressed cache of OCR results with LRU eviction.
+
+    Entries are keyed by `image_key` and a lookup matches any stored key
+    within `MAX_KEY_DISTANCE`. They live in a bounded in-memory LRU and, when
+    a `path` is given, in an SQLite database which persists across runs.
+    Worker processes share one instance through a CacheManager, which calls
+    it from several threads, so every method takes the lock. Values are
+    pickled on disk, so only open cache files you created.
+    """
+
+    def __init__(self, capacity: int, path: str | None = None, max_distance: int = MAX_KEY_DISTANCE):
+        self.__capacity = capacity
+        self.__max_distance = max_distance
+        self.__entries: OrderedDict[bytes, object] = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+        self.__database = None
+        self.__stored_keys: list[bytes] = []  # Keys in the database
+        if path is not None:
+            self.__database = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+            self.__database.execute("CREATE TABLE IF NOT EXISTS results (key BLOB PRIMARY KEY, results BLOB)")
+            self.__stored_keys = [row[0] for row in self.__database.execute("SELECT key FROM results")]
+
+    def __nearest(self, key: bytes, keys) -> bytes | None:
+        best, best_distance = None, self.__max_distance + 1
+        for candidate in keys:
+            distance = key_distance(key, candidate)
+            if distance < best_distance:
+                best, best_distance = candidate, distance
+        return best
+
+    def get(self, key: bytes):
+        with self.__lock:
+            results = None
+            match = self.__nearest(key, self.__entries)
+            if match is not None:
+                results = self.__entries[match]
+                self.__entries.move_to_end(match)
+            elif self.__database is not None:
+                match = self.__nearest(key, self.__stored_keys)
+                if match is not None:
+                    row = self.__database.execute("SELECT results FROM results WHERE key = ?", (match,)).fetchone()
+                    results = pickle.loads(row[0])
+                    self.__remember(match, results)
+            if results is None:
+                self.__misses += 1
+            else:
+                self.__hits += 1
+            return results
+
+    def put(self, key: bytes, results):
+        with self.__lock:
+            self.__remember(key, results)
+            if self.__database is not None:
+                self.__database.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?)",
+                    (key, pickle.dumps(results)),
+                )
+                self.__stored_keys.append(key)
+
+    def __remember(self, key: bytes, results):
+        self.__entries[key] = results
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.__capacity:
+            self.__entries.popitem(last=False)
+
+    def stats(self) -> tuple[int, int]:
+        """Returns the number of hits and misses."""
+        with self.__lock:
+            return self.__hits, self.__misses
+
+    def close(self):
+        with self.__lock:
+            if self.__database is not None:
+                self.__database.close()
+                self.__database = None
+
+class CacheManager(BaseManager):
+    """Serves a single OCRCache to every worker process."""
+
+CacheManager.register("OCRCache", OCRCache)
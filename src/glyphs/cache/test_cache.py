@@ -0,0 +1,98 @@
+import cv2
+import multiprocessing
+import numpy as np
+import pytest
+
+from .cache import CacheManager, OCRCache, MAX_KEY_DISTANCE, image_key, key_distance, text_region
+
+def make_band(text, background=30, noise=0, seed=0):
+    band = np.zeros((200, 1200, 3), dtype=np.uint8)
+    band[:] = np.linspace(background, background + 60, 1200, dtype=np.uint8)[None, :, None]
+    cv2.putText(band, text, (150, 120), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 0), 9)
+    cv2.putText(band, text, (150, 120), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 4)
+    if noise:
+        rng = np.random.default_rng(seed)
+        band = np.clip(band + rng.integers(-noise, noise, band.shape), 0, 255).astype(np.uint8)
+    return band
+
+def key(band):
+    return image_key(band, text_region(band))
+
+def test_text_region_trims_background():
+    min_x, min_y, max_x, max_y = text_region(make_band("hello world"))
+    assert 140 <= min_x <= 160 and max_x < 700
+    assert 60 <= min_y <= 85 and 120 <= max_y <= 140
+
+def test_text_region_without_text():
+    assert text_region(np.full((100, 100), 50, dtype=np.uint8)) is None
+
+@pytest.mark.parametrize("seed", range(5))
+def test_image_key_ignores_noise(seed):
+    distance = key_distance(key(make_band("hello world")), key(make_band("hello world", noise=8, seed=seed)))
+    assert distance <= MAX_KEY_DISTANCE
+
+def test_image_key_ignores_background():
+    distance = key_distance(key(make_band("hello world", background=20)), key(make_band("hello world", background=150)))
+    assert distance <= MAX_KEY_DISTANCE
+
+@pytest.mark.parametrize("other", ["hello worle", "hello there", "goodbye world", "I said yes"])
+def test_image_key_distinguishes_text(other):
+    assert key_distance(key(make_band("hello world")), key(make_band(other))) > MAX_KEY_DISTANCE
+
+def make_key(bits):
+    """A key with the first `bits` bits set."""
+    return np.packbits(np.arange(256) < bits).tobytes()
+
+def test_cache_matches_nearby_keys():
+    cache = OCRCache(capacity=4)
+    cache.put(make_key(0), "a")
+    assert cache.get(make_key(MAX_KEY_DISTANCE)) == "a"
+    assert cache.get(make_key(MAX_KEY_DISTANCE + 1)) is None
+    assert cache.stats() == (1, 1)
+
+def test_cache_evicts_least_recently_used():
+    cache = OCRCache(capacity=2, max_distance=0)
+    cache.put(make_key(1), "a")
+    cache.put(make_key(2), "b")
+    cache.get(make_key(1))
+    cache.put(make_key(3), "c")
+    assert cache.get(make_key(2)) is None
+    assert cache.get(make_key(1)) == "a"
+    assert cache.get(make_key(3)) == "c"
+
+def test_cache_persists_to_disk(tmp_path):
+    path = str(tmp_path / "ocr.sqlite")
+    cache = OCRCache(capacity=1, path=path, max_distance=0)
+    cache.put(make_key(1), "a")
+    cache.put(make_key(2), "b")  # Evicts "a" from memory
+    assert cache.get(make_key(1)) == "a"
+    cache.close()
+
+    cache = OCRCache(capacity=1, path=path, max_distance=0)
+    assert cache.get(make_key(2)) == "b"
+    cache.close()
+
+def use_cache(cache, worker, results):
+    cache.put(make_key(worker * 40), f"worker {worker}")
+    results.put(cache.get(make_key(worker * 40)))
+
+def test_cache_manager_shares_disk_cache_across_processes(tmp_path):
+    path = str(tmp_path / "ocr.sqlite")
+    with CacheManager() as manager:
+        cache = manager.OCRCache(4, path)
+        results = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(target=use_cache, args=(cache, worker, results))
+            for worker in range(3)
+        ]
+        for p in workers:
+            p.start()
+        for p in workers:
+            p.join(timeout=10)
+            assert p.exitcode == 0
+        assert sorted(results.get(timeout=1) for _ in workers) == ["worker 0", "worker 1", "worker 2"]
+        cache.close()
+
+    cache = OCRCache(capacity=4, path=path, max_distance=0)
+    assert cache.get(make_key(80)) == "worker 2"
+    cache.close()
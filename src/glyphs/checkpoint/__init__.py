@@ -0,0 +1 @@
+from .checkpoint import Checkpoints, file_digest
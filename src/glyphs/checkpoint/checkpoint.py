@@ -0,0 +1,57 @@
+import hashlib
+import json
+import os
+
+from glyphs.timestamp import timestamp
+
+# Bumped whenever the format or meaning of checkpoint files changes.
+CHECKPOINT_VERSION = 3
+
+def file_digest(file: str) -> str:
+    """SHA-256 of the content of `file`."""
+    with open(file, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+class Checkpoints:
+    """Persists the OCR results of completed frame ranges of a video.
+
+    Checkpoints live in a `<video>.glyphs` directory next to the video. Each
+    completed range is a JSON file named after a digest of the video content
+    and of the `settings` which affect the results, followed by the range, so
+    a changed video or different settings never reuse stale results.
+    """
+
+    def __init__(self, file: str, settings: dict):
+        self.directory = file + ".glyphs"
+        digest = hashlib.sha256(file_digest(file).encode())
+        digest.update(json.dumps([CHECKPOINT_VERSION, settings], sort_keys=True).encode())
+        self.key = digest.hexdigest()[:16]
+
+    def path(self, start: int, stop: int | None) -> str:
+        end = "end" if stop is None else stop  # The last range is read to the end of the video
+        return os.path.join(self.directory, f"{self.key}-{start}-{end}.json")
+
+    def load(self, start: int, stop: int | None) -> dict[int, tuple[timestamp, str, float]] | None:
+        """Returns {frame_number: (time, text, confidence)} for a completed range, or None."""
+        try:
+            with open(self.path(start, stop), encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return None
+        return {
+            frame_number: (timestamp(milliseconds=milliseconds), text, confidence)
+            for frame_number, milliseconds, text, confidence in entries
+        }
+
+    def save(self, start: int, stop: int | None, subs: dict[int, tuple[timestamp, str, float]]):
+        """Records a completed range. The file is replaced atomically, so a
+        killed process never leaves a partial checkpoint behind."""
+        os.makedirs(self.directory, exist_ok=True)
+        entries = [
+            [frame_number, time // timestamp(milliseconds=1), text, confidence]
+            for frame_number, (time, text, confidence) in sorted(subs.items())
+        ]
+        path = self.path(start, stop)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
@@ -0,0 +1,35 @@
+from glyphs.timestamp import timestamp
+
+from .checkpoint import Checkpoints
+
+def write_video(tmp_path, content=b"video"):
+    file = tmp_path / "clip.mkv"
+    file.write_bytes(content)
+    return str(file)
+
+def test_round_trip(tmp_path):
+    file = write_video(tmp_path)
+    subs = {3: (timestamp(milliseconds=120), "你好", 0.875), 1: (timestamp(seconds=0), "", 1.0)}
+    Checkpoints(file, {"stride": 1}).save(0, 10, subs)
+    assert Checkpoints(file, {"stride": 1}).load(0, 10) == subs
+
+def test_missing_range(tmp_path):
+    file = write_video(tmp_path)
+    checkpoints = Checkpoints(file, {"stride": 1})
+    checkpoints.save(0, 10, {})
+    assert checkpoints.load(0, 10) == {}
+    assert checkpoints.load(10, 20) is None
+    assert checkpoints.load(10, None) is None
+    checkpoints.save(10, None, {})
+    assert checkpoints.load(10, None) == {}
+
+def test_settings_change_key(tmp_path):
+    file = write_video(tmp_path)
+    Checkpoints(file, {"stride": 1}).save(0, 10, {})
+    assert Checkpoints(file, {"stride": 4}).load(0, 10) is None
+
+def test_content_changes_key(tmp_path):
+    file = write_video(tmp_path)
+    Checkpoints(file, {"stride": 1}).save(0, 10, {})
+    write_video(tmp_path, b"other video")
+    assert Checkpoints(file, {"stride": 1}).load(0, 10) is None
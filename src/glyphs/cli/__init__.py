@@ -1 +1,2 @@
-from .args import parse_arguments
+from .args import Arguments, RemergeArguments, ServeArguments, StreamArguments, SubmitArguments, add_processing_arguments, parse_arguments, parse_remerge_arguments, parse_serve_arguments, parse_stream_arguments, parse_submit_arguments
+from .main import main
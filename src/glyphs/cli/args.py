@@ -1,16 +1,214 @@
 import argparse
+import os
+import sys
 
 from collections import namedtuple
 
+from glyphs.server import default_socket_path
+
 Arguments = namedtuple('Arguments', [
     'files',  # Array of paths to video files
-    'verbose' # Boolean controlling output of verbose flags
+    'verbose', # Boolean controlling output of verbose flags
+    'stride', # Number of frames between decoded samples
+    'decoders', # Number of decoder processes, or None to share the CPUs with OCR
+    'ocr_workers', # Number of OCR processes, or None for one per two CPUs
+    'batch_size', # Maximum number of frames per OCR call
+    'batch_latency', # Milliseconds to wait for a batch to fill
+    'reuse_boxes', # Boolean enabling recognition-only OCR on known text boxes
+    'cache_size', # Number of OCR results kept in memory, or 0 to disable caching
+    'cache_file', # Path of the persistent OCR cache, or None
+    'checkpoint', # Boolean enabling per-chunk checkpoints and resuming from them
+    'chunk_size', # Approximate number of frames in each chunk handed to a decoder
+    'calibrate_roi', # Boolean enabling detection of the region of the frame with subtitles
+    'text_gate', # Boolean enabling the check for text before running OCR
+    'lang', # Language of the OCR model
+    'ocr_threads', # Number of threads used by each OCR process, or None for one
+    'preload', # Boolean enabling loading the OCR model once and forking the OCR processes
+    'profile', # Path prefix of the profile of the run, or None to disable profiling
+    'stall_timeout', # Seconds a worker may make no progress before it is replaced
+    'decode_backend', # "opencv" or "ffmpeg", the library which decodes the frames
+    'save_results', # Boolean enabling saving the OCR results of every frame for `glyphs remerge`
+], defaults=[1, None, None, 8, 50, False, 0, None, False, 250, False, False, "ch", None, False, None, 300, "opencv", True])
+
+ServeArguments = namedtuple('ServeArguments', [
+    'socket', # Path of the Unix socket to listen on
+    'processing', # Arguments used to process every submitted video, without files
+])
+
+SubmitArguments = namedtuple('SubmitArguments', [
+    'socket', # Path of the Unix socket of the server
+    'files', # Absolute paths of the video files to process
 ])
 
+RemergeArguments = namedtuple('RemergeArguments', [
+    'files', # Paths of the video files whose saved OCR results are merged again
+    'verbose', # Boolean controlling output of verbose flags
+], defaults=[False])
+
+StreamArguments = namedtuple('StreamArguments', [
+    'source', # Path or URL of the video stream, or "-" for stdin
+    'output', # Path of the subtitle file, or "-" for stdout
+    'format', # "srt" or "vtt", the format of the subtitles
+    'latency', # Seconds to wait for the OCR result of a frame before skipping it
+    'follow', # Boolean enabling reading a file which is still being written
+    'idle_timeout', # Seconds a followed file may stop growing before it is considered complete
+    'lang', # Language of the OCR model
+    'ocr_workers', # Number of OCR processes, or None for one per two CPUs
+    'ocr_threads', # Number of threads used by each OCR process, or None for one
+    'batch_size', # Maximum number of frames per OCR call
+    'batch_latency', # Milliseconds to wait for a batch to fill
+    'preload', # Boolean enabling loading the OCR model once and forking the OCR processes
+    'verbose', # Boolean controlling output of verbose flags
+], defaults=["-", "srt", 2.0, False, 10.0, "ch", None, None, 8, 50, False, False])
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive integer")
+    return number
+
+def non_negative_int(value: str) -> int:
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"{value} is not a non-negative integer")
+    return number
+
+def positive_float(value: str) -> float:
+    number = float(value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive number")
+    return number
+
+def add_processing_arguments(parser: argparse.ArgumentParser):
+    """Adds the options which control how videos are processed."""
+    parser.add_argument(
+        "--verbose",
+        help="Enable additional logs",
+        default=False,
+        action=argparse.BooleanOptionalAction  # Allows using --verbose for true and --no-verbose for false
+    )
+    parser.add_argument(
+        "--stride",
+        help="decode every Nth frame and bisect changes back to the exact frame (default: %(default)s)",
+        default=1,
+        type=positive_int,
+    )
+    parser.add_argument(
+        "--decoders",
+        help="number of processes decoding and selecting frames (default: the CPUs not used by OCR)",
+        default=None,
+        type=positive_int,
+    )
+    parser.add_argument(
+        "--ocr-workers",
+        help="number of processes running OCR (default: half of the CPUs divided by --ocr-threads)",
+        default=None,
+        type=positive_int,
+    )
+    parser.add_argument(
+        "--batch-size",
+        help="maximum number of frames sent to OCR together (default: %(default)s)",
+        default=8,
+        type=positive_int,
+    )
+    parser.add_argument(
+        "--batch-latency",
+        help="milliseconds to wait for a batch of frames to fill (default: %(default)s)",
+        default=50,
+        type=non_negative_int,
+    )
+    parser.add_argument(
+        "--reuse-boxes",
+        help="skip text detection when a frame changes inside the last known text box",
+        default=False,
+        action=argparse.BooleanOptionalAction
+    )
+    parser.add_argument(
+        "--cache-size",
+        help="number of OCR results cached in memory, or 0 to disable the cache (default: %(default)s)",
+        default=0,
+        type=non_negative_int,
+    )
+    parser.add_argument(
+        "--cache-file",
+        help="SQLite file which persists the OCR cache across runs (requires --cache-size)",
+        default=None,
+        type=str,
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help="save the results of each chunk next to the video and skip chunks saved by an earlier run",
+        default=False,
+        action=argparse.BooleanOptionalAction
+    )
+    parser.add_argument(
+        "--chunk-size",
+        help="approximate number of frames in each chunk of work handed to a decoder (default: %(default)s)",
+        default=250,
+        type=positive_int,
+    )
+    parser.add_argument(
+        "--calibrate-roi",
+        help="find the region of the frame with subtitles by running OCR on a sample of frames, instead of using the bottom of the frame",
+        default=False,
+        action=argparse.BooleanOptionalAction
+    )
+    parser.add_argument(
+        "--text-gate",
+        help="skip OCR on selected frames which a fast check finds no text in",
+        default=False,
+        action=argparse.BooleanOptionalAction
+    )
+    parser.add_argument(
+        "--lang",
+        help="language of the subtitles, as a PaddleOCR language code such as ch, en, japan or korean (default: %(default)s)",
+        default="ch",
+        type=str,
+    )
+    parser.add_argument(
+        "--ocr-threads",
+        help="number of threads used by the model in each OCR process (default: 1)",
+        default=None,
+        type=positive_int,
+    )
+    parser.add_argument(
+        "--preload",
+        help="load the OCR model once and fork the OCR processes from it, so they share its memory",
+        default=False,
+        action=argparse.BooleanOptionalAction
+    )
+    parser.add_argument(
+        "--profile",
+        help="time each stage of every process and write the totals to PREFIX.json and a Chrome trace to PREFIX.trace.json",
+        metavar="PREFIX",
+        default=None,
+        type=str,
+    )
+    parser.add_argument(
+        "--stall-timeout",
+        help="seconds a worker may run without making progress before it is replaced and its chunk retried (default: %(default)s)",
+        default=300,
+        type=positive_int,
+    )
+    parser.add_argument(
+        "--decode-backend",
+        help="decode with OpenCV, or with an ffmpeg process which crops the frames and converts them to grayscale itself (default: %(default)s)",
+        default="opencv",
+        choices=["opencv", "ffmpeg"],
+    )
+    parser.add_argument(
+        "--save-results",
+        help="save the OCR results of every frame to <video>.ocr.npz, so that `glyphs remerge` can rebuild the .srt file without OCR",
+        default=True,
+        action=argparse.BooleanOptionalAction
+    )
+
 def parse_arguments() -> Arguments:
     parser = argparse.ArgumentParser(
         prog='glyphs',
         description='A tool to extract hardcoded subtitles from videos.',
+        epilog='Run `glyphs serve` to keep the OCR model loaded between videos, and `glyphs submit` to send videos to it. '
+            'Run `glyphs remerge` to rebuild .srt files from saved OCR results.',
     )
     parser.add_argument(
         "files",
@@ -18,11 +216,151 @@ def parse_arguments() -> Arguments:
         nargs='+',  # Allow multiple file arguments
         type=str,
     )
+    add_processing_arguments(parser)
+    args = vars(parser.parse_args())
+    return Arguments(**{field: args[field] for field in Arguments._fields})
+
+def parse_serve_arguments() -> ServeArguments:
+    parser = argparse.ArgumentParser(
+        prog='glyphs serve',
+        description='Keeps the OCR model loaded and processes videos sent with `glyphs submit`, one at a time.',
+    )
+    parser.add_argument(
+        "--socket",
+        help="path of the Unix socket to listen on (default: %(default)s)",
+        default=default_socket_path(),
+        type=str,
+    )
+    add_processing_arguments(parser)
+    args = vars(parser.parse_args(sys.argv[2:]))
+    return ServeArguments(
+        args["socket"],
+        Arguments(files=[], **{field: args[field] for field in Arguments._fields[1:]}),
+    )
+
+def parse_submit_arguments() -> SubmitArguments:
+    parser = argparse.ArgumentParser(
+        prog='glyphs submit',
+        description='Sends videos to a `glyphs serve` process and shows their progress.',
+    )
+    parser.add_argument(
+        "files",
+        help="paths to video file(s)",
+        nargs='+',
+        type=str,
+    )
+    parser.add_argument(
+        "--socket",
+        help="path of the Unix socket of the server (default: %(default)s)",
+        default=default_socket_path(),
+        type=str,
+    )
+    args = vars(parser.parse_args(sys.argv[2:]))
+    return SubmitArguments(args["socket"], [os.path.abspath(file) for file in args["files"]])
+
+def parse_remerge_arguments() -> RemergeArguments:
+    parser = argparse.ArgumentParser(
+        prog='glyphs remerge',
+        description='Rebuilds the .srt file of videos from the OCR results saved next to them, without running OCR.',
+    )
+    parser.add_argument(
+        "files",
+        help="paths to video file(s)",
+        nargs='+',
+        type=str,
+    )
     parser.add_argument(
         "--verbose",
         help="Enable additional logs",
         default=False,
-        action=argparse.BooleanOptionalAction  # Allows using --verbose for true and --no-verbose for false
+        action=argparse.BooleanOptionalAction
     )
-    args = vars(parser.parse_args())
-    return Arguments(args["files"], args["verbose"])
+    args = vars(parser.parse_args(sys.argv[2:]))
+    return RemergeArguments(args["files"], args["verbose"])
+
+def parse_stream_arguments() -> StreamArguments:
+    parser = argparse.ArgumentParser(
+        prog='glyphs stream',
+        description='Extracts subtitles from a live video stream and writes each one as soon as it ends.',
+    )
+    parser.add_argument(
+        "source",
+        help="path or URL of the video stream, or - to read it from stdin",
+        type=str,
+    )
+    parser.add_argument(
+        "--output",
+        help="subtitle file to write, or - for stdout (default: %(default)s)",
+        default="-",
+        type=str,
+    )
+    parser.add_argument(
+        "--format",
+        help="format of the subtitles (default: vtt when --output ends with .vtt, otherwise srt)",
+        default=None,
+        choices=["srt", "vtt"],
+    )
+    parser.add_argument(
+        "--latency",
+        help="seconds to wait for the OCR of a frame before skipping it, which bounds how late subtitles are written (default: %(default)s)",
+        default=2.0,
+        type=positive_float,
+    )
+    parser.add_argument(
+        "--follow",
+        help="read a file which is still being written, until it stops growing",
+        default=False,
+        action=argparse.BooleanOptionalAction
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        help="seconds a followed file may stop growing before it is considered complete (default: %(default)s)",
+        default=10.0,
+        type=positive_float,
+    )
+    parser.add_argument(
+        "--lang",
+        help="language of the subtitles, as a PaddleOCR language code such as ch, en, japan or korean (default: %(default)s)",
+        default="ch",
+        type=str,
+    )
+    parser.add_argument(
+        "--ocr-workers",
+        help="number of processes running OCR (default: half of the CPUs divided by --ocr-threads)",
+        default=None,
+        type=positive_int,
+    )
+    parser.add_argument(
+        "--ocr-threads",
+        help="number of threads used by the model in each OCR process (default: 1)",
+        default=None,
+        type=positive_int,
+    )
+    parser.add_argument(
+        "--batch-size",
+        help="maximum number of frames sent to OCR together (default: %(default)s)",
+        default=8,
+        type=positive_int,
+    )
+    parser.add_argument(
+        "--batch-latency",
+        help="milliseconds to wait for a batch of frames to fill (default: %(default)s)",
+        default=50,
+        type=non_negative_int,
+    )
+    parser.add_argument(
+        "--preload",
+        help="load the OCR model once and fork the OCR processes from it, so they share its memory",
+        default=False,
+        action=argparse.BooleanOptionalAction
+    )
+    parser.add_argument(
+        "--verbose",
+        help="Enable additional logs",
+        default=False,
+        action=argparse.BooleanOptionalAction
+    )
+    args = vars(parser.parse_args(sys.argv[2:]))
+    if args["format"] is None:
+        args["format"] = "vtt" if args["output"].lower().endswith(".vtt") else "srt"
+    return StreamArguments(**args)
@@ -0,0 +1,38 @@
+import sys
+
+from glyphs.server import submit
+
+from .args import parse_arguments, parse_remerge_arguments, parse_serve_arguments, parse_stream_arguments, parse_submit_arguments
+
+def main():
+    """Runs a glyphs command.
+
+    The arguments are parsed before the pipeline, with OpenCV, numpy and the
+    OCR model, is imported, so that --help, mistakes in the arguments and
+    `glyphs submit` return at once.
+    """
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == "serve":
+        args = parse_serve_arguments()
+        from glyphs.main import serve
+        serve(args)
+        return
+    if command == "remerge":
+        args = parse_remerge_arguments()
+        from glyphs.main import remerge
+        remerge(args)
+        return
+    if command == "stream":
+        args = parse_stream_arguments()
+        from glyphs.main import stream
+        stream(args)
+        return
+    if command == "submit":
+        args = parse_submit_arguments()
+        if not submit(args.files, args.socket):
+            sys.exit(1)
+        return
+
+    args = parse_arguments()
+    from glyphs.main import extract
+    extract(args)
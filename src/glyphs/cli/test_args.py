@@ -1,9 +1,10 @@
 import pytest
+import os
 import sys
 import argparse
 
 from unittest.mock import patch
-from .args import Arguments, parse_arguments
+from .args import Arguments, RemergeArguments, ServeArguments, StreamArguments, parse_arguments, parse_remerge_arguments, parse_serve_arguments, parse_stream_arguments, parse_submit_arguments
 
 PROGRAM_NAME_ARGV0 = ["glyphs"]
 
@@ -12,6 +13,21 @@ cases = [
     (["/foo/bar", "/foo/baz"], [], Arguments(["/foo/bar", "/foo/baz"], False)), # Multiple files
     (["/foo/bar"], ["--no-verbose"], Arguments(["/foo/bar"], False)), # Explicit non-verbose
     (["/foo/bar"], ["--verbose"], Arguments(["/foo/bar"], True)), # Explicit verbose
+    (["/foo/bar"], ["--stride", "12"], Arguments(["/foo/bar"], False, 12)), # Strided scan
+    (["/foo/bar"], ["--decoders", "8", "--ocr-workers", "2"], Arguments(["/foo/bar"], False, 1, 8, 2)), # Stage sizes
+    (["/foo/bar"], ["--batch-size", "16", "--batch-latency", "200"], Arguments(["/foo/bar"], False, 1, None, None, 16, 200)), # OCR batching
+    (["/foo/bar"], ["--reuse-boxes"], Arguments(["/foo/bar"], False, 1, None, None, 8, 50, True)), # Recognition-only fast path
+    (["/foo/bar"], ["--cache-size", "512", "--cache-file", "/tmp/ocr.sqlite"], Arguments(["/foo/bar"], False, 1, None, None, 8, 50, False, 512, "/tmp/ocr.sqlite")), # OCR cache
+    (["/foo/bar"], ["--checkpoint"], Arguments(["/foo/bar"], False, 1, None, None, 8, 50, False, 0, None, True)), # Resumable processing
+    (["/foo/bar"], ["--chunk-size", "100"], Arguments(["/foo/bar"], False, 1, None, None, 8, 50, False, 0, None, False, 100)), # Work chunks
+    (["/foo/bar"], ["--calibrate-roi"], Arguments(["/foo/bar"], False, 1, None, None, 8, 50, False, 0, None, False, 250, True)), # Region of interest
+    (["/foo/bar"], ["--text-gate"], Arguments(["/foo/bar"], False, 1, None, None, 8, 50, False, 0, None, False, 250, False, True)), # Text presence gate
+    (["/foo/bar"], ["--lang", "en", "--ocr-threads", "2"], Arguments(["/foo/bar"], False, 1, None, None, 8, 50, False, 0, None, False, 250, False, False, "en", 2)), # OCR model
+    (["/foo/bar"], ["--preload"], Arguments(["/foo/bar"], False, 1, None, None, 8, 50, False, 0, None, False, 250, False, False, "ch", None, True)), # Shared OCR model
+    (["/foo/bar"], ["--profile", "/tmp/run"], Arguments(["/foo/bar"], False, 1, None, None, 8, 50, False, 0, None, False, 250, False, False, "ch", None, False, "/tmp/run")), # Stage profiling
+    (["/foo/bar"], ["--stall-timeout", "60"], Arguments(["/foo/bar"], False, 1, None, None, 8, 50, False, 0, None, False, 250, False, False, "ch", None, False, None, 60)), # Worker supervision
+    (["/foo/bar"], ["--decode-backend", "ffmpeg"], Arguments(["/foo/bar"], False, 1, None, None, 8, 50, False, 0, None, False, 250, False, False, "ch", None, False, None, 300, "ffmpeg")), # Decoding with ffmpeg
+    (["/foo/bar"], ["--no-save-results"], Arguments(["/foo/bar"], False, 1, None, None, 8, 50, False, 0, None, False, 250, False, False, "ch", None, False, None, 300, "opencv", False)), # OCR results sidecar
 ]
 
 @pytest.mark.parametrize("files,verbose,want", cases)
@@ -26,3 +42,49 @@ def test_parse_arguments_requires_file(mock_argv):
     with pytest.raises(SystemExit) as error:
         parse_arguments()
     assert error.value.code == 2  # Invalid CLI command code
+
+@pytest.mark.parametrize("stride", ["0", "-3", "two"])
+def test_parse_arguments_rejects_invalid_stride(stride):
+    test_args = PROGRAM_NAME_ARGV0 + ["/foo/bar", "--stride", stride]
+    with patch.object(sys, 'argv', test_args):
+        with pytest.raises(SystemExit) as error:
+            parse_arguments()
+    assert error.value.code == 2  # Invalid CLI command code
+
+@pytest.mark.parametrize("flag,value", [("--cache-size", "-1"), ("--batch-size", "0"), ("--batch-latency", "-5"), ("--chunk-size", "0"), ("--ocr-threads", "0")])
+def test_parse_arguments_rejects_invalid_sizes(flag, value):
+    test_args = PROGRAM_NAME_ARGV0 + ["/foo/bar", flag, value]
+    with patch.object(sys, 'argv', test_args):
+        with pytest.raises(SystemExit) as error:
+            parse_arguments()
+    assert error.value.code == 2  # Invalid CLI command code
+
+def test_parse_serve_arguments():
+    test_args = PROGRAM_NAME_ARGV0 + ["serve", "--socket", "/tmp/glyphs.sock", "--lang", "en", "--ocr-workers", "2"]
+    with patch.object(sys, 'argv', test_args):
+        assert parse_serve_arguments() == ServeArguments(
+            "/tmp/glyphs.sock",
+            Arguments([], False, 1, None, 2, 8, 50, False, 0, None, False, 250, False, False, "en"),
+        )
+
+def test_parse_submit_arguments_resolves_paths():
+    test_args = PROGRAM_NAME_ARGV0 + ["submit", "a.mp4", "/videos/b.mp4"]
+    with patch.object(sys, 'argv', test_args):
+        args = parse_submit_arguments()
+    assert args.files == [os.path.abspath("a.mp4"), "/videos/b.mp4"]
+
+def test_parse_remerge_arguments():
+    test_args = PROGRAM_NAME_ARGV0 + ["remerge", "a.mp4", "b.mp4", "--verbose"]
+    with patch.object(sys, 'argv', test_args):
+        assert parse_remerge_arguments() == RemergeArguments(["a.mp4", "b.mp4"], True)
+
+def test_parse_stream_arguments():
+    test_args = PROGRAM_NAME_ARGV0 + ["stream", "-", "--latency", "0.5", "--ocr-workers", "2"]
+    with patch.object(sys, 'argv', test_args):
+        assert parse_stream_arguments() == StreamArguments("-", latency=0.5, ocr_workers=2)
+
+def test_stream_format_follows_the_output_extension():
+    test_args = PROGRAM_NAME_ARGV0 + ["stream", "live.mkv", "--follow", "--output", "live.vtt"]
+    with patch.object(sys, 'argv', test_args):
+        args = parse_stream_arguments()
+    assert (args.format, args.follow) == ("vtt", True)
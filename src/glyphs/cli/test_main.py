@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+
+# Directory which holds the glyphs package
+SOURCE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Seconds the command line may take to import before any command runs. It
+# takes a few hundredths of a second, while the pipeline takes a few tenths.
+IMPORT_BUDGET = 0.25
+
+# Modules which take long to import, and which only some code paths need.
+HEAVY_MODULES = ["cv2", "nltk", "numpy", "paddleocr", "scipy", "skimage"]
+
+def import_times(module: str) -> dict[str, float]:
+    """Imports `module` in a new interpreter and returns the seconds each
+    module it imported took, including the modules it imported, from
+    `python -X importtime`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env={**os.environ, "PYTHONPATH": SOURCE_ROOT},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative) / 1_000_000
+    return times
+
+def test_command_line_imports_within_its_budget():
+    times = import_times("glyphs.cli")
+    assert [module for module in HEAVY_MODULES if module in times] == []
+    assert "glyphs.main" not in times
+    assert times["glyphs.cli"] < IMPORT_BUDGET
+
+def test_pipeline_imports_optional_modules_only_when_used():
+    times = import_times("glyphs.main")
+    assert [module for module in ["nltk", "paddleocr", "scipy", "skimage"] if module in times] == []
@@ -1,15 +1,95 @@
 import cv2
 
-from skimage.metrics import structural_similarity as ssim
+from collections import Counter
+
+# Names of the tiers in the FrameSelector cascade, cheapest first.
+THUMBNAIL = "thumbnail"
+SSIM = "ssim"
+EDGES = "edges"
+
+# Thumbnails used by the first tier are downscaled by this factor on each axis.
+THUMBNAIL_SCALE = 4
+
+# Cache key of the blurred crop in Features.
+BLURRED = "blurred"
+
+class Features:
+    """Per-frame data used by the FrameSelector cascade.
+
+    Each representation is computed lazily and cached for the current crop
+    region, so a frame which exits the cascade early never pays for the more
+    expensive tiers and a frame which becomes the reference for the next
+    comparison never computes them twice.
+    """
+
+    def __init__(self, gray):
+        self.gray = gray
+        self.__region = None
+        self.__cache = {}
+
+    def __cached(self, region, name, compute):
+        if region != self.__region:
+            self.__region = region
+            self.__cache = {}
+        if name not in self.__cache:
+            self.__cache[name] = compute()
+        return self.__cache[name]
+
+    def crop(self, region):
+        if region is None:
+            return self.gray
+        min_x, min_y, max_x, max_y = region
+        return self.gray[min_y:max_y, min_x:max_x]
+
+    def thumbnail(self, region):
+        def compute():
+            image = self.crop(region)
+            height, width = image.shape[:2]
+            size = (max(1, width // THUMBNAIL_SCALE), max(1, height // THUMBNAIL_SCALE))
+            return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        return self.__cached(region, THUMBNAIL, compute)
+
+    def blurred(self, region):
+        """The cropped frame with a Gaussian blur, used by the SSIM and edge tiers."""
+        compute = lambda: cv2.GaussianBlur(self.crop(region), (5, 5), 0)
+        return self.__cached(region, BLURRED, compute)
+
+    def edges(self, region):
+        compute = lambda: cv2.Canny(self.blurred(region), 50, 150)
+        return self.__cached(region, EDGES, compute)
 
 class FrameSelector:
-    """Applies heuristics to determine if OCR should be run for a frame."""
-    previous_frame = None
+    """Applies heuristics to determine if OCR should be run for a frame.
+
+    Frames are compared against a reference frame through a cascade of
+    increasingly expensive tiers, each of which may end the comparison:
+
+      1. Maximum absolute difference of downscaled thumbnails. Frames that
+         are (nearly) pixel-identical to the reference stop here. Each
+         thumbnail pixel averages a small block, so any changed glyph shows
+         up, while the averaging absorbs compression noise.
+      2. Scalar SSIM of the blurred region. Large changes stop here.
+      3. Normalized cross-correlation of the Canny edge maps.
+
+    The reference is the most recent frame which got past the first tier.
+    """
+    previous = None
     min_x = None
     min_y = None
     max_x = None
     max_y = None
-    observations = []
+
+    # TODO: This is a very sensitive parameter. The difference between 0.99 and 0.999 could mean missing lots of subs
+    def __init__(
+            self,
+            diff_threshold: float = 4,
+            ssim_threshold: float = 0.98,
+            edge_threshold: float = 0.98,
+        ):
+        self.diff_threshold = diff_threshold
+        self.ssim_threshold = ssim_threshold  # Higher = more sensitive
+        self.edge_threshold = edge_threshold  # Higher = more sensitive
+        self.tier_exits = Counter()  # Number of comparisons decided by each tier
 
     def add_filter(self, min_x, min_y, max_x, max_y):
         self.min_x = int(min_x)
@@ -23,38 +103,53 @@ class FrameSelector:
         self.max_x = None
         self.max_y = None
 
-    def _crop(self, image):
-        return image[
-            self.min_y : self.max_y,
-            self.min_x : self.max_x,
-        ]
+    def region(self):
+        if self.min_x is None:
+            return None
+        return self.min_x, self.min_y, self.max_x, self.max_y
 
-    def _preprocess(self, image):
-        """Applies filters to image to increase signal-to-noise ratio"""
-        gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        blurred_image = cv2.GaussianBlur(gray_image, (5, 5), 0)
-        return blurred_image
+    def features(self, frame) -> Features:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        return Features(gray)
 
-    # TODO: Add Python type to `frame`
-    # TODO: This is a very sensitive parameter. The difference between 0.99 and 0.999 could mean missing lots of subs
-    def select(self, frame) -> bool:
-        frame = self._preprocess(frame)
-        if self.previous_frame is None:
-            self.previous_frame = frame
-            return True
+    def compare(self, previous: Features, current: Features) -> tuple[str, bool]:
+        """Runs the cascade, returning the deciding tier and whether the frame changed."""
+        region = self.region()
+        difference = cv2.norm(previous.thumbnail(region), current.thumbnail(region), cv2.NORM_INF)
+        if difference <= self.diff_threshold:
+            return THUMBNAIL, False
+
+        from skimage.metrics import structural_similarity as ssim  # Imports scipy, which takes a while
+        ssim_score = ssim(previous.blurred(region), current.blurred(region))
+        if ssim_score < self.ssim_threshold:
+            return SSIM, True
 
-        # TODO: We can best-effort skip frames and backtrack if the OCR is not identical
-        ssim_score, _ = ssim(
-            self._crop(frame),
-            self._crop(self.previous_frame),
-            full=True
-        )
-        edges1 = cv2.Canny(self._crop(frame), 50, 150)
-        edges2 = cv2.Canny(self._crop(self.previous_frame), 50, 150)
+        # TODO: How do we combine these? Should we use ML to determine the thresholds?
         match_score = cv2.matchTemplate(
-            edges1, edges2, cv2.TM_CCORR_NORMED
+            current.edges(region), previous.edges(region), cv2.TM_CCORR_NORMED
         )[0][0]
+        return EDGES, match_score < self.edge_threshold
 
-        # TODO: How do we combine these? Should we use ML to determine the thresholds?
-        self.previous_frame = frame
-        return ssim_score < 0.98 or match_score < 0.98 # Higher = more sensitive
\ No newline at end of file
+    def changed(self, previous: Features, current: Features) -> bool:
+        """Compares two frames without updating the reference frame."""
+        tier, changed = self.compare(previous, current)
+        self.tier_exits[tier] += 1
+        return changed
+
+    # TODO: Add Python type to `frame`
+    def select(self, frame) -> bool:
+        return self.update(self.features(frame))
+
+    def update(self, current: Features) -> bool:
+        """Compares a frame against the reference frame and updates the reference."""
+        if self.previous is None:
+            self.previous = current
+            return True
+
+        tier, changed = self.compare(self.previous, current)
+        self.tier_exits[tier] += 1
+        # A near-identical frame keeps the old reference, whose cached tiers
+        # are reused by the next comparison.
+        if tier != THUMBNAIL:
+            self.previous = current
+        return changed
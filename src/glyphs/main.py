@@ -1,149 +1,1197 @@
 import cv2
-import functools
-import math
+import gc
+import io
 import multiprocessing
+import numpy as np
 import os
+import queue
+import sys
+import threading
 import time
-from dataclasses import dataclass
+import traceback
+from dataclasses import dataclass, field
 from datetime import timedelta
-from statistics import mean
 from tqdm import tqdm
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, TextIO, Tuple
 
 import glyphs.cli as cli
+from glyphs.cache import CacheManager, OCRCache
+from glyphs.checkpoint import Checkpoints
 from glyphs.frame_selector import FrameSelector
-from glyphs.ocr import Result, OCR
-from glyphs.subtitle import SubtitleGenerator
-from glyphs.video import Video, count_frames
+from glyphs.memory import MemoryUsage, memory_usage
+from glyphs.ocr import OCR, OCRSettings, Result, load_backend, translate
+from glyphs.pipeline import ChunkTiming, FilterFeedback, FrameRing, ReorderBuffer, Supervisor, Worker, WorkerStatus, collect_batch, latency_percentiles, plan_chunks
+from glyphs.profiler import NO_PROFILER, Profiler, ProfileReport, write_profile
+from glyphs.results import FrameResults, ResultsRecorder, bounding_box, load_results, merge_text, result_boxes
+from glyphs.scan import scan
+from glyphs.server import ProgressCallback, Server
+from glyphs.subtitle import SrtWriter, SubtitleGenerator, VttWriter
+from glyphs.text_gate import TextGate
+from glyphs.roi import Roi, calibrate, crop_roi, default_roi, expand_roi, search_band
+from glyphs.video import IDLE_TIMEOUT, FFmpegStream, FFmpegVideo, Video, VideoInfo, ffmpeg_available, keyframes, probe
 from glyphs.timestamp import timestamp
 
+# Number of ring slots per OCR worker, bounding the frames waiting for OCR.
+SLOTS_PER_OCR_WORKER = 4
+
+# Default number of frames in a chunk of work handed to a decoder.
+CHUNK_SIZE = 250
+
+# Number of frames sampled to calibrate the region of interest.
+CALIBRATION_SAMPLES = 24
+
+# Times a chunk is tried before its subtitles are given up on.
+MAX_CHUNK_ATTEMPTS = 3
+
+# Default seconds a worker may be busy without any progress before it is
+# considered stuck and replaced.
+STALL_TIMEOUT = 300
+
+# Default seconds a live stream waits for the OCR result of a frame.
+STREAM_LATENCY = 2
+
+# Frames of a live stream read ahead of frame selection.
+STREAM_BUFFER = 64
+
 @dataclass
 class Subtitle:
     time: timestamp
     text: str
+    confidence: float = 1.0  # Of the least confident OCR result in the text
+    results: list[Result] | None = None  # In frame coordinates, unless resumed from a checkpoint
 
 def merge_results(results: list[Result]) -> str:
     """Combines 'Result' containers, sorting by increasing average-x values for the bounding box. This is L-to-R reading order."""
-    make_tuples = lambda res: (res.text, mean(point.x for point in res.bounding_box))
-    sort_tuples = lambda tup: tup[1]
-    reduce_tuples = lambda sum, tup: sum + tup[0]
-    tuples = map(make_tuples, results)
-    tuples_sorted = sorted(tuples, key=sort_tuples)
-    return functools.reduce(reduce_tuples, tuples_sorted, "")
+    return merge_text([result.text for result in results], result_boxes(results))
+
+def merged_confidence(results: list[Result]) -> float:
+    """The text merged from several results is only as reliable as its least confident part."""
+    return min((r.confidence for r in results), default=1.0)
 
 def merged_bounding_box(results: list[Result]):
-    points = functools.reduce(lambda pts, res: pts + res.bounding_box, results, [])
-    min_x = functools.reduce(lambda m, pt: min(m, pt.x), points, math.inf)
-    min_y = functools.reduce(lambda m, pt: min(m, pt.y), points, math.inf)
-    max_x = functools.reduce(lambda m, pt: max(m, pt.x), points, -math.inf)
-    max_y = functools.reduce(lambda m, pt: max(m, pt.y), points, -math.inf)
-    return min_x, min_y, max_x, max_y
+    return bounding_box(result_boxes(results))
 
-def split_into_segments(length: int, num_segments: int) -> List[Tuple]:
-    """Splits the input (0, length) into N segments.
+@dataclass
+class Recognized:
+    """OCR results for a frame, sent from an OCR worker to the collector."""
+    video: int
+    decoder: int
+    chunk: int
+    attempt: int
+    frame_number: int
+    time: timestamp
+    roi: Roi  # Region of the frame which was cropped for OCR
+    results: list[Result]
 
-    This is used by the video parallelization code to determine the range for
-    which each executor is responsible.
+@dataclass
+class ChunkStarted:
+    """Sent by a decoder when it takes a chunk from the queue."""
+    video: int
+    chunk: int
+    attempt: int  # Chunks are retried when a worker fails on them
+    decoder: int
 
-    Example: split_into_segments(20, 2) -> [(0, 10), (10, 20)]
+@dataclass
+class ChunkDone:
+    """Sent by a decoder once all of the selected frames of a chunk are in the ring."""
+    timing: ChunkTiming
+    attempt: int
 
-    In order to deal with the overlap of indices, the executor should treat
-    the tuple as an closed-open range tuple: [0, 10), [10, 20). This is quite
-    natural since in the case of one-segment, the video scanner should read
-    frames in range [0, len(video)).
-    """
-    make_segments = lambda s: (length * s // num_segments, length * (s+1) // num_segments)
-    return list(map(make_segments, range(num_segments)))
+@dataclass
+class ChunkFailed:
+    """Sent by a decoder which raised an exception while decoding a chunk."""
+    video: int
+    chunk: int
+    attempt: int
+    decoder: int
+    error: str
 
-def crop_subtitle(image, height):
-    # TODO: These values can be dynamically updated by the OCR
-    return image[13*height//16:height, :]
+@dataclass
+class OCRFailed:
+    """Sent by an OCR worker which raised an exception while running OCR on a
+    batch, with the (video, chunk, attempt) of each frame in the batch."""
+    chunks: list[tuple[int, int, int]]
+    error: str
 
-def process_video_segment(
+@dataclass
+class OCRWorkerDone:
+    """Sent by an OCR worker once the decoders are finished."""
+    pid: int
+    ready_seconds: float  # Time taken to load the model
+    memory: MemoryUsage | None
+
+def decode_video_segment(
         file: str,
         start_idx: int,
-        stop_idx: int,
-        progress: multiprocessing.Value,
+        stop_idx: int | None,
+        video_index: int,
+        decoder: int,
+        chunk: int,
+        attempt: int,
+        roi: Roi,
+        ring: FrameRing,
+        feedback: FilterFeedback,
+        status: WorkerStatus,
         results_queue: multiprocessing.Queue,
-    ) -> Dict[int, Subtitle]:
-    video = Video(file, start_idx, stop_idx)
+        stride: int = 1,
+        reuse_boxes: bool = False,
+        text_gate: bool = False,
+        decode_backend: str = "opencv",
+        profiler: Profiler = NO_PROFILER,
+    ) -> Tuple[int, int]:
+    """Decodes a segment and hands the frames chosen by the FrameSelector to OCR.
+
+    Returns the number of selected frames, and how many of them were answered
+    without OCR because the TextGate found no text, which only happens with
+    `text_gate`. `stop_idx` is only a hint, and
+    None reads until the end of the video. The progress of `status` counts the
+    seconds of the segment decoded, from the frame timestamps. Only the `roi`
+    of each frame is compared and sent to OCR.
+
+    With the "ffmpeg" `decode_backend`, an ffmpeg process crops the frames
+    to the `roi` and converts them to grayscale, instead of OpenCV decoding
+    whole color frames which are cropped here.
+
+    `profiler` times the stages of each frame and counts the frames decoded,
+    selected and gated.
+
+    With `reuse_boxes`, a frame is sent with the text box of the previously
+    selected frame, once its single-line OCR result is known, so that OCR can
+    skip detection.
+
+    The selector's filter is the text box of the latest OCR result, which
+    arrives asynchronously through `feedback`, so which frames are selected
+    depends on how far OCR lags behind decoding. Feedback is only applied
+    between reads, never while an interval of a strided scan is bisected.
+
+    Consecutive segments overlap by one frame. A segment also scans the
+    first frame of the next one, and selects it only if the text changed on
+    it, while the next segment uses that frame as its reference instead of
+    always selecting it. A subtitle which spans the boundary is then neither
+    sent to OCR again nor split into two cues.
+    """
+    stop = None if stop_idx is None else stop_idx + 1
+    if decode_backend == "ffmpeg":
+        video = FFmpegVideo(file, start_idx, stop, roi=roi, gray=True, threads=1)
+        crop = lambda frame: frame
+    else:
+        video = Video(file, start_idx, stop)
+        crop = lambda frame: crop_roi(frame, roi)
     frame_selector = FrameSelector()
-    height = video.frame_height()
-    ocr = OCR()
-    sub_dict: Dict[int, Subtitle] = {}
-    for frame in video:
-        frame = crop_subtitle(frame, height)
-        if frame_selector.select(frame):
-            frame_results = ocr.run(frame)
-            sub_dict[video.frame_number()] = Subtitle(
-                time = video.time(),
-                text = merge_results(frame_results),
+    feedback.reset(start_idx, video_index)
+    fps = video.fps()
+    start_seconds = start_idx / fps if fps > 0 else 0
+    gate = TextGate() if text_gate else None
+    submitted = 0
+    gated = 0
+
+    def on_progress(frames: int):
+        profiler.count("frames_decoded", frames)
+        feedback.apply(frame_selector)
+        status.update(max(0, video.time().total_seconds() - start_seconds))
+
+    previous_frame_number = None
+    selections = scan(video, frame_selector, crop, stride, on_progress, continued=start_idx > 0, profiler=profiler)
+    for frame_number, time, frame in selections:
+        submitted += 1
+        if gate is not None:
+            with profiler.span("gate"):
+                has_text = gate.has_text(frame)
+            if not has_text:
+                results_queue.put(Recognized(video_index, decoder, chunk, attempt, frame_number, time, roi, []))
+                gated += 1
+                continue
+        box = None
+        if reuse_boxes and previous_frame_number is not None:
+            box = feedback.known_box(frame_selector, previous_frame_number)
+        with profiler.span("submit"), status.waiting():  # Includes waiting for a free ring slot
+            ring.put(frame, (video_index, decoder, chunk, attempt, frame_number, time, box, roi))
+        previous_frame_number = frame_number
+    profiler.count("frames_selected", submitted)
+    profiler.count("frames_gated", gated)
+    for tier, exits in frame_selector.tier_exits.items():
+        profiler.count(f"decided_by_{tier}", exits)
+    return submitted, gated
+
+def decode_chunks(
+        files: list[str],
+        decoder: int,
+        chunks: multiprocessing.Queue,
+        rois: list[multiprocessing.Array],
+        ring: FrameRing,
+        feedback: FilterFeedback,
+        status: WorkerStatus,
+        results_queue: multiprocessing.Queue,
+        stride: int = 1,
+        reuse_boxes: bool = False,
+        text_gate: bool = False,
+        decode_backend: str = "opencv",
+        profile_origin: float | None = None,
+    ):
+    """Decodes chunks of `files` from the shared queue until it hands out None.
+
+    Each chunk is cropped to the region of interest of its video, shared in
+    `rois`, when the chunk starts. OpenCV and ffmpeg run single-threaded, since the CPUs are already
+    divided between the decoder and OCR processes.
+
+    `status` shows the progress through the current chunk. A chunk which
+    raises is reported with ChunkFailed, and the decoder moves on to the
+    next one.
+
+    When `profile_origin` is given, the stages of the decoder are timed from
+    it and its ProfileReport is sent once the queue is empty.
+    """
+    cv2.setNumThreads(1)
+    profiler = Profiler(f"decoder {decoder}", profile_origin is not None, profile_origin)
+    while True:
+        with profiler.span("wait"), status.waiting():
+            item = chunks.get()
+        if item is None:
+            break
+        video_index, chunk, start, stop, attempt = item
+        results_queue.put(ChunkStarted(video_index, chunk, attempt, decoder))
+        began = time.perf_counter()
+        try:
+            submitted, gated = decode_video_segment(
+                files[video_index], start, stop, video_index, decoder, chunk, attempt, tuple(rois[video_index][:]),
+                ring, feedback, status, results_queue, stride, reuse_boxes, text_gate, decode_backend, profiler,
             )
-            if len(frame_results) == 0:
-                frame_selector.remove_filter()
-            else:
-                frame_selector.add_filter(
-                    *merged_bounding_box(frame_results)
+        except Exception:
+            results_queue.put(ChunkFailed(video_index, chunk, attempt, decoder, traceback.format_exc()))
+            continue
+        finally:
+            status.update(0, force=True)
+        seconds = time.perf_counter() - began
+        results_queue.put(ChunkDone(ChunkTiming(chunk, decoder, start, stop, submitted, seconds, gated, video_index), attempt))
+    if profiler.enabled:
+        results_queue.put(profiler.report)
+
+def recognize_frames(
+        ring: FrameRing,
+        results_queue: multiprocessing.Queue,
+        status: WorkerStatus,
+        batch_size: int = 1,
+        batch_latency: float = 0,
+        cache: OCRCache | None = None,
+        settings: OCRSettings = OCRSettings(),
+        profile_origin: float | None = None,
+    ):
+    """Runs OCR on batches of frames from the ring until the decoders are
+    finished, and then reports its model load time and memory.
+
+    `status` is updated after each batch. A batch which raises is reported
+    with OCRFailed, so that its chunks can be retried.
+
+    When `profile_origin` is given, the stages of the worker are timed from
+    it and its ProfileReport is sent before the OCRWorkerDone.
+    """
+    profiler = Profiler(f"ocr {os.getpid()}", profile_origin is not None, profile_origin)
+    began = time.perf_counter()
+    with profiler.span("load_model"):
+        ocr = OCR(settings, cache)
+    ready_seconds = time.perf_counter() - began
+    finished = False
+    while not finished:
+        with profiler.span("wait"), status.waiting():  # Includes reading the frames from the ring
+            batch, finished = collect_batch(ring, batch_size, batch_latency)
+        if len(batch) == 0:
+            continue
+        frames = [frame for frame, _ in batch]
+        boxes = [metadata[6] for _, metadata in batch]
+        try:
+            with profiler.span("ocr"):
+                batch_results = ocr.run_batch(frames, boxes)
+        except Exception:
+            chunks = sorted({(metadata[0], metadata[2], metadata[3]) for _, metadata in batch})  # (video, chunk, attempt)
+            results_queue.put(OCRFailed(chunks, traceback.format_exc()))
+            continue
+        finally:
+            status.update(0, force=True)
+        profiler.count("ocr_batches")
+        profiler.count("ocr_frames", len(batch))
+        profiler.count("empty_results", sum(1 for frame_results in batch_results if not frame_results))
+        with profiler.span("send"):
+            for (_, metadata), frame_results in zip(batch, batch_results):
+                video_index, decoder, chunk, attempt, frame_number, frame_time, _, roi = metadata
+                results_queue.put(Recognized(video_index, decoder, chunk, attempt, frame_number, frame_time, roi, frame_results))
+    if profiler.enabled:
+        results_queue.put(profiler.report)
+    results_queue.put(OCRWorkerDone(os.getpid(), ready_seconds, memory_usage()))
+
+def worker_counts(
+        decoders: int | None,
+        ocr_workers: int | None,
+        ocr_threads: int | None = None,
+    ) -> Tuple[int, int, int]:
+    """Resolves the number of decoder processes, OCR processes and threads
+    per OCR model.
+
+    Each OCR process uses `ocr_threads` CPUs, one by default. Unspecified
+    process counts share the CPUs left over, half to each stage when neither
+    is given, so that the total number of threads matches the CPUs.
+    """
+    ocr_threads = 1 if ocr_threads is None else ocr_threads
+    if decoders is None or ocr_workers is None:
+        cpus = os.cpu_count()
+        if cpus is None:
+            raise Exception("cannot determine number of CPUs available to process")
+        if decoders is None and ocr_workers is None:
+            ocr_workers = max(1, cpus // 2 // ocr_threads)
+        if decoders is None:
+            decoders = max(1, cpus - ocr_workers * ocr_threads)
+        if ocr_workers is None:
+            ocr_workers = max(1, (cpus - decoders) // ocr_threads)
+    return decoders, ocr_workers, ocr_threads
+
+def checkpoint_settings(
+        stride: int,
+        reuse_boxes: bool,
+        calibrate_roi: bool,
+        text_gate: bool,
+        ocr_settings: OCRSettings = OCRSettings(),
+        decode_backend: str = "opencv",
+    ) -> dict:
+    """The settings which affect the results saved in checkpoints."""
+    selector = FrameSelector()
+    return {
+        "decode_backend": decode_backend,  # ffmpeg sends grayscale frames to OCR
+        "ocr_backend": ocr_settings.backend,
+        "lang": ocr_settings.lang,
+        "text_gate": text_gate,
+        "stride": stride,
+        "reuse_boxes": reuse_boxes,
+        "calibrate_roi": calibrate_roi,
+        "diff_threshold": selector.diff_threshold,
+        "ssim_threshold": selector.ssim_threshold,
+        "edge_threshold": selector.edge_threshold,
+    }
+
+def update_progress(pbar: tqdm, seconds: float):
+    """Shows `seconds` of video processed. The total is only estimated from
+    the container metadata, so it grows if the video turns out longer."""
+    pbar.n = int(seconds)
+    if pbar.total is not None and pbar.n > pbar.total:
+        pbar.total = pbar.n
+    pbar.refresh()
+
+def report_chunks(timings: list[ChunkTiming]):
+    """Prints how long each chunk took and how busy each decoder was."""
+    for t in sorted(timings, key=lambda t: (t.video, t.chunk)):
+        stop = "end" if t.stop is None else t.stop
+        print(
+            f"  CHUNK {t.video}:{t.chunk:<4} [{t.start}, {stop}) decoder {t.decoder}: "
+            f"{t.seconds:.2f}s, {t.submitted - t.gated} frames to OCR, {t.gated} without text"
+        )
+    busy: Dict[int, float] = {}
+    for t in timings:
+        busy[t.decoder] = busy.get(t.decoder, 0) + t.seconds
+    for decoder, seconds in sorted(busy.items()):
+        print(f"  DECODER {decoder}: busy {seconds:.2f}s")
+
+def report_ocr_workers(reports: list[OCRWorkerDone]):
+    """Prints how long each OCR worker took to load its model and how much
+    memory it used. PSS counts the pages shared with other processes, such
+    as a preloaded model, only in proportion."""
+    mb = lambda n: f"{n / 2**20:.1f}MB"
+    for report in reports:
+        memory = "memory unknown"
+        if report.memory is not None:
+            memory = f"RSS {mb(report.memory.rss)}, PSS {mb(report.memory.pss)}, shared {mb(report.memory.shared)}"
+        print(f"  OCR WORKER {report.pid}: model ready in {report.ready_seconds:.2f}s, {memory}")
+
+def preloaded_process_context():
+    """Returns the context which forks processes from this one, so that they
+    inherit the models loaded here."""
+    try:
+        return multiprocessing.get_context("fork")
+    except ValueError:
+        raise Exception("preloading the OCR model requires the fork start method, which this platform does not support")
+
+@dataclass
+class VideoState:
+    """The progress of one of the videos processed together by process_videos.
+
+    Chunks complete out of order, so their subtitles wait in `chunk_subs`
+    until every earlier chunk is complete too. They are then fed to the
+    SubtitleGenerator in order, and the subtitles it finishes are appended to
+    the video's SRT file, so only the chunks in flight are held in memory.
+    With `results`, the OCR results of the frames are recorded as they are
+    emitted, and saved beside the SRT file once the video is done.
+    """
+    file: str
+    info: VideoInfo
+    chunks: list[tuple[int, int | None]]
+    roi: multiprocessing.Array  # Region of interest, shared with the decoders
+    roi_limit: Roi  # Bounds of the region of interest as it grows
+    generator: SubtitleGenerator
+    checkpoints: Checkpoints | None = None
+    results: ResultsRecorder | None = None  # OCR results of the frames emitted, when they are saved
+    pending: list[int] = field(default_factory=list)  # Chunks to process
+    completed: set[int] = field(default_factory=set)  # Chunks with all of their results
+    emitted: int = 0  # Chunks before this one were fed to the generator
+    writer: SrtWriter | None = None
+    chunk_subs: Dict[int, Dict[int, Subtitle]] = field(default_factory=dict)
+    chunk_boxes: Dict[int, List[Roi]] = field(default_factory=dict)  # Text boxes in frame coordinates
+    submitted: Dict[int, int] = field(default_factory=dict)  # Frames selected, once a chunk is decoded
+    recognized: Dict[int, int] = field(default_factory=dict)  # Frames with results
+    attempts: Dict[int, int] = field(default_factory=dict)  # Current attempt of retried chunks
+    failed: Dict[int, str] = field(default_factory=dict)  # Chunks given up on, with the last error
+    timings: List[ChunkTiming] = field(default_factory=list)
+
+    def chunk_seconds(self, chunk: int) -> float:
+        start, stop = self.chunks[chunk]
+        stop = self.info.frame_count if stop is None else stop
+        return max(0, stop - start) / self.info.fps if self.info.fps > 0 else 0
+
+    def current(self, chunk: int, attempt: int) -> bool:
+        """Checks whether a message about `attempt` of `chunk` is still wanted,
+        rather than left over from an attempt which was retried."""
+        return chunk not in self.completed and attempt == self.attempts.get(chunk, 0)
+
+    def retry(self, chunk: int) -> int:
+        """Forgets the results of the current attempt of `chunk`, returning
+        the number of the next attempt."""
+        for partial in [self.chunk_subs, self.chunk_boxes, self.submitted, self.recognized]:
+            partial.pop(chunk, None)
+        self.attempts[chunk] = self.attempts.get(chunk, 0) + 1
+        return self.attempts[chunk]
+
+    def chunk_done(self, chunk: int) -> bool:
+        return chunk in self.submitted and self.recognized.get(chunk, 0) == self.submitted[chunk]
+
+    def done(self) -> bool:
+        return len(self.completed) == len(self.chunks)
+
+    def emit(self, open_output: Callable[[str], TextIO]):
+        """Writes out the subtitles which no pending chunk can change."""
+        while self.emitted in self.completed:
+            for frame_number, sub in sorted(self.chunk_subs.pop(self.emitted, {}).items()):
+                self.generator.add_subtitle(
+                    time = sub.time,
+                    content = sub.text,
+                    confidence = sub.confidence,
                 )
-        with progress.get_lock():
-            progress.value += 1
-    results_queue.put(sub_dict)
-
-def process_video(file: str, verbose=False) -> str:
-    num_frames = count_frames(file)
-    cpus = os.cpu_count()
-    if cpus is None:
-        raise Exception("cannot determine number of CPUs available to process")
-    num_workers = cpus
-    segments = split_into_segments(num_frames, num_workers)
-
-    progress = multiprocessing.Value('I', 0)
+                if self.results is None:
+                    continue
+                if sub.results is None:
+                    self.results.add_text(frame_number, sub.time, sub.text, sub.confidence)
+                else:
+                    self.results.add(frame_number, sub.time, sub.results)
+            self.emitted += 1
+        if self.done():
+            self.generator.finish()
+        subtitles = self.generator.pop_subtitles()
+        if self.writer is None and (subtitles or self.done()):
+            self.writer = SrtWriter(open_output(self.file))
+        if subtitles:
+            for sub in subtitles:
+                print(f"[{sub.start}-{sub.end}] {sub.content}")
+            self.writer.write(subtitles)
+        if self.done():
+            self.writer.flush()
+            if self.results is not None:
+                self.results.save(results_path(self.file))
+                self.results = None
+
+def process_video(file: str, **options) -> str:
+    """Extracts subtitles from a video, returning them in SRT format.
+
+    See process_videos for the options.
+    """
+    output = io.StringIO()
+    process_videos([file], lambda file: output, **options)
+    return output.getvalue()
+
+def process_videos(
+        files: list[str],
+        open_output: Callable[[str], TextIO],
+        on_video: Callable[[str, TextIO], None] = lambda file, output: None,
+        verbose=False,
+        stride=1,
+        decoders=None,
+        ocr_workers=None,
+        batch_size=8,
+        batch_latency=0.05,
+        reuse_boxes=False,
+        cache_size=0,
+        cache_file=None,
+        checkpoint=False,
+        chunk_size=CHUNK_SIZE,
+        calibrate_roi=False,
+        text_gate=False,
+        lang="ch",
+        ocr_threads=None,
+        preload=False,
+        profile: str | None = None,
+        stall_timeout=STALL_TIMEOUT,
+        decode_backend="opencv",
+        save_results=False,
+        on_progress: ProgressCallback | None = None,
+    ):
+    """Extracts subtitles from videos using a staged pipeline.
+
+    The subtitles of each video are written in SRT format to the stream
+    returned by `open_output(file)` while the video is processed, as soon as
+    all the chunks before them are done. `on_video` is called with the file
+    and its stream once the video is done, and should close the stream.
+
+    Each video is split into chunks of about `chunk_size` frames, aligned to
+    keyframes when they can be probed. The chunks of all the videos are
+    queued in order, so one pool of workers processes every video and the
+    next video starts as soon as a decoder is free rather than once the
+    slowest chunk of the previous video is done. Decoder processes take
+    chunks from the shared queue and push the frames chosen by their
+    FrameSelector through a shared memory ring to a separately sized pool of
+    OCR processes, which run OCR on batches of up to `batch_size` frames and
+    wait at most `batch_latency` seconds to fill a batch. Each OCR process
+    loads a model for `lang` which runs on `ocr_threads` threads. Results are
+    collected here and the text box of each result is fed back to the decoder
+    that produced the frame. With `reuse_boxes`, frames which change inside a
+    known text box only go through the recognition model.
+
+    With `preload`, the OCR model is loaded once in this process and the OCR
+    processes are forked from it, sharing the model's memory copy-on-write
+    instead of each loading their own copy.
+
+    `on_progress` is called with the seconds of video processed so far and
+    the estimated length of the videos, as the progress bar is updated.
+
+    When `cache_size` is positive, OCR results are cached by a perceptual hash
+    of the text in an LRU shared by the OCR processes, and persisted to
+    `cache_file` if one is given.
+
+    With `checkpoint`, the results of each chunk are saved next to the video
+    once it completes, and chunks saved by an earlier run with the same video
+    and settings are not processed again.
+
+    Only a region of interest of each frame is processed: the bottom band of
+    the frame, or with `calibrate_roi` a tight region around the text found by
+    OCR on a sample of frames. A calibrated region grows between chunks when
+    recognized text touches its edges.
+
+    With `text_gate`, selected frames which a TextGate finds no text in are
+    recorded as empty without running OCR.
+
+    `decode_backend` is "opencv", or "ffmpeg" to decode with ffmpeg
+    processes which crop the frames and convert them to grayscale
+    themselves, so less of each frame is copied into the decoders.
+
+    Workers are supervised. A decoder or OCR process which dies, for example
+    when it runs out of memory, or which makes no progress for
+    `stall_timeout` seconds is replaced, and a chunk which fails is retried.
+    A chunk which fails MAX_CHUNK_ATTEMPTS times is left out, so one bad
+    frame cannot stop a long job; the other subtitles are still written, and
+    an exception listing the missing chunks is raised at the end.
+
+    With `save_results`, the OCR results of every frame are saved to
+    `<video>.ocr.npz` once the video is done, so that `remerge` can rebuild
+    the subtitles without running OCR again. Frames resumed from checkpoints
+    are saved with only their merged text.
+
+    With `profile`, every process times its stages and counts the frames it
+    handled, and the totals and a Chrome trace of the run are written to
+    `<profile>.json` and `<profile>.trace.json`.
+    """
+    if decode_backend == "ffmpeg" and not ffmpeg_available():
+        raise Exception("the ffmpeg decode backend requires ffmpeg, which was not found on the PATH")
+    began = time.perf_counter()
+    profiler = Profiler("collector", profile is not None, began)
+    profile_origin = began if profile is not None else None
+    num_decoders, num_recognizers, ocr_threads = worker_counts(decoders, ocr_workers, ocr_threads)
+    ocr_settings = OCRSettings(lang=lang, threads=ocr_threads)
+    settings = checkpoint_settings(stride, reuse_boxes, calibrate_roi, text_gate, ocr_settings, decode_backend)
+
+    videos: List[VideoState] = []
+    for file in files:
+        with profiler.span("probe"):
+            info = probe(file)
+        if info.width == 0 or info.height == 0:
+            raise Exception(f"cannot read video {file}")
+        with profiler.span("keyframes"):
+            chunks = plan_chunks(info.frame_count, chunk_size, keyframes(file))
+        roi = default_roi(info.height, info.width)
+        video = VideoState(file, info, chunks, multiprocessing.Array('i', roi), roi, SubtitleGenerator(verbose=verbose))
+        if save_results:
+            video.results = ResultsRecorder()
+        if checkpoint:
+            video.checkpoints = Checkpoints(file, settings)
+            for chunk, (start, stop) in enumerate(chunks):
+                saved = video.checkpoints.load(start, stop)
+                if saved is not None:
+                    video.completed.add(chunk)
+                    video.chunk_subs[chunk] = {n: Subtitle(*sub) for n, sub in saved.items()}
+            if verbose and video.completed:
+                print(f"CHECKPOINT: resuming {file} with {len(video.completed)}/{len(chunks)} chunks done")
+        video.pending = [chunk for chunk in range(len(chunks)) if chunk not in video.completed]
+        videos.append(video)
+
+    # Videos which are already done do not wait for the others.
+    for video in videos:
+        video.emit(open_output)
+        if video.done():
+            on_video(video.file, video.writer.output)
+    pending = [(v, chunk) for v, video in enumerate(videos) for chunk in video.pending]
+
+    if calibrate_roi and pending:
+        ocr = OCR(ocr_settings)
+        for video in videos:
+            if not video.pending:
+                continue
+            with profiler.span("calibrate"):
+                calibrated = calibrate(video.file, ocr, video.info.frame_count, CALIBRATION_SAMPLES)
+            if calibrated is not None:
+                video.roi[:] = calibrated
+                video.roi_limit = search_band(calibrated, video.info.height, video.info.width)
+            if verbose:
+                print(f"ROI: {video.file} {tuple(video.roi[:])}")
+    recognizer_context = multiprocessing
+    if preload and pending:
+        recognizer_context = preloaded_process_context()
+        with profiler.span("load_model"):
+            load_backend(ocr_settings)
+        if verbose:
+            print(f"OCR MODEL: loaded in {time.perf_counter() - began:.2f}s")
+    ring = FrameRing(
+        slots=(SLOTS_PER_OCR_WORKER + batch_size) * num_recognizers,
+        slot_bytes=max(
+            (max_x - min_x) * (max_y - min_y) * 3
+            for min_x, min_y, max_x, max_y in (video.roi_limit for video in videos)
+        ),
+    )
+    num_decoders = max(1, min(num_decoders, len(pending)))
+    # Seconds of the chunks which are complete, or decoded by their current attempt
+    decoded_seconds = sum(video.chunk_seconds(chunk) for video in videos for chunk in video.completed)
     result_queue = multiprocessing.Queue()
+    chunk_queue = multiprocessing.Queue()
+    for v, chunk in pending:
+        chunk_queue.put((v, chunk, *videos[v].chunks[chunk], 0))
+
+    cache_manager = None
+    cache = None
+    if cache_size > 0:
+        cache_manager = CacheManager()
+        cache_manager.start()
+        cache = cache_manager.OCRCache(cache_size, cache_file)
+
+    supervisor = Supervisor(stall_timeout)
+    feedbacks: List[FilterFeedback] = []  # Of every decoder started, by its number
+    decoders: Dict[int, Worker] = {}  # Decoders which are running, by their number
+    recognizers: List[Worker] = []  # OCR workers which are running
+    running: Dict[int, Tuple[int, int, int]] = {}  # (video, chunk, attempt) being decoded by each decoder
+    remaining = {v for v, video in enumerate(videos) if not video.done()}
+    failed_workers = 0
+    draining = False  # Every chunk is complete, and the workers are finishing
+
+    def start_worker(worker: Worker):
+        # Objects tracked by the garbage collector are moved out of its reach, so
+        # that collections in the forked workers do not write to (and copy) the
+        # pages they share with this process.
+        gc.freeze()
+        with profiler.span("start_workers"):
+            supervisor.start(worker)
+        gc.unfreeze()
+
+    def start_decoder():
+        decoder = len(feedbacks)
+        feedbacks.append(FilterFeedback())
+        status = WorkerStatus()
+        process = multiprocessing.Process(
+            target=decode_chunks,
+            args=(
+                files, decoder, chunk_queue, [video.roi for video in videos], ring, feedbacks[decoder],
+                status, result_queue, stride, reuse_boxes, text_gate, decode_backend, profile_origin,
+            ),
+            daemon=True,
+        )
+        decoders[decoder] = Worker(f"decoder {decoder}", process, status)
+        start_worker(decoders[decoder])
 
-    workers = [
-        multiprocessing.Process(
-            target=process_video_segment,
-            args=(file, start, stop, progress, result_queue),
+    def start_recognizer():
+        status = WorkerStatus()
+        process = recognizer_context.Process(
+            target=recognize_frames,
+            args=(ring, result_queue, status, batch_size, batch_latency, cache, ocr_settings, profile_origin),
             daemon=True,
         )
-        for start, stop in segments
+        recognizers.append(Worker(f"ocr worker {len(supervisor.started)}", process, status))
+        start_worker(recognizers[-1])
+
+    for _ in range(num_decoders):
+        start_decoder()
+    for _ in range(num_recognizers):
+        start_recognizer()
+
+    def abort():
+        supervisor.terminate()
+        ring.close()
+        if cache_manager is not None:
+            cache_manager.shutdown()
+
+    def progress() -> float:
+        return decoded_seconds + sum(worker.status.progress() for worker in decoders.values())
+
+    def save_chunk(video: VideoState, chunk: int):
+        video.completed.add(chunk)
+        chunk_subs = video.chunk_subs.setdefault(chunk, {})
+        current = tuple(video.roi[:])
+        expanded = expand_roi(current, video.chunk_boxes.pop(chunk, []), video.roi_limit)
+        if expanded != current:
+            video.roi[:] = expanded
+            if verbose:
+                print(f"ROI: {video.file} {current} -> {expanded}")
+        if video.checkpoints is not None:
+            start, stop = video.chunks[chunk]
+            video.checkpoints.save(start, stop, {n: (sub.time, sub.text, sub.confidence) for n, sub in chunk_subs.items()})
+
+    def complete_chunk(v: int, chunk: int):
+        video = videos[v]
+        if chunk in video.failed:  # Not checkpointed, so that a re-run tries it again
+            video.completed.add(chunk)
+        else:
+            save_chunk(video, chunk)
+        with profiler.span("write"):
+            video.emit(open_output)
+        if video.done():
+            remaining.discard(v)
+            on_video(video.file, video.writer.output)
+
+    def retry_chunk(v: int, chunk: int, attempt: int, reason: str):
+        """Queues `chunk` again, unless `attempt` was already retried, or
+        gives up on it after MAX_CHUNK_ATTEMPTS."""
+        nonlocal decoded_seconds
+        video = videos[v]
+        if not video.current(chunk, attempt):
+            return
+        if chunk in video.submitted:
+            decoded_seconds -= video.chunk_seconds(chunk)
+        start, stop = video.chunks[chunk]
+        attempt = video.retry(chunk)
+        error = reason.strip().splitlines()[-1]
+        if attempt < MAX_CHUNK_ATTEMPTS:
+            print(f"RETRY: frames [{start}, {stop}) of {video.file}: {error}", file=sys.stderr)
+            chunk_queue.put((v, chunk, start, stop, attempt))
+            return
+        print(f"FAILED: frames [{start}, {stop}) of {video.file} after {attempt} attempts: {error}", file=sys.stderr)
+        if verbose:
+            print(reason, file=sys.stderr)
+        video.failed[chunk] = error
+        decoded_seconds += video.chunk_seconds(chunk)
+        complete_chunk(v, chunk)
+
+    def replace_worker(worker: Worker, reason: str):
+        """Retries the chunks whose results were lost with `worker`, and
+        starts another worker in its place."""
+        nonlocal failed_workers
+        failed_workers += 1
+        print(f"WORKER FAILED: {worker.name} {reason}", file=sys.stderr)
+        if failed_workers > MAX_CHUNK_ATTEMPTS * (num_decoders + num_recognizers):
+            abort()
+            raise Exception(f"{worker.name} {reason}, and too many workers have failed to continue")
+        decoder = next((d for d, w in decoders.items() if w is worker), None)
+        if decoder is not None:
+            del decoders[decoder]
+            if decoder in running:
+                retry_chunk(*running.pop(decoder), f"{worker.name} {reason}")
+        else:
+            # The frames it was running OCR on may belong to any chunk which
+            # was started or decoded but is not complete yet.
+            recognizers.remove(worker)
+            in_flight = set(running.values()) | {
+                (v, chunk, video.attempts.get(chunk, 0))
+                for v, video in enumerate(videos)
+                for chunk in video.submitted
+            }
+            for v, chunk, attempt in sorted(in_flight):
+                retry_chunk(v, chunk, attempt, f"{worker.name} {reason}")
+        if draining:
+            return
+        if decoder is not None:
+            start_decoder()
+        else:
+            start_recognizer()
+
+    def next_message():
+        """Returns the next message from the workers, or None if there is
+        none yet. Replaces workers which failed, and raises if they keep
+        failing."""
+        try:
+            return result_queue.get(timeout=0.1)
+        except queue.Empty:
+            pass
+        for worker, reason in supervisor.failures():
+            replace_worker(worker, reason)
+        return None
+
+    profile_reports: List[ProfileReport] = []
+    first_result = None  # Seconds from the start until the first OCR result
+    total = round(sum(video.info.duration() for video in videos))
+    with tqdm(total=total or None, unit="s", desc="Processing video") as pbar:
+        def report_progress():
+            seconds = progress()
+            update_progress(pbar, seconds)
+            if on_progress is not None:
+                on_progress(seconds, pbar.total)
+
+        while remaining:
+            report_progress()
+            with profiler.span("wait"):
+                message = next_message()
+            if message is None:
+                continue
+            if isinstance(message, ProfileReport):  # From a decoder with no chunks left
+                profile_reports.append(message)
+                continue
+            profiler.count("messages")
+            if isinstance(message, ChunkStarted):
+                if videos[message.video].current(message.chunk, message.attempt):
+                    running[message.decoder] = (message.video, message.chunk, message.attempt)
+                continue
+            if isinstance(message, ChunkFailed):
+                running.pop(message.decoder, None)
+                retry_chunk(message.video, message.chunk, message.attempt, message.error)
+                continue
+            if isinstance(message, OCRFailed):
+                for v, chunk, attempt in message.chunks:
+                    retry_chunk(v, chunk, attempt, message.error)
+                continue
+            if isinstance(message, ChunkDone):
+                v, chunk = message.timing.video, message.timing.chunk
+                video = videos[v]
+                if running.get(message.timing.decoder) == (v, chunk, message.attempt):
+                    del running[message.timing.decoder]
+                if not video.current(chunk, message.attempt):
+                    continue
+                video.submitted[chunk] = message.timing.submitted
+                video.timings.append(message.timing)
+                decoded_seconds += video.chunk_seconds(chunk)
+            else:
+                v, chunk = message.video, message.chunk
+                video = videos[v]
+                if not video.current(chunk, message.attempt):
+                    continue
+                if first_result is None:
+                    first_result = time.perf_counter() - began
+                boxes = result_boxes(message.results)
+                video.chunk_subs.setdefault(chunk, {})[message.frame_number] = Subtitle(
+                    time = message.time,
+                    text = merge_text([result.text for result in message.results], boxes),
+                    confidence = merged_confidence(message.results),
+                    results = translate(message.results, message.roi[0], message.roi[1]) if save_results else None,
+                )
+                box = bounding_box(boxes) if message.results else None
+                feedbacks[message.decoder].publish(message.frame_number, box, len(message.results) == 1, v)
+                video.recognized[chunk] = video.recognized.get(chunk, 0) + 1
+                corners = np.hstack([boxes.min(axis=1), boxes.max(axis=1)]).astype(int) + np.tile(message.roi[:2], 2)
+                video.chunk_boxes.setdefault(chunk, []).extend(map(tuple, corners.tolist()))
+            if video.chunk_done(chunk):
+                complete_chunk(v, chunk)
+        report_progress()
+
+    draining = True
+    for _ in decoders:
+        chunk_queue.put(None)
+    ring.finish(len(recognizers))
+    ocr_reports: List[OCRWorkerDone] = []
+    expected_profiles = lambda: len(supervisor.started) - failed_workers if profiler.enabled else 0
+    while len(ocr_reports) < len(recognizers) or len(profile_reports) < expected_profiles():
+        message = next_message()
+        if isinstance(message, ProfileReport):
+            profile_reports.append(message)
+        elif isinstance(message, OCRWorkerDone):
+            ocr_reports.append(message)
+    supervisor.join()
+    ring.close()
+    if verbose:
+        report_chunks([timing for video in videos for timing in video.timings])
+        report_ocr_workers(ocr_reports)
+        if first_result is not None:
+            print(f"FIRST RESULT: {first_result:.2f}s after starting")
+    if cache is not None:
+        hits, misses = cache.stats()
+        if verbose:
+            print(f"OCR CACHE: {hits} hits, {misses} misses")
+        cache.close()
+        cache_manager.shutdown()
+    if profiler.enabled:
+        paths = write_profile(profile, [profiler.report] + profile_reports, time.perf_counter() - began)
+        print(f"PROFILE: {' and '.join(paths)}")
+    failed = [
+        f"frames [{video.chunks[chunk][0]}, {video.chunks[chunk][1]}) of {video.file}: {error}"
+        for video in videos
+        for chunk, error in sorted(video.failed.items())
     ]
-    for p in workers:
-        p.start()
-
-    with tqdm(total=num_frames, desc="Processing video") as pbar:
-        while progress.value < num_frames:
-            pbar.n = progress.value
-            pbar.refresh()
-            # sleep for a short time to avoid busy waiting
-            time.sleep(0.1)
-        pbar.n = progress.value
-        pbar.refresh()
-
-    subs = [None] * num_frames
-    for _ in workers:
-        for idx, sub in result_queue.get().items():
-            subs[idx] = sub
-
-    subtitle_generator = SubtitleGenerator(verbose=verbose)
-    for sub in subs:
-        if sub is None:
-            continue
-        subtitle_generator.add_subtitle(
-            time = sub.time,
-            content = sub.text
+    if failed:
+        raise Exception(f"gave up on {len(failed)} chunks, which are missing from the subtitles:\n" + "\n".join(failed))
+
+@dataclass
+class StreamReport:
+    """What happened to the frames of a live stream, and how long its cues took."""
+    frames_read: int
+    frames_selected: int
+    frames_coalesced: int  # Selected frames replaced by a newer one while OCR was behind
+    frames_late: int  # Selected frames whose OCR result missed the latency budget
+    cues: int
+    # Percentiles of the seconds from reading the frame which ended a cue to writing the cue
+    latency: dict[str, float]
+
+def read_stream(video: FFmpegStream, frames: queue.Queue):
+    """Reads the frames of `video` into `frames` with their frame number, time
+    and the time they were read, followed by None at the end of the stream
+    or the exception which ended it."""
+    try:
+        for frame in video:
+            frames.put((frame, video.frame_number(), video.time(), time.monotonic()))
+        frames.put(None)
+    except Exception as error:
+        frames.put(error)
+
+def process_stream(
+        source: str,
+        output: TextIO,
+        subtitle_format="srt",
+        latency=STREAM_LATENCY,
+        follow=False,
+        idle_timeout=IDLE_TIMEOUT,
+        ocr_workers=None,
+        ocr_threads=None,
+        batch_size=8,
+        batch_latency=0.05,
+        lang="ch",
+        preload=False,
+        verbose=False,
+        stall_timeout=STALL_TIMEOUT,
+    ) -> StreamReport:
+    """Extracts subtitles from a video which can only be read in order, such
+    as a pipe, stdin (a `source` of "-") or, with `follow`, a file which is
+    still being written, and writes each cue to `output` as soon as it ends.
+
+    An ffmpeg process decodes the bottom band of the frames in grayscale, a
+    thread reads them, and the FrameSelector hands the frames on which the
+    text changed to a pool of OCR processes, like process_videos does.
+    Results are put back in order by a ReorderBuffer, and a frame whose
+    result is not back within `latency` seconds is skipped, so cues are
+    written at most about `latency` seconds after the frame which ended
+    them. When the OCR processes are behind, a selected frame waits for a
+    free slot of the ring, and a newer selected frame replaces it rather
+    than queueing behind it.
+
+    Cues are written as SRT, or with a `subtitle_format` of "vtt", as
+    WebVTT, and flushed at once. Returns what happened to the frames and the
+    latency percentiles of the cues.
+    """
+    if not ffmpeg_available():
+        raise Exception("reading a stream requires ffmpeg, which was not found on the PATH")
+    _, num_recognizers, ocr_threads = worker_counts(1, ocr_workers, ocr_threads)
+    ocr_settings = OCRSettings(lang=lang, threads=ocr_threads)
+    recognizer_context = multiprocessing
+    if preload:
+        recognizer_context = preloaded_process_context()
+        load_backend(ocr_settings)
+    video = FFmpegStream(source, follow, idle_timeout, threads=1)
+    height, width = video.shape
+    roi = (0, 0, width, height)  # The frames are already cropped
+    ring = FrameRing(slots=(SLOTS_PER_OCR_WORKER + batch_size) * num_recognizers, slot_bytes=max(1, height * width))
+    result_queue = multiprocessing.Queue()
+    supervisor = Supervisor(stall_timeout)
+    recognizers: List[Worker] = []
+
+    def start_recognizer():
+        status = WorkerStatus()
+        process = recognizer_context.Process(
+            target=recognize_frames,
+            args=(ring, result_queue, status, batch_size, batch_latency, None, ocr_settings),
+            daemon=True,
         )
-    return subtitle_generator.create_srt()
+        recognizers.append(Worker(f"ocr worker {len(supervisor.started)}", process, status))
+        supervisor.start(recognizers[-1])
+
+    frames: queue.Queue = queue.Queue(maxsize=STREAM_BUFFER)
+    reader = threading.Thread(target=read_stream, args=(video, frames), daemon=True)
+    frame_selector = FrameSelector()
+    buffer = ReorderBuffer(latency)
+    generator = SubtitleGenerator(verbose=verbose)
+    writer = (VttWriter if subtitle_format == "vtt" else SrtWriter)(output, flush_interval=0)
+    waiting = None  # (frame number, time, frame) selected but not in the ring yet
+    done: List[OCRWorkerDone] = []
+    latencies: List[float] = []
+    frames_read = frames_selected = frames_coalesced = cues = 0
+
+    def write(subtitles: list, closed_at: float):
+        nonlocal cues
+        if subtitles:
+            writer.write(subtitles)
+            cues += len(subtitles)
+            latencies.extend([time.monotonic() - closed_at] * len(subtitles))
+
+    def poll(finishing: bool = False):
+        """Hands on the waiting frame, takes in OCR results and writes the
+        cues they end."""
+        nonlocal waiting
+        if waiting is not None:
+            frame_number, frame_time, frame = waiting
+            if ring.put(frame, (0, 0, 0, 0, frame_number, frame_time, None, roi), block=False):
+                waiting = None
+        while True:
+            try:
+                message = result_queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(message, Recognized):
+                buffer.deliver(message.frame_number, message)
+            elif isinstance(message, OCRWorkerDone):
+                done.append(message)
+            # The frames of an OCRFailed batch are skipped once they are late.
+        for worker, reason in supervisor.failures():
+            print(f"WORKER FAILED: {worker.name} {reason}", file=sys.stderr)
+            recognizers.remove(worker)
+            if not finishing:
+                start_recognizer()
+        for _, read_at, message in buffer.release(time.monotonic()):
+            generator.add_subtitle(
+                time = message.time,
+                content = merge_results(message.results),
+                confidence = merged_confidence(message.results),
+            )
+            write(generator.pop_subtitles(), read_at)
+
+    try:
+        for _ in range(num_recognizers):
+            start_recognizer()
+        reader.start()
+        while True:
+            try:
+                item = frames.get(timeout=0.05)
+            except queue.Empty:
+                poll()
+                continue
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            frame, frame_number, frame_time, read_at = item
+            frames_read += 1
+            if frame_selector.select(frame):
+                frames_selected += 1
+                if waiting is not None:  # Coalesced: the text changed again before OCR was free
+                    buffer.drop(waiting[0])
+                    frames_coalesced += 1
+                buffer.add(frame_number, read_at)
+                waiting = (frame_number, frame_time, frame)
+            poll()
+        ended_at = time.monotonic()
+        while len(buffer) > 0:
+            time.sleep(0.01)
+            poll()
+        ring.finish(len(recognizers))
+        while len(done) < len(recognizers):
+            time.sleep(0.01)
+            poll(finishing=True)
+        generator.finish()
+        write(generator.pop_subtitles(), ended_at)
+        writer.flush()
+    finally:
+        video.close()
+        supervisor.terminate()
+        supervisor.join()
+        ring.close()
+    if verbose:
+        report_ocr_workers(done)
+    return StreamReport(frames_read, frames_selected, frames_coalesced, buffer.late, cues, latency_percentiles(latencies))
 
-def main():
-    args = cli.parse_arguments()
+def processing_options(args: cli.Arguments) -> dict:
+    """Returns the keyword arguments of process_video for the CLI options."""
+    return dict(
+        verbose=args.verbose,
+        stride=args.stride,
+        decoders=args.decoders,
+        ocr_workers=args.ocr_workers,
+        batch_size=args.batch_size,
+        batch_latency=args.batch_latency / 1000,
+        reuse_boxes=args.reuse_boxes,
+        cache_size=args.cache_size,
+        cache_file=args.cache_file,
+        checkpoint=args.checkpoint,
+        chunk_size=args.chunk_size,
+        calibrate_roi=args.calibrate_roi,
+        text_gate=args.text_gate,
+        lang=args.lang,
+        ocr_threads=args.ocr_threads,
+        preload=args.preload,
+        profile=args.profile,
+        stall_timeout=args.stall_timeout,
+        decode_backend=args.decode_backend,
+        save_results=args.save_results,
+    )
+
+def srt_path(video_file: str) -> str:
+    """The SRT file of a video, next to it."""
+    return os.path.splitext(video_file)[0] + ".srt"
+
+def open_srt(video_file: str) -> TextIO:
+    return open(srt_path(video_file), "w", encoding='utf-8')
+
+def results_path(video_file: str) -> str:
+    """The OCR results of a video saved with `save_results`, next to it."""
+    return os.path.splitext(video_file)[0] + ".ocr.npz"
+
+def remerge_results(results: FrameResults, output: TextIO, verbose=False):
+    """Rebuilds subtitles in SRT format from saved OCR `results`, with the
+    current SubtitleGenerator and without running OCR."""
+    generator = SubtitleGenerator(verbose=verbose)
+    for _, time, text, confidence in results.frames():
+        generator.add_subtitle(time=time, content=text, confidence=confidence)
+    generator.finish()
+    writer = SrtWriter(output)
+    writer.write(generator.pop_subtitles())
+    writer.flush()
+
+def remerge(args: cli.RemergeArguments):
+    """Rebuilds the `.srt` file of each video from its saved OCR results."""
+    for file in args.files:
+        results = load_results(results_path(file))  # Before the old file is truncated
+        with open_srt(file) as output:
+            remerge_results(results, output, args.verbose)
+        print(f"DONE: {results_path(file)} -> {srt_path(file)}")
+
+def stream(args: cli.StreamArguments):
+    """Writes the subtitles of a live stream to a file or stdout as they end,
+    and reports their latency on stderr."""
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding='utf-8')
+    try:
+        report = process_stream(
+            args.source,
+            output,
+            subtitle_format = args.format,
+            latency = args.latency,
+            follow = args.follow,
+            idle_timeout = args.idle_timeout,
+            ocr_workers = args.ocr_workers,
+            ocr_threads = args.ocr_threads,
+            batch_size = args.batch_size,
+            batch_latency = args.batch_latency / 1000,
+            lang = args.lang,
+            preload = args.preload,
+            verbose = args.verbose,
+        )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(
+        f"FRAMES: {report.frames_read} read, {report.frames_selected} selected, "
+        f"{report.frames_coalesced} coalesced, {report.frames_late} late",
+        file=sys.stderr,
+    )
+    if report.latency:
+        print("LATENCY: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in report.latency.items()), file=sys.stderr)
+    print(f"DONE: {report.cues} subtitles", file=sys.stderr)
 
-    for video_file in args.files:
-        print(f"PROCESSING: {video_file}")
-        subtitles = process_video(video_file, verbose=args.verbose)
-        srt_file = os.path.splitext(video_file)[0] + ".srt"
-        with open(srt_file, "w", encoding='utf-8') as f:
-            f.write(subtitles)
+def extract(args: cli.Arguments):
+    """Writes the `.srt` file of each video next to it."""
+    print(f"PROCESSING: {', '.join(args.files)}")
+    def on_video(video_file: str, output: TextIO):
+        output.close()
+        print(f"DONE: {video_file} -> {srt_path(video_file)}")
+    process_videos(args.files, open_srt, on_video, **processing_options(args))
 
 if __name__ == "__main__":
-    main()
+    cli.main()
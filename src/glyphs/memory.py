@@ -0,0 +1,31 @@
+from dataclasses import dataclass
+
+@dataclass
+class MemoryUsage:
+    """Memory of a process in bytes.
+
+    RSS counts every resident page, including pages shared with other
+    processes. PSS divides each shared page between the processes sharing
+    it, so the PSS of all workers adds up to the memory they really use.
+    """
+    rss: int
+    pss: int
+    shared: int  # Resident pages which are also mapped by another process
+
+def memory_usage(pid: int | str = "self") -> MemoryUsage | None:
+    """Returns the memory used by process `pid`, or None when the system
+    does not report it (it is read from /proc, so only on Linux)."""
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if value.strip().endswith("kB"):
+                    fields[name] = int(value.split()[0]) * 1024
+    except OSError:
+        return None
+    return MemoryUsage(
+        rss = fields.get("Rss", 0),
+        pss = fields.get("Pss", 0),
+        shared = fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+    )
@@ -0,0 +1,2 @@
+from .backend import BACKENDS, Backend, OCRSettings, load_backend
+from .ocr import OCR, Point, Result, text_moved, translate
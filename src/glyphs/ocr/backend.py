@@ -0,0 +1,55 @@
+from dataclasses import dataclass
+from typing import Protocol
+
+@dataclass(frozen=True)
+class OCRSettings:
+    """Selects and configures the OCR model of each OCR worker."""
+    backend: str = "paddle"
+    lang: str = "ch"
+    threads: int = 1  # Threads used by each model for inference
+
+class Backend(Protocol):
+    """An OCR model, split into its detection and recognition stages so that
+    OCR can batch recognition across frames and skip detection for text
+    boxes which are already known.
+
+    Boxes are arrays of 4 (x, y) points, clockwise from the top left.
+    """
+
+    # Recognized text below this confidence is discarded.
+    drop_score: float
+
+    def detect(self, image) -> list:
+        """Returns the text boxes in `image`, in reading order."""
+        ...
+
+    def crop(self, image, box):
+        """Returns the upright image of the text inside `box`."""
+        ...
+
+    def recognize(self, crops: list) -> list[tuple[str, float]]:
+        """Returns the (text, confidence) of each cropped line of text."""
+        ...
+
+def paddle(settings: OCRSettings) -> Backend:
+    from .paddle import PaddleBackend
+    return PaddleBackend(settings.lang, settings.threads)
+
+# Constructors of the available backends, by name. Backends are imported
+# when they are loaded, so unused ones cost nothing.
+BACKENDS = {
+    "paddle": paddle,
+}
+
+# Backends loaded by this process, by their settings. Processes forked
+# after a backend is loaded inherit it, sharing the model's memory
+# copy-on-write instead of loading it again.
+loaded: dict[OCRSettings, Backend] = {}
+
+def load_backend(settings: OCRSettings) -> Backend:
+    """Returns the backend for `settings`, loading it on first use."""
+    if settings.backend not in BACKENDS:
+        raise Exception(f"unknown OCR backend {settings.backend!r}, expected one of: {', '.join(BACKENDS)}")
+    if settings not in loaded:
+        loaded[settings] = BACKENDS[settings.backend](settings)
+    return loaded[settings]
@@ -0,0 +1,187 @@
+import cv2
+
+from dataclasses import dataclass
+
+from glyphs.cache import OCRCache, image_key, text_region
+
+from .backend import OCRSettings, load_backend
+
+# Recognition on a known text box is trusted only above this confidence.
+MIN_KNOWN_BOX_CONFIDENCE = 0.9
+
+# Pixels of padding added around a known text box before recognition.
+KNOWN_BOX_PADDING = 4
+
+def text_moved(image, box) -> bool:
+    """Checks whether the text in `image` may no longer fit inside `box`.
+
+    Text which grew past the box, or a new line above or below it, leaves
+    edges in the strips around the box, so the edge density of each strip
+    is compared against the inside of the box.
+    """
+    min_x, min_y, max_x, max_y = box
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    height, width = image.shape[:2]
+    margin = max(1, max_y - min_y)  # One text-height on every side
+    left, top = max(0, min_x - margin), max(0, min_y - margin)
+    right, bottom = min(width, max_x + margin), min(height, max_y + margin)
+    edges = cv2.Canny(image[top:bottom, left:right], 50, 150)
+    min_x, min_y, max_x, max_y = min_x - left, min_y - top, max_x - left, max_y - top
+    inside = edges[min_y:max_y, min_x:max_x]
+    if inside.size == 0:
+        return True
+    inside_density = inside.sum() / inside.size
+    if inside_density == 0:
+        return True
+    strips = [edges[:, :min_x], edges[:, max_x:], edges[:min_y, min_x:max_x], edges[max_y:, min_x:max_x]]
+    return any(
+        strip.sum() / strip.size > 0.25 * inside_density
+        for strip in strips if strip.size > 0
+    )
+
+@dataclass
+class Point:
+    """A point on a plane."""
+    x: int
+    y: int
+
+@dataclass
+class Result:
+    """Contains OCR information from PaddleOCR."""
+    bounding_box: list[Point]
+    confidence: float
+    text: str
+
+def translate(results: list[Result], dx, dy) -> list[Result]:
+    """Returns copies of `results` with their boxes moved by (dx, dy)."""
+    return [
+        Result(
+            bounding_box = [Point(p.x + dx, p.y + dy) for p in r.bounding_box],
+            confidence = r.confidence,
+            text = r.text,
+        )
+        for r in results
+    ]
+
+class OCR:
+    """Runs OCR on frames with the backend chosen by `settings`.
+
+    Detection runs on each frame separately, while recognition is batched
+    across the text boxes of all the frames given together.
+    """
+    backend = None
+    cache = None
+
+    def __init__(self, settings: OCRSettings = OCRSettings(), cache: OCRCache | None = None):
+        self.backend = load_backend(settings)
+        self.cache = cache
+
+    def run(self, image) -> list[Result]:
+        return self.run_batch([image])[0]
+
+    def recognize(self, images: list, boxes: list) -> list[Result | None]:
+        """Runs only the recognition model on text boxes which are already known.
+
+        Returns None for images where the recognition is not confident enough
+        to skip detection.
+        """
+        crops = []
+        for image, (min_x, min_y, max_x, max_y) in zip(images, boxes):
+            height, width = image.shape[:2]
+            crops.append(image[
+                max(0, min_y - KNOWN_BOX_PADDING) : min(height, max_y + KNOWN_BOX_PADDING),
+                max(0, min_x - KNOWN_BOX_PADDING) : min(width, max_x + KNOWN_BOX_PADDING),
+            ])
+        results = []
+        for (min_x, min_y, max_x, max_y), (characters, confidence) in zip(boxes, self.backend.recognize(crops)):
+            if confidence < MIN_KNOWN_BOX_CONFIDENCE or characters == "":
+                results.append(None)
+                continue
+            results.append(
+                Result(
+                    bounding_box = [Point(min_x, min_y), Point(max_x, min_y), Point(max_x, max_y), Point(min_x, max_y)],
+                    confidence = confidence,
+                    text = characters,
+                )
+            )
+        return results
+
+    def run_batch(self, images: list, boxes: list | None = None) -> list[list[Result]]:
+        """Runs OCR on several images, returning the results of each image in order.
+
+        When `boxes` gives the known text box of an image, only the recognition
+        model runs on that box. Full detection is used when there is no box,
+        the text no longer fits the box, or recognition is not confident.
+
+        Images whose text is already in the cache skip OCR entirely. Cached
+        boxes are stored relative to the text region, so repeated text is
+        found wherever it appears in the frame.
+        """
+        batch_results = [None] * len(images)
+        keys = None
+        if self.cache is not None:
+            keys = [None] * len(images)
+            regions = [
+                text_region(image, None if boxes is None else boxes[i])
+                for i, image in enumerate(images)
+            ]
+            for i, region in enumerate(regions):
+                if region is None:  # No edges at all, so there is no text
+                    batch_results[i] = []
+                    continue
+                keys[i] = image_key(images[i], region)
+                cached = self.cache.get(keys[i])
+                if cached is not None:
+                    batch_results[i] = translate(cached, region[0], region[1])
+        misses = [i for i, frame_results in enumerate(batch_results) if frame_results is None]
+        if boxes is not None:
+            known = [
+                i for i in misses
+                if boxes[i] is not None and not text_moved(images[i], boxes[i])
+            ]
+            if len(known) > 0:
+                recognized = self.recognize([images[i] for i in known], [boxes[i] for i in known])
+                for i, result in zip(known, recognized):
+                    if result is not None:
+                        batch_results[i] = [result]
+
+        unknown = [i for i, frame_results in enumerate(batch_results) if frame_results is None]
+        detected = self.detect_and_recognize([images[i] for i in unknown])
+        for i, frame_results in zip(unknown, detected):
+            batch_results[i] = frame_results
+        if keys is not None:
+            for i in misses:
+                min_x, min_y, _, _ = regions[i]
+                self.cache.put(keys[i], translate(batch_results[i], -min_x, -min_y))
+        return batch_results
+
+    def detect_and_recognize(self, images: list) -> list[list[Result]]:
+        """Runs detection on each image separately, and then recognition on the
+        text boxes of all the images together so its batching is used across
+        frames.
+        """
+        image_boxes = []
+        crops = []
+        for image in images:
+            boxes = self.backend.detect(image)
+            image_boxes.append(boxes)
+            crops.extend(self.backend.crop(image, box) for box in boxes)
+        recognized = iter(self.backend.recognize(crops))
+
+        batch_results = []
+        for boxes in image_boxes:
+            frame_results = []
+            for box in boxes:
+                characters, confidence = next(recognized)
+                if confidence < self.backend.drop_score:
+                    continue
+                frame_results.append(
+                    Result(
+                        bounding_box = [Point(b[0], b[1]) for b in box],
+                        confidence = confidence,
+                        text = characters,
+                    )
+                )
+            batch_results.append(frame_results)
+        return batch_results
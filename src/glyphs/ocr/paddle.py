@@ -0,0 +1,55 @@
+import copy
+import cv2
+import importlib
+import threading
+
+# This asynchronously loads the PaddleOCR library to save O(seconds) during startup
+paddleocr = None
+import_error = None
+def load_paddleocr():
+    global paddleocr, import_error
+    try:
+        paddleocr = __import__("paddleocr")
+    except ImportError as error:
+        import_error = error
+import_thread = threading.Thread(target=load_paddleocr)
+import_thread.start()
+
+def color(image):
+    """PaddleOCR's models take 3 channel images, so grayscale frames are expanded."""
+    return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR) if image.ndim == 2 else image
+
+class PaddleBackend:
+    """PaddleOCR 2.x, using its detector and recognizer directly along with
+    the helpers in its `tools.infer.predict_system` module."""
+
+    def __init__(self, lang: str = "ch", threads: int = 1):
+        import_thread.join()
+        if import_error is not None:
+            raise Exception(f"cannot import PaddleOCR: {import_error}") from import_error
+        try:
+            # PaddleOCR 2.x adds its own directory to sys.path and imports its helpers as `tools`.
+            self.predict_system = importlib.import_module("tools.infer.predict_system")
+        except ImportError as error:
+            raise Exception(
+                f"PaddleOCR {paddleocr.__version__} is not supported, glyphs requires PaddleOCR 2.x"
+            ) from error
+        self.model = paddleocr.PaddleOCR(
+            use_angle_cls=False,
+            lang=lang,
+            cpu_threads=threads,
+            show_log=False,
+        )
+        self.drop_score = self.model.drop_score
+
+    def detect(self, image) -> list:
+        boxes, _ = self.model.text_detector(color(image))
+        return [] if boxes is None else self.predict_system.sorted_boxes(boxes)
+
+    def crop(self, image, box):
+        return self.predict_system.get_rotate_crop_image(image, copy.deepcopy(box))
+
+    def recognize(self, crops: list) -> list[tuple[str, float]]:
+        if len(crops) == 0:
+            return []
+        return self.model.text_recognizer([color(crop) for crop in crops])[0]
@@ -0,0 +1,14 @@
+from unittest.mock import patch
+
+from .backend import BACKENDS, OCRSettings, load_backend, loaded
+
+def test_backend_is_loaded_once_per_settings():
+    constructed = []
+    def construct(settings):
+        constructed.append(settings)
+        return object()
+    with patch.dict(BACKENDS, {"stub": construct}), patch.dict(loaded, clear=True):
+        english = load_backend(OCRSettings("stub", "en"))
+        assert load_backend(OCRSettings("stub", "en")) is english
+        assert load_backend(OCRSettings("stub", "japan")) is not english
+    assert constructed == [OCRSettings("stub", "en"), OCRSettings("stub", "japan")]
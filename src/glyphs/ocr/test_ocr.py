@@ -0,0 +1,96 @@
+import cv2
+import numpy as np
+import pytest
+
+from unittest.mock import patch
+
+from .backend import OCRSettings
+from .ocr import OCR, text_moved
+
+def make_band(text, second_line=None):
+    band = np.zeros((100, 800, 3), dtype=np.uint8)
+    cv2.putText(band, text, (300, 60), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+    if second_line is not None:
+        cv2.putText(band, second_line, (300, 95), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+    return band
+
+BOX = (295, 35, 420, 70)  # Fits "hello"
+
+def test_text_inside_box():
+    assert not text_moved(make_band("hello"), BOX)
+
+def test_text_grew_past_box():
+    assert text_moved(make_band("hello there world"), BOX)
+
+def test_new_line_below_box():
+    assert text_moved(make_band("hello", second_line="world"), BOX)
+
+def test_box_without_text():
+    assert text_moved(make_band(""), BOX)
+
+class StubBackend:
+    """Stands in for an OCR model: each image holds one text box whose pixels
+    encode the text, and images filled with 0 have no text."""
+    drop_score = 0.5
+
+    def __init__(self):
+        self.detected = []
+        self.recognized = []
+
+    def detect(self, image):
+        self.detected.append(int(image.max()))
+        if image.max() == 0:
+            return []
+        return [np.array([[0, 0], [8, 0], [8, 4], [0, 4]], dtype=np.float32)]
+
+    def crop(self, image, box):
+        return image
+
+    def recognize(self, crops):
+        self.recognized.append(len(crops))
+        results = []
+        for crop in crops:
+            value = int(crop.max())
+            if value == 2:
+                results.append(("", 0.95))
+            else:
+                results.append((f"text{value}", {1: 0.2, 6: 0.6}.get(value, 0.95)))
+        return results
+
+def stub_ocr():
+    with patch("glyphs.ocr.ocr.load_backend", return_value=StubBackend()):
+        return OCR()
+
+def test_run_batch_keeps_frame_order():
+    ocr = stub_ocr()
+    images = [np.full((4, 8, 3), value, dtype=np.uint8) for value in [3, 0, 7, 1, 5]]
+    results = ocr.run_batch(images)
+    assert [[r.text for r in frame_results] for frame_results in results] == [
+        ["text3"], [], ["text7"], [], ["text5"],  # text1 is below drop_score
+    ]
+    assert ocr.backend.recognized == [4]  # One recognizer call for the whole batch
+
+def test_unknown_backend_is_reported():
+    with pytest.raises(Exception, match="unknown OCR backend 'tesseract'"):
+        OCR(OCRSettings(backend="tesseract"))
+
+def test_unconfident_known_boxes_fall_back_to_detection():
+    ocr = stub_ocr()
+    images = [np.full((4, 8, 3), value, dtype=np.uint8) for value in [3, 6, 5, 2, 7]]
+    boxes = [(0, 0, 8, 4), (0, 0, 8, 4), None, (0, 0, 8, 4), (0, 0, 8, 4)]
+    with patch("glyphs.ocr.ocr.text_moved", return_value=False):
+        results = ocr.run_batch(images, boxes)
+    assert [[r.text for r in frame_results] for frame_results in results] == [
+        ["text3"], ["text6"], ["text5"], [""], ["text7"],
+    ]
+    # Only the image without a box, the unconfident one and the empty one are detected
+    assert ocr.backend.detected == [6, 5, 2]
+    assert ocr.backend.recognized == [4, 3]
+
+def test_moved_text_falls_back_to_detection():
+    ocr = stub_ocr()
+    images = [np.full((4, 8, 3), 3, dtype=np.uint8)]
+    with patch("glyphs.ocr.ocr.text_moved", return_value=True):
+        results = ocr.run_batch(images, [(0, 0, 8, 4)])
+    assert [r.text for r in results[0]] == ["text3"]
+    assert ocr.backend.detected == [3]
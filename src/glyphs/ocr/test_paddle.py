@@ -0,0 +1,18 @@
+import numpy as np
+import pytest
+
+from unittest.mock import patch
+
+from .backend import OCRSettings, load_backend
+from .paddle import color
+
+def test_missing_paddleocr_is_reported():
+    with patch("glyphs.ocr.paddle.import_error", ImportError("No module named 'paddleocr'")):
+        with pytest.raises(Exception, match="cannot import PaddleOCR"):
+            load_backend(OCRSettings())
+
+def test_grayscale_images_are_expanded_to_color():
+    gray = np.arange(12, dtype=np.uint8).reshape(3, 4)
+    assert np.array_equal(color(gray), np.stack([gray] * 3, axis=2))
+    bgr = np.zeros((3, 4, 3), dtype=np.uint8)
+    assert color(bgr) is bgr
@@ -0,0 +1,6 @@
+from .batch import collect_batch
+from .chunks import ChunkTiming, plan_chunks
+from .feedback import FilterFeedback
+from .live import ReorderBuffer, latency_percentiles
+from .ring import FrameRing
+from .supervisor import Supervisor, Worker, WorkerStatus
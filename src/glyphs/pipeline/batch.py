@@ -0,0 +1,29 @@
+import queue
+import time
+
+from .ring import FrameRing
+
+def collect_batch(ring: FrameRing, size: int, latency: float) -> tuple[list, bool]:
+    """Gathers up to `size` frames from the ring for a single OCR call.
+
+    Blocks until the first frame arrives, then waits at most `latency` seconds
+    for the rest of the batch. Returns the batch and whether the ring is
+    finished.
+    """
+    item = ring.get()
+    if item is None:
+        return [], True
+    batch = [item]
+    deadline = time.monotonic() + latency
+    while len(batch) < size:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            item = ring.get(timeout=remaining)
+        except queue.Empty:
+            break
+        if item is None:
+            return batch, True
+        batch.append(item)
+    return batch, False
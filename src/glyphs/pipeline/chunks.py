@@ -0,0 +1,38 @@
+from dataclasses import dataclass
+
+@dataclass
+class ChunkTiming:
+    """How long a decoder spent on a chunk, for reporting the load balance."""
+    chunk: int
+    decoder: int
+    start: int
+    stop: int | None
+    submitted: int  # Frames selected, including those without text
+    seconds: float  # Time spent decoding and selecting frames
+    gated: int = 0  # Frames the TextGate found no text in, which skipped OCR
+    video: int = 0  # Index of the video among those processed together
+
+def plan_chunks(num_frames: int, size: int, keyframes: list[int] | None = None) -> list[tuple[int, int | None]]:
+    """Splits the frames of a video into closed-open chunks of about `size` frames.
+
+    Decoders take chunks from a shared queue, so a worker which finishes a
+    quiet stretch of the video early moves on to the next chunk instead of
+    sitting idle. When the `keyframes` of the video are known, every chunk
+    starts on a keyframe so seeking to it does not decode any earlier frames.
+    Keyframe intervals are merged until a chunk holds at least `size` frames.
+
+    `num_frames` is only an estimate, so the last chunk has no end (None) and
+    is read until the end of the video. A chunk which starts past the real
+    end is simply empty.
+
+    Example: plan_chunks(10, 4) -> [(0, 4), (4, 8), (8, None)]
+    """
+    if keyframes:
+        num_frames = max(num_frames, keyframes[-1] + 1)
+        starts = [0]
+        for keyframe in sorted(set(keyframes)):
+            if keyframe - starts[-1] >= size:
+                starts.append(keyframe)
+    else:
+        starts = list(range(0, max(num_frames, 1), size))
+    return list(zip(starts, starts[1:] + [None]))
@@ -0,0 +1,74 @@
+import math
+import multiprocessing
+
+class FilterFeedback:
+    """Shares the text box of the latest OCR result with a decoder process.
+
+    OCR runs in other processes, so a decoder's FrameSelector learns about
+    text boxes asynchronously. The writer bumps a version number after each
+    update, which lets the decoder poll for changes on every frame without
+    taking the lock.
+
+    A decoder may work through several videos, one chunk at a time, so frames
+    are ordered by (video, frame_number).
+    """
+
+    def __init__(self):
+        # version, video, frame_number, single_line, min_x, min_y, max_x, max_y
+        self.__box = multiprocessing.Array('d', 8)
+        self.__frame = (-1, -1)  # Writer: (video, frame_number) of the published box
+        self.__version = 0  # Reader: version of the applied box
+        self.__applied_frame_number = None  # Reader: frame of the applied box
+        self.__applied_single_line = False
+        self.__start = (0, 0)  # Reader: (video, first frame) of the current chunk
+
+    def publish(self, frame_number: int, box, single_line: bool = False, video: int = 0):
+        """Publishes the box of `frame_number`, or None if it had no text.
+
+        `single_line` tells whether the box is that of a single OCR result
+        rather than the union of several. Results may arrive out of order,
+        so boxes older than the last published one are ignored.
+        """
+        if (video, frame_number) <= self.__frame:
+            return
+        self.__frame = (video, frame_number)
+        with self.__box.get_lock():
+            self.__box[1] = video
+            self.__box[2] = frame_number
+            self.__box[3] = single_line and box is not None
+            self.__box[4:] = box if box is not None else [math.nan] * 4
+            self.__box[0] += 1
+
+    def reset(self, start: int, video: int = 0):
+        """Starts a new chunk of frames at `start` of `video`. Boxes of
+        earlier frames, which belong to the decoder's previous chunk, are no
+        longer applied."""
+        self.__start = (video, start)
+        self.__applied_frame_number = None
+        self.__applied_single_line = False
+
+    def apply(self, frame_selector):
+        """Updates the filter of `frame_selector` if a new box was published."""
+        if self.__box.get_obj()[0] == self.__version:
+            return
+        with self.__box.get_lock():
+            self.__version, video, frame_number, single_line, *box = self.__box[:]
+        if (video, frame_number) < self.__start:
+            return
+        self.__applied_frame_number = int(frame_number)
+        self.__applied_single_line = bool(single_line)
+        if math.isnan(box[0]):
+            frame_selector.remove_filter()
+        else:
+            frame_selector.add_filter(*box)
+
+    def known_box(self, frame_selector, frame_number: int):
+        """Returns the filter of `frame_selector` if it is the single-line box
+        found on `frame_number` of the current video, or None.
+
+        A box from an older frame, or one merged from several results, may
+        not describe the current text, so it must not be reused for OCR.
+        """
+        if self.__applied_frame_number != frame_number or not self.__applied_single_line:
+            return None
+        return frame_selector.region()
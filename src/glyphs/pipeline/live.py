@@ -0,0 +1,67 @@
+import numpy as np
+
+from collections import deque
+
+class ReorderBuffer:
+    """Puts the OCR results of a live stream's frames back in the order the
+    frames were read, within a latency budget.
+
+    Results arrive out of order from several OCR processes, but subtitles
+    must be built from frames in order, so a result waits for those of the
+    frames before it. A frame whose result is not back `latency` seconds
+    after it was read is skipped, so one slow or lost OCR call delays the
+    subtitles by at most the budget. Frames dropped before OCR, for example
+    because the OCR processes are behind, are skipped at once.
+    """
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.late = 0  # Frames skipped because their result took too long
+        self.__order = deque()  # Frame numbers, in the order they were read
+        self.__read_at = {}  # Time each pending frame was read
+        self.__results = {}  # Results which arrived, by frame number
+        self.__dropped = set()
+
+    def add(self, frame_number: int, read_at: float):
+        """Adds a frame which was read at `read_at` and waits for its result."""
+        self.__order.append(frame_number)
+        self.__read_at[frame_number] = read_at
+
+    def drop(self, frame_number: int):
+        """Skips a frame which will not get a result."""
+        if frame_number in self.__read_at:
+            self.__dropped.add(frame_number)
+
+    def deliver(self, frame_number: int, result):
+        """Records the result of a frame, unless it was already skipped."""
+        if frame_number in self.__read_at:
+            self.__results[frame_number] = result
+
+    def release(self, now: float) -> list[tuple[int, float, object]]:
+        """Returns the (frame number, time read, result) of the frames whose
+        results can be used now, in order."""
+        released = []
+        while self.__order:
+            frame_number = self.__order[0]
+            if frame_number in self.__results:
+                released.append((frame_number, self.__read_at[frame_number], self.__results.pop(frame_number)))
+            elif frame_number in self.__dropped:
+                self.__dropped.discard(frame_number)
+            elif now - self.__read_at[frame_number] > self.latency:
+                self.late += 1
+            else:
+                break
+            self.__order.popleft()
+            del self.__read_at[frame_number]
+        return released
+
+    def __len__(self) -> int:
+        return len(self.__order)
+
+def latency_percentiles(latencies: list[float]) -> dict[str, float]:
+    """Summarizes latencies in seconds by their median, 90th and 99th
+    percentiles and maximum, or returns {} without any."""
+    if len(latencies) == 0:
+        return {}
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    return {"p50": float(p50), "p90": float(p90), "p99": float(p99), "max": float(max(latencies))}
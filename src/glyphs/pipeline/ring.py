@@ -0,0 +1,66 @@
+import multiprocessing
+import numpy as np
+import queue
+
+from multiprocessing import shared_memory
+
+class FrameRing:
+    """A bounded pool of shared memory slots for handing frames between processes.
+
+    Producers copy a frame into a free slot and enqueue only the slot index,
+    shape and metadata, so the pixels themselves are never pickled. Consumers
+    copy the frame out and immediately return the slot to the free list. When
+    every slot is in use, producers block, which bounds the memory in flight
+    and applies backpressure to the decoders.
+
+    The ring is shared by passing it to `multiprocessing.Process` as an
+    argument. The creating process is responsible for calling `close()`.
+    """
+
+    def __init__(self, slots: int, slot_bytes: int):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.__memory = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        self.__free = multiprocessing.Queue()
+        self.__ready = multiprocessing.Queue()
+        for slot in range(slots):
+            self.__free.put(slot)
+
+    def __view(self, slot: int, shape, dtype) -> np.ndarray:
+        return np.ndarray(shape, dtype, buffer=self.__memory.buf, offset=slot * self.slot_bytes)
+
+    def put(self, frame: np.ndarray, metadata, block: bool = True) -> bool:
+        """Copies `frame` into a free slot, blocking until one is available.
+        Without `block`, returns False instead of waiting when every slot is
+        in use."""
+        if frame.nbytes > self.slot_bytes:
+            raise Exception(f"frame of {frame.nbytes} bytes does not fit in a {self.slot_bytes} byte slot")
+        try:
+            slot = self.__free.get(block=block)
+        except queue.Empty:
+            return False
+        self.__view(slot, frame.shape, frame.dtype)[...] = frame
+        self.__ready.put((slot, frame.shape, frame.dtype.str, metadata))
+        return True
+
+    def get(self, timeout: float | None = None):
+        """Returns the next (frame, metadata) pair, or None once the ring is finished.
+
+        Raises `queue.Empty` if `timeout` expires first.
+        """
+        item = self.__ready.get(timeout=timeout)
+        if item is None:
+            return None
+        slot, shape, dtype, metadata = item
+        frame = self.__view(slot, shape, dtype).copy()
+        self.__free.put(slot)
+        return frame, metadata
+
+    def finish(self, consumers: int):
+        """Signals each of the `consumers` that no more frames will be produced."""
+        for _ in range(consumers):
+            self.__ready.put(None)
+
+    def close(self):
+        self.__memory.close()
+        self.__memory.unlink()
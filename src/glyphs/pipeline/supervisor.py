@@ -0,0 +1,109 @@
+import contextlib
+import multiprocessing
+import time
+
+from dataclasses import dataclass
+
+# Seconds between updates of a worker's progress.
+PROGRESS_INTERVAL = 0.25
+
+class WorkerStatus:
+    """The progress and liveness of one worker process, shared without a lock.
+
+    Only the worker writes and only the collector reads, and aligned doubles
+    are written atomically, so neither side takes a lock. The worker
+    publishes its progress at most every `interval` seconds, and each update
+    also shows that it is alive. While it blocks waiting for work or for
+    room to hand work on, it is marked as waiting, since a long wait there
+    is not a stall of its own.
+    """
+
+    def __init__(self, interval: float = PROGRESS_INTERVAL):
+        # progress, time of the last update, waiting
+        self.__values = multiprocessing.RawArray('d', [0, time.monotonic(), 0])
+        self.__interval = interval
+        self.__updated = 0  # Worker: time of the last published update
+
+    def update(self, progress: float, force: bool = False):
+        """Publishes `progress` unless it was published less than `interval`
+        seconds ago. `force` publishes it anyway."""
+        now = time.monotonic()
+        if force or now - self.__updated >= self.__interval:
+            self.__values[0] = progress
+            self.__values[1] = now
+            self.__updated = now
+
+    @contextlib.contextmanager
+    def waiting(self):
+        """Marks the worker as waiting, not stalled, while it blocks."""
+        self.__values[2] = 1
+        try:
+            yield
+        finally:
+            self.__values[1] = time.monotonic()
+            self.__values[2] = 0
+
+    def progress(self) -> float:
+        return self.__values[0]
+
+    def stalled(self, timeout: float) -> bool:
+        """Checks whether the worker has been busy for more than `timeout`
+        seconds without an update."""
+        return self.__values[2] == 0 and time.monotonic() - self.__values[1] > timeout
+
+@dataclass
+class Worker:
+    name: str  # Such as "decoder 2"
+    process: multiprocessing.Process
+    status: WorkerStatus
+
+class Supervisor:
+    """Watches worker processes for ones which die or stall.
+
+    A worker which exits with code 0 has finished its work. One which exits
+    with another code, for example because it was killed for running out of
+    memory, has failed, and so has one which stalls for more than
+    `stall_timeout` seconds, which is terminated. The caller decides how to
+    redo the work of failed workers and whether to replace them.
+    """
+
+    def __init__(self, stall_timeout: float):
+        self.stall_timeout = stall_timeout
+        self.workers: list[Worker] = []  # Workers which are running
+        self.started: list[Worker] = []
+
+    def start(self, worker: Worker):
+        worker.process.start()
+        self.workers.append(worker)
+        self.started.append(worker)
+
+    def failures(self) -> list[tuple[Worker, str]]:
+        """Returns the workers which failed since the last call, with the
+        reason, and stops watching them and the workers which finished."""
+        failed = []
+        for worker in list(self.workers):
+            code = worker.process.exitcode
+            if code == 0:
+                self.workers.remove(worker)
+                continue
+            if code is not None:
+                reason = f"exited with code {code}"
+            elif worker.status.stalled(self.stall_timeout):
+                worker.process.terminate()
+                worker.process.join()
+                reason = f"stalled for more than {self.stall_timeout:g}s"
+            else:
+                continue
+            self.workers.remove(worker)
+            failed.append((worker, reason))
+        return failed
+
+    def terminate(self):
+        for worker in self.started:
+            if worker.process.exitcode is None:
+                worker.process.terminate()
+        self.workers = []
+
+    def join(self):
+        for worker in self.started:
+            worker.process.join()
@@ -0,0 +1,46 @@
+import numpy as np
+
+from .batch import collect_batch
+from .ring import FrameRing
+
+def make_ring(frames):
+    ring = FrameRing(slots=max(1, frames), slot_bytes=8)
+    for i in range(frames):
+        ring.put(np.full(8, i, dtype=np.uint8), i)
+    return ring
+
+def test_collect_batch_stops_at_size():
+    ring = make_ring(5)
+    try:
+        batch, finished = collect_batch(ring, size=3, latency=1)
+        assert [metadata for _, metadata in batch] == [0, 1, 2]
+        assert not finished
+    finally:
+        ring.close()
+
+def test_collect_batch_stops_at_latency():
+    ring = make_ring(2)
+    try:
+        batch, finished = collect_batch(ring, size=8, latency=0.05)
+        assert [metadata for _, metadata in batch] == [0, 1]
+        assert not finished
+    finally:
+        ring.close()
+
+def test_collect_batch_when_finished():
+    ring = make_ring(1)
+    ring.finish(1)
+    try:
+        batch, finished = collect_batch(ring, size=8, latency=1)
+        assert [metadata for _, metadata in batch] == [0]
+        assert finished
+    finally:
+        ring.close()
+
+def test_collect_batch_when_empty_and_finished():
+    ring = make_ring(0)
+    ring.finish(1)
+    try:
+        assert collect_batch(ring, size=8, latency=1) == ([], True)
+    finally:
+        ring.close()
@@ -0,0 +1,24 @@
+import pytest
+
+from .chunks import plan_chunks
+
+@pytest.mark.parametrize("num_frames,size,want", [
+    (10, 4, [(0, 4), (4, 8), (8, None)]),
+    (8, 4, [(0, 4), (4, None)]),
+    (3, 4, [(0, None)]),
+    (0, 4, [(0, None)]),  # Unknown length
+])
+def test_fixed_size_chunks(num_frames, size, want):
+    assert plan_chunks(num_frames, size) == want
+
+def test_chunks_start_on_keyframes():
+    keyframes = [0, 30, 60, 75, 120, 250, 260]
+    assert plan_chunks(280, 50, keyframes) == [(0, 60), (60, 120), (120, 250), (250, None)]
+
+def test_keyframes_extend_wrong_estimate():
+    assert plan_chunks(0, 50, [0, 60, 120]) == [(0, 60), (60, 120), (120, None)]
+
+def test_chunks_cover_every_frame():
+    chunks = plan_chunks(1000, 64, list(range(0, 1000, 48)))
+    assert chunks[0][0] == 0 and chunks[-1][1] is None
+    assert all(a[1] == b[0] for a, b in zip(chunks, chunks[1:]))
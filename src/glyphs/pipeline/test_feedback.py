@@ -0,0 +1,74 @@
+from ..frame_selector import FrameSelector
+from .feedback import FilterFeedback
+
+def test_published_box_is_applied():
+    feedback = FilterFeedback()
+    selector = FrameSelector()
+    feedback.publish(10, (1, 2, 30, 40))
+    feedback.apply(selector)
+    assert selector.region() == (1, 2, 30, 40)
+
+def test_stale_box_is_dropped():
+    feedback = FilterFeedback()
+    selector = FrameSelector()
+    feedback.publish(10, (1, 2, 30, 40))
+    feedback.publish(5, (0, 0, 8, 8))
+    feedback.apply(selector)
+    assert selector.region() == (1, 2, 30, 40)
+
+def test_frame_without_text_removes_filter():
+    feedback = FilterFeedback()
+    selector = FrameSelector()
+    selector.add_filter(1, 2, 30, 40)
+    feedback.publish(10, None)
+    feedback.apply(selector)
+    assert selector.region() is None
+
+def test_box_is_applied_once():
+    feedback = FilterFeedback()
+    selector = FrameSelector()
+    feedback.publish(10, (1, 2, 30, 40))
+    feedback.apply(selector)
+    selector.remove_filter()
+    feedback.apply(selector)  # No new box, so the filter is left alone
+    assert selector.region() is None
+
+def test_known_box_is_single_line_box_of_frame():
+    feedback = FilterFeedback()
+    selector = FrameSelector()
+    feedback.publish(10, (1, 2, 30, 40), single_line=True)
+    feedback.apply(selector)
+    assert feedback.known_box(selector, 10) == (1, 2, 30, 40)
+    assert feedback.known_box(selector, 9) is None  # Box of another frame
+
+def test_merged_box_is_not_known():
+    feedback = FilterFeedback()
+    selector = FrameSelector()
+    feedback.publish(10, (1, 2, 30, 40), single_line=False)
+    feedback.apply(selector)
+    assert selector.region() == (1, 2, 30, 40)
+    assert feedback.known_box(selector, 10) is None
+
+def test_box_of_previous_chunk_is_not_applied():
+    feedback = FilterFeedback()
+    selector = FrameSelector()
+    feedback.reset(100)
+    feedback.publish(40, (1, 2, 30, 40), single_line=True)
+    feedback.apply(selector)
+    assert selector.region() is None
+    feedback.publish(120, (5, 6, 30, 40), single_line=True)
+    feedback.apply(selector)
+    assert selector.region() == (5, 6, 30, 40)
+
+def test_next_video_restarts_frame_numbers():
+    feedback = FilterFeedback()
+    selector = FrameSelector()
+    feedback.publish(900, (1, 2, 30, 40), video=0)
+    feedback.reset(0, video=1)
+    feedback.publish(10, (5, 6, 30, 40), single_line=True, video=1)
+    feedback.apply(selector)
+    assert selector.region() == (5, 6, 30, 40)
+    assert feedback.known_box(selector, 10) == (5, 6, 30, 40)
+    feedback.publish(950, (0, 0, 8, 8), video=0)  # Late result of the previous video
+    feedback.apply(selector)
+    assert selector.region() == (5, 6, 30, 40)
@@ -0,0 +1,40 @@
+import pytest
+
+from .live import ReorderBuffer, latency_percentiles
+
+def test_results_are_released_in_order():
+    buffer = ReorderBuffer(latency=1)
+    for frame_number in [3, 5, 8]:
+        buffer.add(frame_number, read_at=0)
+    buffer.deliver(5, "b")
+    assert buffer.release(now=0.1) == []  # Waits for frame 3
+    buffer.deliver(3, "a")
+    assert buffer.release(now=0.2) == [(3, 0, "a"), (5, 0, "b")]
+    assert len(buffer) == 1
+
+def test_late_frames_are_skipped():
+    buffer = ReorderBuffer(latency=1)
+    buffer.add(3, read_at=0)
+    buffer.add(5, read_at=0.5)
+    buffer.deliver(5, "b")
+    assert buffer.release(now=0.9) == []
+    assert buffer.release(now=1.1) == [(5, 0.5, "b")]
+    assert buffer.late == 1
+    buffer.deliver(3, "a")  # Too late to be used
+    assert buffer.release(now=1.2) == []
+
+def test_dropped_frames_are_skipped_at_once():
+    buffer = ReorderBuffer(latency=1)
+    buffer.add(3, read_at=0)
+    buffer.add(5, read_at=0)
+    buffer.drop(3)
+    buffer.deliver(5, "b")
+    assert buffer.release(now=0) == [(5, 0, "b")]
+    assert buffer.late == 0 and len(buffer) == 0
+
+def test_latency_percentiles():
+    summary = latency_percentiles([float(i) for i in range(1, 101)])
+    assert summary["p50"] == pytest.approx(50.5)
+    assert summary["p90"] == pytest.approx(90.1)
+    assert summary["max"] == 100
+    assert latency_percentiles([]) == {}
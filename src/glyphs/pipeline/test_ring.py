@@ -0,0 +1,67 @@
+import multiprocessing
+import numpy as np
+import pytest
+import queue
+import time
+
+from .ring import FrameRing
+
+def produce(ring, count):
+    for i in range(count):
+        ring.put(np.full((4, 8, 3), i, dtype=np.uint8), i)
+    ring.finish(1)
+
+def test_ring_round_trip():
+    ring = FrameRing(slots=2, slot_bytes=4 * 8 * 3)
+    try:
+        ring.put(np.arange(96, dtype=np.uint8).reshape(4, 8, 3), "metadata")
+        frame, metadata = ring.get(timeout=1)
+        assert metadata == "metadata"
+        assert np.array_equal(frame, np.arange(96, dtype=np.uint8).reshape(4, 8, 3))
+    finally:
+        ring.close()
+
+def test_put_without_blocking_fails_when_the_ring_is_full():
+    ring = FrameRing(slots=1, slot_bytes=4)
+    try:
+        assert ring.put(np.zeros(4, dtype=np.uint8), 0)
+        assert not ring.put(np.ones(4, dtype=np.uint8), 1, block=False)
+        assert ring.get(timeout=1)[1] == 0
+        # The slot is back once the queue's feeder thread has returned it.
+        assert any(ring.put(np.ones(4, dtype=np.uint8), 1, block=False) or time.sleep(0.01) for _ in range(100))
+        assert ring.get(timeout=1)[1] == 1
+    finally:
+        ring.close()
+
+def test_ring_rejects_oversized_frames():
+    ring = FrameRing(slots=1, slot_bytes=16)
+    try:
+        with pytest.raises(Exception):
+            ring.put(np.zeros(17, dtype=np.uint8), None)
+    finally:
+        ring.close()
+
+def test_ring_get_times_out_when_empty():
+    ring = FrameRing(slots=1, slot_bytes=16)
+    try:
+        with pytest.raises(queue.Empty):
+            ring.get(timeout=0.01)
+    finally:
+        ring.close()
+
+def test_ring_across_processes():
+    # More frames than slots, so the producer must wait for slots to be freed.
+    count = 20
+    ring = FrameRing(slots=3, slot_bytes=4 * 8 * 3)
+    producer = multiprocessing.Process(target=produce, args=(ring, count))
+    producer.start()
+    try:
+        received = []
+        while (item := ring.get(timeout=10)) is not None:
+            frame, metadata = item
+            assert (frame == metadata).all()
+            received.append(metadata)
+        assert received == list(range(count))
+    finally:
+        producer.join()
+        ring.close()
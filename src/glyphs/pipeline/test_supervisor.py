@@ -0,0 +1,63 @@
+import multiprocessing
+import sys
+import time
+
+from .supervisor import Supervisor, Worker, WorkerStatus
+
+def start(supervisor: Supervisor, target, *args) -> Worker:
+    status = WorkerStatus(interval=0)
+    worker = Worker("worker", multiprocessing.Process(target=target, args=(status, *args), daemon=True), status)
+    supervisor.start(worker)
+    return worker
+
+def finish(status, code):
+    sys.exit(code)
+
+def hang(status, waiting):
+    if waiting:
+        with status.waiting():
+            time.sleep(60)
+    time.sleep(60)
+
+def wait_for_failures(supervisor: Supervisor, timeout: float = 10) -> list:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        failures = supervisor.failures()
+        if failures or not supervisor.workers:
+            return failures
+        time.sleep(0.05)
+    return []
+
+def test_finished_worker_is_not_a_failure():
+    supervisor = Supervisor(stall_timeout=60)
+    start(supervisor, finish, 0)
+    assert wait_for_failures(supervisor) == []
+    assert supervisor.workers == []
+
+def test_crashed_worker_is_a_failure():
+    supervisor = Supervisor(stall_timeout=60)
+    worker = start(supervisor, finish, 3)
+    assert wait_for_failures(supervisor) == [(worker, "exited with code 3")]
+    assert supervisor.workers == []
+
+def test_stalled_worker_is_terminated():
+    supervisor = Supervisor(stall_timeout=0.2)
+    worker = start(supervisor, hang, False)
+    assert wait_for_failures(supervisor) == [(worker, "stalled for more than 0.2s")]
+    assert worker.process.exitcode is not None
+
+def test_waiting_worker_is_not_stalled():
+    supervisor = Supervisor(stall_timeout=0.2)
+    start(supervisor, hang, True)
+    time.sleep(0.5)
+    assert supervisor.failures() == []
+    supervisor.terminate()
+    supervisor.join()
+
+def test_updates_are_published_at_most_once_per_interval():
+    status = WorkerStatus(interval=60)
+    status.update(1)
+    status.update(2)
+    assert status.progress() == 1
+    status.update(3, force=True)
+    assert status.progress() == 3
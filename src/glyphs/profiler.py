@@ -0,0 +1,140 @@
+import contextlib
+import json
+import os
+import time
+
+from collections import Counter
+from dataclasses import dataclass, field
+
+# Spans kept per process for the trace. Stage totals keep counting past it.
+MAX_TRACE_SPANS = 200_000
+
+@dataclass
+class StageTotal:
+    """Time spent in one stage of a process."""
+    calls: int = 0
+    seconds: float = 0
+
+@dataclass
+class ProfileReport:
+    """The timers and counters of one process, sent to the collector when
+    the process is done."""
+    process: str  # Name of the process, such as "decoder 0"
+    pid: int
+    stages: dict[str, StageTotal] = field(default_factory=dict)
+    counters: Counter = field(default_factory=Counter)
+    spans: list[tuple[str, float, float]] = field(default_factory=list)  # (stage, start, seconds)
+    dropped_spans: int = 0  # Spans left out of the trace past MAX_TRACE_SPANS
+
+class Profiler:
+    """Times the stages of a process and counts what it processed.
+
+    A disabled profiler does nothing, so the pipeline can call it on every
+    frame. Span start times are relative to `origin`, a `time.perf_counter()`
+    value of the parent process; the clock is system-wide on Linux, so the
+    spans of all the workers line up in one timeline.
+    """
+
+    def __init__(self, process: str, enabled: bool = True, origin: float | None = None):
+        self.enabled = enabled
+        self.origin = time.perf_counter() if origin is None else origin
+        self.report = ProfileReport(process, os.getpid())
+
+    @contextlib.contextmanager
+    def __timed(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            total = self.report.stages.setdefault(stage, StageTotal())
+            total.calls += 1
+            total.seconds += seconds
+            if len(self.report.spans) < MAX_TRACE_SPANS:
+                self.report.spans.append((stage, start - self.origin, seconds))
+            else:
+                self.report.dropped_spans += 1
+
+    def span(self, stage: str):
+        """Returns a context manager which times a call of `stage`."""
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self.__timed(stage)
+
+    def iterate(self, stage: str, iterable):
+        """Yields the items of `iterable`, timing each step as `stage`."""
+        iterator = iter(iterable)
+        if not self.enabled:
+            yield from iterator
+            return
+        end = object()
+        while True:
+            with self.span(stage):
+                item = next(iterator, end)
+            if item is end:
+                return
+            yield item
+
+    def count(self, name: str, n: int = 1):
+        if self.enabled:
+            self.report.counters[name] += n
+
+# Used where profiling is off, to leave the timed code unchanged.
+NO_PROFILER = Profiler("disabled", enabled=False)
+
+def aggregate(reports: list[ProfileReport], wall_seconds: float) -> dict:
+    """Sums the stages and counters of every process, keeping the totals of
+    each process too."""
+    stages: dict[str, StageTotal] = {}
+    counters = Counter()
+    for report in reports:
+        for stage, total in report.stages.items():
+            summed = stages.setdefault(stage, StageTotal())
+            summed.calls += total.calls
+            summed.seconds += total.seconds
+        counters.update(report.counters)
+    stage_dict = lambda stages: {
+        stage: {"calls": total.calls, "seconds": round(total.seconds, 6)}
+        for stage, total in sorted(stages.items(), key=lambda item: -item[1].seconds)
+    }
+    return {
+        "wall_seconds": round(wall_seconds, 6),
+        "stages": stage_dict(stages),
+        "counters": dict(sorted(counters.items())),
+        "processes": [
+            {
+                "process": report.process,
+                "pid": report.pid,
+                "stages": stage_dict(report.stages),
+                "counters": dict(sorted(report.counters.items())),
+                "dropped_spans": report.dropped_spans,
+            }
+            for report in reports
+        ],
+    }
+
+def chrome_trace(reports: list[ProfileReport]) -> dict:
+    """Returns the spans in the Chrome trace event format, which Perfetto
+    and chrome://tracing open as a timeline with one track per process."""
+    events = []
+    for report in reports:
+        events.append({"name": "process_name", "ph": "M", "pid": report.pid, "args": {"name": report.process}})
+        for stage, start, seconds in report.spans:
+            events.append({
+                "name": stage,
+                "ph": "X",
+                "pid": report.pid,
+                "tid": report.pid,
+                "ts": round(start * 1e6, 3),
+                "dur": round(seconds * 1e6, 3),
+            })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+def write_profile(prefix: str, reports: list[ProfileReport], wall_seconds: float) -> tuple[str, str]:
+    """Writes the totals to `<prefix>.json` and the timeline to
+    `<prefix>.trace.json`, returning both paths."""
+    paths = (f"{prefix}.json", f"{prefix}.trace.json")
+    for path, content in zip(paths, [aggregate(reports, wall_seconds), chrome_trace(reports)]):
+        with open(path, "w") as f:
+            json.dump(content, f, indent=1 if path == paths[0] else None)
+    return paths
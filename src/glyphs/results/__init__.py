@@ -0,0 +1 @@
+from .results import FrameResults, ResultsRecorder, bounding_box, load_results, merge_text, result_boxes
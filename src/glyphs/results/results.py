@@ -0,0 +1,139 @@
+import numpy as np
+import os
+
+from dataclasses import dataclass
+from typing import Iterator
+
+from glyphs.timestamp import timestamp
+
+# Bumped whenever the format or meaning of results files changes.
+RESULTS_VERSION = 1
+
+def result_boxes(results) -> np.ndarray:
+    """The corners of the bounding boxes of OCR results, as an (n, points, 2) array."""
+    if len(results) == 0:
+        return np.empty((0, 4, 2))
+    return np.array(
+        [[(point.x, point.y) for point in result.bounding_box] for result in results],
+        dtype=np.float64,
+    ).reshape(len(results), -1, 2)
+
+def merge_text(texts, boxes: np.ndarray) -> str:
+    """Joins the texts of the results of a frame in left to right reading
+    order, by the mean x of the corners of their `boxes`. Results without a
+    box (NaN) keep their order."""
+    if len(texts) == 0:
+        return ""
+    centers = np.nan_to_num(boxes[..., 0].mean(axis=1), nan=0.0)
+    return "".join(texts[i] for i in np.argsort(centers, kind="stable"))
+
+def bounding_box(boxes: np.ndarray) -> tuple[float, float, float, float]:
+    """The box (min_x, min_y, max_x, max_y) around all of `boxes`."""
+    points = boxes.reshape(-1, 2)
+    min_x, min_y = points.min(axis=0)
+    max_x, max_y = points.max(axis=0)
+    return min_x, min_y, max_x, max_y
+
+@dataclass
+class FrameResults:
+    """The OCR results of the frames of a video, as columns.
+
+    The results of frame `i` are the rows `offsets[i]:offsets[i + 1]` of
+    `boxes`, `confidences` and `texts`. Frames without text have no rows.
+    """
+    frame_numbers: np.ndarray  # int64, one per frame
+    times: np.ndarray  # int64 microseconds, one per frame
+    offsets: np.ndarray  # int64, one per frame and one more
+    boxes: np.ndarray  # float32 (results, 4, 2) corners in frame coordinates, NaN when unknown
+    confidences: np.ndarray  # float64, one per result
+    texts: np.ndarray  # str, one per result
+
+    def __len__(self) -> int:
+        return len(self.frame_numbers)
+
+    def frames(self) -> Iterator[tuple[int, timestamp, str, float]]:
+        """Yields the (frame number, time, merged text, confidence) of each
+        frame in order, like the results of OCR on it."""
+        for i in range(len(self)):
+            start, stop = self.offsets[i], self.offsets[i + 1]
+            texts = self.texts[start:stop]
+            confidence = float(self.confidences[start:stop].min()) if stop > start else 1.0
+            yield (
+                int(self.frame_numbers[i]),
+                timestamp(microseconds=int(self.times[i])),
+                merge_text(texts, self.boxes[start:stop]),
+                confidence,
+            )
+
+class ResultsRecorder:
+    """Collects the OCR results of the frames of a video in order, and saves
+    them as a compressed .npz file."""
+
+    def __init__(self):
+        self.__frame_numbers = []
+        self.__times = []
+        self.__offsets = [0]
+        self.__boxes = []
+        self.__confidences = []
+        self.__texts = []
+
+    def add(self, frame_number: int, time: timestamp, results):
+        """Records the OCR `results` of a frame, with their boxes in frame coordinates."""
+        self.__frame_numbers.append(frame_number)
+        self.__times.append(time // timestamp(microseconds=1))
+        if len(results) > 0:
+            self.__boxes.append(result_boxes(results))
+        self.__confidences += [result.confidence for result in results]
+        self.__texts += [result.text for result in results]
+        self.__offsets.append(len(self.__texts))
+
+    def add_text(self, frame_number: int, time: timestamp, text: str, confidence: float):
+        """Records a frame whose results are only known merged, such as one
+        resumed from a checkpoint, as one result without a box."""
+        self.__frame_numbers.append(frame_number)
+        self.__times.append(time // timestamp(microseconds=1))
+        if text != "":
+            self.__boxes.append(np.full((1, 4, 2), np.nan))
+            self.__confidences.append(confidence)
+            self.__texts.append(text)
+        self.__offsets.append(len(self.__texts))
+
+    def table(self) -> FrameResults:
+        return FrameResults(
+            frame_numbers = np.array(self.__frame_numbers, dtype=np.int64),
+            times = np.array(self.__times, dtype=np.int64),
+            offsets = np.array(self.__offsets, dtype=np.int64),
+            boxes = np.concatenate(self.__boxes).astype(np.float32) if self.__boxes else np.empty((0, 4, 2), np.float32),
+            confidences = np.array(self.__confidences, dtype=np.float64),
+            texts = np.array(self.__texts, dtype=str),
+        )
+
+    def save(self, path: str):
+        """Writes the results to `path`. The file is replaced atomically."""
+        table = self.table()
+        with open(path + ".tmp", "wb") as f:
+            np.savez_compressed(
+                f,
+                version = np.array(RESULTS_VERSION),
+                frame_numbers = table.frame_numbers,
+                times = table.times,
+                offsets = table.offsets,
+                boxes = table.boxes,
+                confidences = table.confidences,
+                texts = table.texts,
+            )
+        os.replace(path + ".tmp", path)
+
+def load_results(path: str) -> FrameResults:
+    with np.load(path, allow_pickle=False) as data:
+        version = int(data["version"])
+        if version != RESULTS_VERSION:
+            raise Exception(f"{path} has results version {version}, but glyphs reads version {RESULTS_VERSION}")
+        return FrameResults(
+            frame_numbers = data["frame_numbers"],
+            times = data["times"],
+            offsets = data["offsets"],
+            boxes = data["boxes"],
+            confidences = data["confidences"],
+            texts = data["texts"],
+        )
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from glyphs.ocr import Point, Result
+from glyphs.timestamp import timestamp
+
+from .results import ResultsRecorder, bounding_box, load_results, merge_text, result_boxes
+
+def result(text, min_x, min_y, max_x, max_y, confidence=0.9):
+    box = [Point(min_x, min_y), Point(max_x, min_y), Point(max_x, max_y), Point(min_x, max_y)]
+    return Result(bounding_box=box, confidence=confidence, text=text)
+
+def test_text_is_merged_left_to_right():
+    results = [result("world", 60, 0, 100, 10), result("hello ", 0, 0, 50, 10)]
+    assert merge_text([r.text for r in results], result_boxes(results)) == "hello world"
+    assert merge_text([], result_boxes([])) == ""
+
+def test_bounding_box_covers_every_result():
+    results = [result("a", 10, 5, 20, 15), result("b", 30, 2, 40, 12)]
+    assert bounding_box(result_boxes(results)) == (10, 2, 40, 15)
+
+def test_round_trip(tmp_path):
+    recorder = ResultsRecorder()
+    recorder.add(3, timestamp(milliseconds=120), [result("world", 60, 0, 100, 10, 0.5), result("hello ", 0, 0, 50, 10)])
+    recorder.add(7, timestamp(milliseconds=280), [])
+    recorder.add_text(9, timestamp(milliseconds=360), "你好", 0.875)
+    path = str(tmp_path / "video.ocr.npz")
+    recorder.save(path)
+    results = load_results(path)
+    assert len(results) == 3
+    assert results.boxes.shape == (3, 4, 2)
+    assert list(results.frames()) == [
+        (3, timestamp(milliseconds=120), "hello world", 0.5),
+        (7, timestamp(milliseconds=280), "", 1.0),
+        (9, timestamp(milliseconds=360), "你好", 0.875),
+    ]
+
+def test_other_version_is_rejected(tmp_path):
+    path = str(tmp_path / "video.ocr.npz")
+    ResultsRecorder().save(path)
+    with np.load(path) as data:
+        arrays = dict(data)
+    arrays["version"] = np.array(0)
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+    with pytest.raises(Exception, match="results version 0"):
+        load_results(path)
@@ -0,0 +1 @@
+from .roi import Roi, calibrate, choose_roi, crop_roi, default_roi, expand_roi, search_band
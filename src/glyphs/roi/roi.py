@@ -0,0 +1,124 @@
+import numpy as np
+
+from statistics import median
+from typing import Tuple
+
+from glyphs.video import Video, subtitle_band_height
+
+# A region of interest in frame coordinates: (min_x, min_y, max_x, max_y)
+Roi = Tuple[int, int, int, int]
+
+# Rows covered by fewer text boxes than this share of the busiest row are
+# not part of the subtitle band, which drops one-off text such as signs.
+MIN_ROW_SHARE = 0.2
+
+# Padding around the calibrated boxes, in multiples of the median line height.
+VERTICAL_PADDING_LINES = 1
+HORIZONTAL_PADDING_LINES = 4
+
+# Frames between calibration samples when the length of the video is unknown.
+UNKNOWN_LENGTH_SPACING = 250
+
+# Text boxes closer than this many pixels to an edge of the region may have
+# been cut off by it.
+EDGE_PIXELS = 2
+
+def default_roi(height: int, width: int) -> Roi:
+    """The fixed band at the bottom of the frame used without calibration."""
+    return 0, height - subtitle_band_height(height), width, height
+
+def crop_roi(image, roi: Roi):
+    min_x, min_y, max_x, max_y = roi
+    return image[min_y:max_y, min_x:max_x]
+
+def choose_roi(boxes: list[Roi], height: int, width: int) -> Roi | None:
+    """Picks a tight region around the text boxes found on a sample of frames.
+
+    A histogram counts how many boxes cover each row. The band is the run of
+    rows around the busiest one which are covered by at least MIN_ROW_SHARE
+    of its boxes, with runs less than a line apart merged so both lines of
+    two-line subtitles are kept. The columns are those of the boxes in the
+    band, and the region is padded by a multiple of the median line height.
+    Returns None without any boxes.
+    """
+    if len(boxes) == 0:
+        return None
+    rows = np.zeros(height, dtype=np.int32)
+    for _, min_y, _, max_y in boxes:
+        rows[max(0, min_y):max(0, max_y)] += 1
+    line = int(median(max_y - min_y for _, min_y, _, max_y in boxes))
+    kept = rows >= MIN_ROW_SHARE * rows.max()
+    peak = int(rows.argmax())
+    top, bottom = peak, peak + 1
+    while True:
+        above = [y for y in range(max(0, top - line), top) if kept[y]]
+        below = [y for y in range(bottom, min(height, bottom + line)) if kept[y]]
+        if not above and not below:
+            break
+        top = min(above, default=top)
+        bottom = max(below, default=bottom - 1) + 1
+
+    band = [box for box in boxes if box[1] < bottom and box[3] > top]
+    left = min(box[0] for box in band)
+    right = max(box[2] for box in band)
+    return (
+        max(0, left - HORIZONTAL_PADDING_LINES * line),
+        max(0, top - VERTICAL_PADDING_LINES * line),
+        min(width, right + HORIZONTAL_PADDING_LINES * line),
+        min(height, bottom + VERTICAL_PADDING_LINES * line),
+    )
+
+def search_band(roi: Roi, height: int, width: int) -> Roi:
+    """The largest region `roi` may grow to: the full width, and one region
+    height above and below it."""
+    min_x, min_y, max_x, max_y = roi
+    margin = max_y - min_y
+    return 0, max(0, min_y - margin), width, min(height, max_y + margin)
+
+def expand_roi(roi: Roi, boxes: list[Roi], limit: Roi) -> Roi:
+    """Grows `roi` on every side which a text box touches, since the text may
+    continue past it, without going outside `limit`."""
+    min_x, min_y, max_x, max_y = roi
+    for box_min_x, box_min_y, box_max_x, box_max_y in boxes:
+        step = box_max_y - box_min_y
+        if box_min_x - min_x <= EDGE_PIXELS:
+            min_x -= step
+        if max_x - box_max_x <= EDGE_PIXELS:
+            max_x += step
+        if box_min_y - min_y <= EDGE_PIXELS:
+            min_y -= step
+        if max_y - box_max_y <= EDGE_PIXELS:
+            max_y += step
+    limit_min_x, limit_min_y, limit_max_x, limit_max_y = limit
+    return (
+        max(min_x, limit_min_x),
+        max(min_y, limit_min_y),
+        min(max_x, limit_max_x),
+        min(max_y, limit_max_y),
+    )
+
+def calibrate(file: str, ocr, frame_count: int, samples: int) -> Roi | None:
+    """Runs OCR on `samples` frames spread over the video and picks a region
+    of interest from the text boxes found. Returns None if there was no text."""
+    if frame_count > 0:
+        positions = [int((i + 0.5) * frame_count / samples) for i in range(samples)]
+    else:
+        positions = [i * UNKNOWN_LENGTH_SPACING for i in range(samples)]
+    frames = []
+    video = Video(file, 0)
+    for position in positions:
+        video.seek(position)
+        frame = next(video, None)
+        if frame is None:  # Past the end of the video
+            break
+        frames.append(frame)
+    if len(frames) == 0:
+        return None
+    height, width = frames[0].shape[:2]
+    boxes = []
+    for frame_results in ocr.run_batch(frames):
+        for result in frame_results:
+            xs = [point.x for point in result.bounding_box]
+            ys = [point.y for point in result.bounding_box]
+            boxes.append((int(min(xs)), int(min(ys)), int(max(xs)) + 1, int(max(ys)) + 1))
+    return choose_roi(boxes, height, width)
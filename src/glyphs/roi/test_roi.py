@@ -0,0 +1,72 @@
+import cv2
+import numpy as np
+
+from glyphs.ocr import Point, Result
+
+from .roi import calibrate, choose_roi, crop_roi, default_roi, expand_roi, search_band
+
+HEIGHT, WIDTH = 1080, 1920
+
+def test_default_roi_matches_fixed_crop():
+    assert default_roi(HEIGHT, WIDTH) == (0, 877, WIDTH, HEIGHT)
+
+def test_crop_roi():
+    image = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+    assert crop_roi(image, (10, 20, 110, 70)).shape == (50, 100, 3)
+
+def test_choose_roi_is_tight_around_subtitles():
+    boxes = [(700, 960, 1200, 1000), (600, 962, 1300, 1002), (800, 958, 1100, 998)]
+    min_x, min_y, max_x, max_y = choose_roi(boxes, HEIGHT, WIDTH)
+    assert (min_y, max_y) == (918, 1042)  # One line of padding
+    assert min_x == 600 - 4 * 40 and max_x == 1300 + 4 * 40
+
+def test_choose_roi_ignores_one_off_text():
+    subtitles = [(700, 960, 1200, 1000)] * 8
+    sign = [(100, 100, 300, 140)]
+    _, min_y, _, _ = choose_roi(subtitles + sign, HEIGHT, WIDTH)
+    assert min_y > 900
+
+def test_choose_roi_keeps_both_lines():
+    first = [(700, 900, 1200, 940)] * 3
+    second = [(700, 960, 1200, 1000)] * 5
+    _, min_y, _, max_y = choose_roi(first + second, HEIGHT, WIDTH)
+    assert min_y <= 900 and max_y >= 1000
+
+def test_choose_roi_without_text():
+    assert choose_roi([], HEIGHT, WIDTH) is None
+
+def test_expand_roi_grows_towards_cut_off_text():
+    roi = (500, 900, 1400, 1040)
+    limit = search_band(roi, HEIGHT, WIDTH)
+    assert limit == (0, 760, WIDTH, HEIGHT)
+    assert expand_roi(roi, [(700, 950, 1200, 990)], limit) == roi
+    assert expand_roi(roi, [(501, 950, 1200, 990)], limit) == (460, 900, 1400, 1040)
+    assert expand_roi(roi, [(700, 1000, 1200, 1040)], limit) == (500, 900, 1400, 1080)
+
+class StubOCR:
+    """Finds the white rectangle in each frame."""
+
+    def run_batch(self, frames):
+        results = []
+        for frame in frames:
+            ys, xs = np.nonzero(frame[:, :, 0])
+            if len(xs) == 0:
+                results.append([])
+                continue
+            box = [Point(xs.min(), ys.min()), Point(xs.max(), ys.min()), Point(xs.max(), ys.max()), Point(xs.min(), ys.max())]
+            results.append([Result(box, 0.99, "text")])
+        return results
+
+def test_calibrate(tmp_path):
+    path = str(tmp_path / "clip.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 25, (320, 240))
+    for i in range(50):
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        if i % 10 < 7:
+            frame[200:220, 100:220] = 255
+        writer.write(frame)
+    writer.release()
+
+    min_x, min_y, max_x, max_y = calibrate(path, StubOCR(), 50, samples=10)
+    assert 175 <= min_y <= 185 and 235 <= max_y <= 240
+    assert min_x < 100 and max_x > 220
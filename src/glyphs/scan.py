@@ -0,0 +1,121 @@
+import itertools
+
+from typing import Callable, Iterator, Tuple
+
+from glyphs.frame_selector import FrameSelector
+from glyphs.profiler import NO_PROFILER, Profiler
+from glyphs.timestamp import timestamp
+from glyphs.video import Video
+
+# A frame chosen for OCR: (frame number, time, cropped frame)
+Selection = Tuple[int, timestamp, object]
+
+def scan(
+        video: Video,
+        frame_selector: FrameSelector,
+        crop: Callable,
+        stride: int = 1,
+        on_progress: Callable[[int], None] = lambda n: None,
+        continued: bool = False,
+        profiler: Profiler = NO_PROFILER,
+    ) -> Iterator[Selection]:
+    """Yields the frames of `video` which should be sent to OCR.
+
+    With a stride of 1 every frame is passed to the selector. With a larger
+    stride only every `stride`-th frame is compared against the reference.
+    When two samples differ, the frames between them are bisected to find the
+    exact frame on which the subtitle changed, so timestamps stay
+    frame-accurate while the selector runs about log2(stride) times per
+    change instead of once per frame.
+
+    OpenCV's `grab()` decodes each frame anyway, and seeking back re-decodes
+    from the previous keyframe, so the frames of the current interval are
+    kept (cropped) in memory rather than re-read. Every frame is still
+    decoded; the stride saves selector work, not decoding.
+
+    Subtitles which appear and disappear entirely between two samples are
+    missed, so the stride should be shorter than the shortest subtitle.
+
+    With `continued`, the segment picks up where a previous one left off,
+    and its first frame was already scanned as the last frame of that
+    segment. That frame only becomes the reference and is never yielded, so
+    splitting a video into overlapping segments selects the same frames as
+    scanning it whole.
+
+    The generator is lazy: the caller may update the selector's filter with
+    the OCR result of a frame before requesting the next one.
+
+    `profiler` times the "decode", "crop" and "select" stages of each frame.
+    """
+    frames = profiler.iterate("decode", video)
+    def cropped(frame):
+        with profiler.span("crop"):
+            return crop(frame)
+    def features(frame):
+        with profiler.span("select"):
+            return frame_selector.features(frame)
+    def changed(reference, current):
+        with profiler.span("select"):
+            return frame_selector.changed(reference, current)
+    def update(current):
+        with profiler.span("select"):
+            return frame_selector.update(current)
+
+    if continued:
+        frame = next(frames, None)
+        if frame is None:  # The segment starts past the end of the file
+            return
+        frame = cropped(frame)
+        on_progress(1)
+        frame_selector.previous = features(frame)
+
+    if stride <= 1:
+        for frame in frames:
+            frame = cropped(frame)
+            on_progress(1)
+            if update(features(frame)):
+                yield video.frame_number(), video.time(), frame
+        return
+
+    while True:
+        # The first frame of the segment is always read so it can be selected.
+        step = 1 if frame_selector.previous is None else stride
+        candidates = [
+            (video.frame_number(), video.time(), cropped(frame))
+            for frame in itertools.islice(frames, step)
+        ]
+        if len(candidates) == 0:  # End of the segment or of the file
+            break
+        on_progress(len(candidates))
+
+        reference = frame_selector.previous
+        last_features = features(candidates[-1][2])
+        if not update(last_features):
+            continue
+        if reference is None:  # First frame of the segment
+            yield candidates[-1]
+            continue
+
+        # The subtitle changed somewhere in this interval, so bisect the
+        # frames since the previous sample against the reference.
+        candidate_features = [None] * (len(candidates) - 1) + [last_features]
+        def features_at(i):
+            if candidate_features[i] is None:
+                candidate_features[i] = features(candidates[i][2])
+            return candidate_features[i]
+
+        lo, last = 0, len(candidates) - 1
+        while True:
+            hi = last
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if changed(reference, features_at(mid)):
+                    hi = mid
+                else:
+                    lo = mid + 1
+            yield candidates[lo]
+            reference = features_at(lo)
+            lo += 1
+            if lo > last or not changed(reference, features_at(last)):
+                break
+        frame_selector.previous = reference
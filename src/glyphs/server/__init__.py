@@ -0,0 +1,2 @@
+from .client import submit
+from .server import Engine, Job, ProgressCallback, Server, default_socket_path
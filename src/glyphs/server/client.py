@@ -0,0 +1,40 @@
+import json
+import socket
+
+from tqdm import tqdm
+
+def submit(files: list[str], path: str) -> bool:
+    """Sends `files` to the server listening on `path` and shows the
+    progress of each job until all of them finish. Returns whether every
+    file was processed successfully."""
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(path)
+    except OSError as error:
+        connection.close()
+        raise Exception(f"cannot connect to {path}, is `glyphs serve` running? ({error})") from error
+
+    succeeded = True
+    bars = {}
+    with connection, connection.makefile("rwb") as stream:
+        stream.write(json.dumps({"files": files}).encode() + b"\n")
+        stream.flush()
+        for line in stream:
+            event = json.loads(line)
+            job = event["job"]
+            if event["event"] == "queued":
+                print(f"QUEUED: {event['file']} (position {event['position']})")
+            elif event["event"] == "started":
+                bars[job] = tqdm(unit="s", desc=event["file"])
+            elif event["event"] == "progress":
+                bars[job].total = None if event["total"] is None else max(event["total"], event["seconds"])
+                bars[job].n = int(event["seconds"])
+                bars[job].refresh()
+            else:
+                bars.pop(job).close()
+                if event["event"] == "done":
+                    print(f"DONE: {event['file']} -> {event['srt']}")
+                else:
+                    print(f"FAILED: {event['file']}: {event['error']}")
+                    succeeded = False
+    return succeeded
@@ -0,0 +1,114 @@
+import itertools
+import json
+import os
+import queue
+import socket
+import socketserver
+import tempfile
+import threading
+
+from dataclasses import dataclass
+from typing import Callable
+
+# Called with the seconds of video processed so far and the estimated total.
+ProgressCallback = Callable[[float, float | None], None]
+
+# Processes a video file, returning the path of the SRT file written for it.
+Engine = Callable[[str, ProgressCallback], str]
+
+def default_socket_path() -> str:
+    directory = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(directory, f"glyphs-{os.getuid()}.sock")
+
+@dataclass
+class Job:
+    id: int
+    file: str
+    events: queue.Queue  # Events for the client which submitted the job
+
+class SubmitHandler(socketserver.StreamRequestHandler):
+    """Queues the files of one submission and streams the events of their
+    jobs back to the client, one JSON object per line."""
+
+    def handle(self):
+        request = json.loads(self.rfile.readline())
+        events = queue.Queue()
+        remaining = len([self.server.jobs.submit(file, events) for file in request["files"]])
+        while remaining > 0:
+            event = events.get()
+            if event["event"] in ("done", "failed"):
+                remaining -= 1
+            try:
+                self.wfile.write(json.dumps(event).encode() + b"\n")
+            except OSError:
+                return  # The client went away, but its jobs still run
+
+class Listener(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+class Server:
+    """Processes videos submitted over a Unix socket, one at a time.
+
+    Jobs run on the thread which calls `run`, through `engine`, so that
+    whatever the engine keeps loaded (such as the OCR model) stays warm
+    between jobs. Clients are served on other threads, and receive
+    "queued", "started", "progress" and then "done" or "failed" events for
+    each of their files.
+    """
+
+    def __init__(self, path: str, engine: Engine):
+        self.path = path
+        self.engine = engine
+        self.__queue = queue.Queue()
+        self.__ids = itertools.count(1)
+        self.__listener = None
+
+    def submit(self, file: str, events: queue.Queue) -> Job:
+        job = Job(next(self.__ids), file, events)
+        events.put({"event": "queued", "job": job.id, "file": file, "position": self.__queue.qsize() + 1})
+        self.__queue.put(job)
+        return job
+
+    def start(self):
+        """Starts accepting submissions on the socket."""
+        if os.path.exists(self.path):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                try:
+                    probe.connect(self.path)
+                    raise Exception(f"a glyphs server is already listening on {self.path}")
+                except ConnectionRefusedError:
+                    os.unlink(self.path)  # Left behind by a server which did not shut down
+        self.__listener = Listener(self.path, SubmitHandler)
+        self.__listener.jobs = self
+        threading.Thread(target=self.__listener.serve_forever, daemon=True).start()
+
+    def run(self):
+        """Runs jobs until `stop` is called."""
+        while (job := self.__queue.get()) is not None:
+            self.run_job(job)
+
+    def stop(self):
+        """Stops `run` once the jobs queued so far are done."""
+        self.__queue.put(None)
+
+    def close(self):
+        if self.__listener is not None:
+            self.__listener.shutdown()
+            self.__listener.server_close()
+            os.unlink(self.path)
+            self.__listener = None
+
+    def run_job(self, job: Job):
+        job.events.put({"event": "started", "job": job.id, "file": job.file})
+        reported = None
+        def on_progress(seconds: float, total: float | None):
+            nonlocal reported
+            if int(seconds) != reported:  # At most one event per second of video
+                reported = int(seconds)
+                job.events.put({"event": "progress", "job": job.id, "seconds": seconds, "total": total})
+        try:
+            srt_file = self.engine(job.file, on_progress)
+        except Exception as error:
+            job.events.put({"event": "failed", "job": job.id, "file": job.file, "error": str(error)})
+        else:
+            job.events.put({"event": "done", "job": job.id, "file": job.file, "srt": srt_file})
@@ -0,0 +1,71 @@
+import os
+import threading
+
+import pytest
+
+from .client import submit
+from .server import Server
+
+@pytest.fixture
+def socket_path():
+    # Unix socket paths are limited to about 100 characters
+    path = os.path.join("/tmp", f"glyphs-test-{os.getpid()}.sock")
+    yield path
+    if os.path.exists(path):
+        os.unlink(path)
+
+def run_server(server: Server):
+    server.start()
+    thread = threading.Thread(target=server.run)
+    thread.start()
+    return thread
+
+def test_jobs_run_in_order_and_report_progress(socket_path, capsys):
+    processed = []
+    def engine(file, on_progress):
+        for seconds in [0, 0.5, 1, 2]:
+            on_progress(seconds, 2)
+        processed.append(file)
+        return file + ".srt"
+    server = Server(socket_path, engine)
+    thread = run_server(server)
+    try:
+        assert submit(["/videos/a.mp4", "/videos/b.mp4"], socket_path)
+    finally:
+        server.stop()
+        thread.join()
+        server.close()
+    assert processed == ["/videos/a.mp4", "/videos/b.mp4"]
+    out = capsys.readouterr().out
+    assert "DONE: /videos/a.mp4 -> /videos/a.mp4.srt" in out
+    assert "DONE: /videos/b.mp4 -> /videos/b.mp4.srt" in out
+    assert not os.path.exists(socket_path)
+
+def test_failed_job_does_not_stop_server(socket_path, capsys):
+    def engine(file, on_progress):
+        if file == "/videos/broken.mp4":
+            raise Exception("cannot read frames")
+        return file + ".srt"
+    server = Server(socket_path, engine)
+    thread = run_server(server)
+    try:
+        assert not submit(["/videos/broken.mp4"], socket_path)
+        assert submit(["/videos/a.mp4"], socket_path)
+    finally:
+        server.stop()
+        thread.join()
+        server.close()
+    assert "FAILED: /videos/broken.mp4: cannot read frames" in capsys.readouterr().out
+
+def test_running_server_is_not_replaced(socket_path):
+    server = Server(socket_path, lambda file, on_progress: file)
+    server.start()
+    try:
+        with pytest.raises(Exception, match="already listening"):
+            Server(socket_path, lambda file, on_progress: file).start()
+    finally:
+        server.close()
+
+def test_submit_without_server(socket_path):
+    with pytest.raises(Exception, match="is `glyphs serve` running"):
+        submit(["/videos/a.mp4"], socket_path)
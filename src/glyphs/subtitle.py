@@ -1,18 +1,82 @@
 import srt
+import time
+
+from typing import TextIO
 
-from nltk import edit_distance
 from glyphs.timestamp import timestamp
 
+# Seconds between flushes of an SRT file which is written incrementally.
+FLUSH_INTERVAL = 5
+
+# Consecutive texts whose edit distance is at most this share of their
+# length (without punctuation) are OCR variants of the same subtitle. Texts
+# shorter than 1 / MAX_VARIANT_DISTANCE characters must match exactly.
+MAX_VARIANT_DISTANCE = 0.2
+
+REMOVE_PUNCTUATION = str.maketrans({
+    '，': '',
+    '.': '',
+    '。': '',
+    '．': '',
+    '、': '',
+})
+
+def banded_edit_distance(a: str, b: str, limit: int) -> int:
+    """Returns the Levenshtein distance between `a` and `b`, or `limit + 1`
+    if it is larger than `limit`.
+
+    Only the diagonal band of the table within `limit` of the main diagonal
+    can hold a distance up to `limit`, so this takes O(limit * len(a)) time.
+    """
+    over = limit + 1
+    if abs(len(a) - len(b)) > limit:
+        return over
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [over] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            current[j] = min(
+                previous[j - 1] + (a[i - 1] != b[j - 1]),
+                previous[j] + 1,
+                current[j - 1] + 1,
+                over,
+            )
+        if min(current) > limit:
+            return over
+        previous = current
+    return previous[len(b)]
+
+def is_variant(a: str, b: str) -> bool:
+    """Checks whether two texts, without punctuation, could be OCR variants
+    of the same subtitle."""
+    limit = int(MAX_VARIANT_DISTANCE * max(len(a), len(b)))
+    return banded_edit_distance(a, b, limit) <= limit
+
 class SubtitleGenerator:
-    """Generates SRT formatted subtitles."""
-    subtitles = []
-    current_content = ""
-    current_start_timestamp = None
-    current_recent_timestamp = None
-    _index = 1  # Access with self.current_index()
+    """Generates SRT formatted subtitles.
+
+    Consecutive frames whose text is the same, or an OCR variant of it, form
+    one subtitle. Its text is the variant with the highest total confidence
+    over those frames, so a misread frame in the middle of a subtitle
+    neither splits it nor changes its text.
+    """
+    subtitles: list[srt.Subtitle]
+    current_content: str  # Consensus text of the current subtitle
+    current_votes: dict[str, float]  # Total confidence of each variant of the current subtitle
+    current_start_timestamp: timestamp | None
+    current_recent_timestamp: timestamp | None
+    _index: int  # Access with self.current_index()
     __verbose: bool
 
     def __init__(self, verbose: bool = False):
+        self.subtitles = []
+        self.current_content = ""
+        self.current_votes = {}
+        self.current_start_timestamp = None
+        self.current_recent_timestamp = None
+        self._index = 1
         self.__verbose = verbose
 
     def current_index(self):
@@ -20,28 +84,32 @@ class SubtitleGenerator:
         self._index += 1
         return i
 
-    # TODO: We can implement outlier detection by maintaining a count of each repeated subtitle
-    #       and pruning (or merging) subtitles with low repetition in the create_srt() function.
-    def add_subtitle(self, time: timestamp, content: str):
-        remove_punctuation = str.maketrans({
-            '，': '',
-            '.': '',
-            '。': '',
-            '．': '',
-            '、': '',
-        })
+    def vote(self, content: str, confidence: float):
+        self.current_votes[content] = self.current_votes.get(content, 0) + confidence
+        self.current_content = max(self.current_votes, key=self.current_votes.get)
+
+    def add_subtitle(self, time: timestamp, content: str, confidence: float = 1.0):
         self.current_recent_timestamp = time
-        if self.current_content.translate(remove_punctuation) == content.translate(remove_punctuation):
+        current = self.current_content.translate(REMOVE_PUNCTUATION)
+        new = content.translate(REMOVE_PUNCTUATION)
+        if current == new:
             if self.__verbose:
                 print(f"  MATCH: \"{content}\" == \"{self.current_content}\"")
+            self.vote(content, confidence)
+        elif current != "" and new != "" and is_variant(current, new):
+            self.vote(content, confidence)
+            if self.__verbose:
+                print(f"  VARIANT: \"{content}\" ~ \"{self.current_content}\"")
         else:
             if self.current_content == "":
                 if self.__verbose:
                     print(f"  INIT: \"{content}\"")
                 self.current_content = content
+                self.current_votes = {content: confidence}
                 self.current_start_timestamp = time
             else:
                 if self.__verbose:
+                    from nltk import edit_distance  # Only for the log, since nltk takes a second to import
                     print(f"  OVERWRITE: \"{self.current_content}\" -> \"{content}\" (distance: {edit_distance(self.current_content, content)})")
                 self.subtitles.append(
                     srt.Subtitle(
@@ -53,8 +121,10 @@ class SubtitleGenerator:
                 )
                 self.current_start_timestamp = time
                 self.current_content = content
+                self.current_votes = {content: confidence}
 
-    def create_srt(self):
+    def finish(self):
+        """Ends the current subtitle, once no more frames will be added."""
         if self.current_content != "":
             self.subtitles.append(
                 srt.Subtitle(
@@ -65,9 +135,68 @@ class SubtitleGenerator:
                 )
             )
             self.current_content = ""
+            self.current_votes = {}
             self.current_recent_timestamp = None
             self.current_start_timestamp = None
+
+    def pop_subtitles(self) -> list[srt.Subtitle]:
+        """Returns the subtitles which have ended and forgets them, so that
+        they can be written out while the video is still being processed."""
+        subtitles, self.subtitles = self.subtitles, []
+        return subtitles
+
+    def create_srt(self):
+        self.finish()
         for sub in self.subtitles:
             print(f"[{sub.start}-{sub.end}] {sub.content}")
 
         return srt.compose(self.subtitles)
+
+class SrtWriter:
+    """Appends subtitles to an SRT file as they are generated.
+
+    Subtitles are numbered and skipped (when empty or without duration) like
+    srt.compose does, and the file is flushed every `flush_interval` seconds
+    so that it can be followed while a long video is processed.
+    """
+
+    def __init__(self, output: TextIO, flush_interval: float = FLUSH_INTERVAL):
+        self.output = output
+        self.flush_interval = flush_interval
+        self.__next_index = 1
+        self.__flushed = time.monotonic()
+
+    def write(self, subtitles: list[srt.Subtitle]):
+        kept = list(srt.sort_and_reindex(subtitles, start_index=self.__next_index))
+        self.__next_index += len(kept)
+        self.output.write(self.compose(kept))
+        if time.monotonic() - self.__flushed >= self.flush_interval:
+            self.flush()
+
+    def compose(self, subtitles: list[srt.Subtitle]) -> str:
+        return srt.compose(subtitles, reindex=False)
+
+    def flush(self):
+        self.output.flush()
+        self.__flushed = time.monotonic()
+
+def vtt_time(offset: timestamp) -> str:
+    """Formats a time as HH:MM:SS.mmm for WebVTT."""
+    milliseconds = offset // timestamp(milliseconds=1)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02}:{minutes:02}:{seconds:02}.{milliseconds:03}"
+
+class VttWriter(SrtWriter):
+    """Appends subtitles to a WebVTT file as they are generated, like SrtWriter."""
+
+    def __init__(self, output: TextIO, flush_interval: float = FLUSH_INTERVAL):
+        super().__init__(output, flush_interval)
+        self.output.write("WEBVTT\n\n")
+
+    def compose(self, subtitles: list[srt.Subtitle]) -> str:
+        return "".join(
+            f"{sub.index}\n{vtt_time(sub.start)} --> {vtt_time(sub.end)}\n{sub.content}\n\n"
+            for sub in subtitles
+        )
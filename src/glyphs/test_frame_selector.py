@@ -0,0 +1,72 @@
+import cv2
+import numpy as np
+import pytest
+
+from .frame_selector import FrameSelector, THUMBNAIL, SSIM
+
+def make_frame(text=None):
+    frame = np.zeros((120, 640, 3), dtype=np.uint8)
+    if text is not None:
+        cv2.putText(frame, text, (20, 80), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+    return frame
+
+def test_first_frame_is_selected():
+    assert FrameSelector().select(make_frame())
+
+def test_identical_frames_exit_at_first_tier():
+    selector = FrameSelector()
+    selector.select(make_frame("hello"))
+    for _ in range(5):
+        assert not selector.select(make_frame("hello"))
+    assert selector.tier_exits == {THUMBNAIL: 5}
+
+def test_new_subtitle_is_selected():
+    selector = FrameSelector()
+    selector.select(make_frame())
+    assert selector.select(make_frame("hello"))
+    assert selector.select(make_frame("world"))
+    assert selector.tier_exits[SSIM] == 2
+
+def test_grayscale_frames_are_compared_like_color_frames():
+    selector = FrameSelector()
+    gray = lambda text=None: cv2.cvtColor(make_frame(text), cv2.COLOR_BGR2GRAY)
+    selector.select(gray("hello"))
+    assert not selector.select(make_frame("hello"))
+    assert selector.select(gray("world"))
+
+def test_reference_is_kept_for_identical_frames():
+    selector = FrameSelector()
+    selector.select(make_frame("hello"))
+    reference = selector.previous
+    selector.select(make_frame("hello"))
+    assert selector.previous is reference
+
+def test_filter_restricts_comparison():
+    selector = FrameSelector()
+    selector.select(make_frame("hello"))
+    selector.add_filter(0, 0, 10, 10)  # Region without any text
+    assert not selector.select(make_frame("world"))
+
+def make_strip(text):
+    strip = np.zeros((202, 1920, 3), dtype=np.uint8)
+    cv2.putText(strip, text, (600, 120), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+    return strip
+
+@pytest.mark.parametrize("before,after", [
+    ("I said yes", "I said yet"),
+    ("Hello there.", "Hello there!"),
+])
+def test_one_character_change_is_selected(before, after):
+    selector = FrameSelector()
+    selector.select(make_strip(before))
+    assert selector.select(make_strip(after))
+    assert selector.tier_exits[THUMBNAIL] == 0
+
+def test_compression_noise_exits_at_first_tier():
+    rng = np.random.default_rng(0)
+    frame = make_strip("hello")
+    noisy = np.clip(frame + rng.integers(-2, 3, frame.shape), 0, 255).astype(np.uint8)
+    selector = FrameSelector()
+    selector.select(frame)
+    assert not selector.select(noisy)
+    assert selector.tier_exits == {THUMBNAIL: 1}
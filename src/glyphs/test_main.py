@@ -0,0 +1,261 @@
+import cv2
+import functools
+import io
+import json
+import numpy as np
+import os
+import pytest
+import srt
+import time
+from unittest.mock import patch
+
+from .main import Subtitle, VideoState, process_stream, process_video, process_videos, remerge_results, results_path, worker_counts
+from .ocr import BACKENDS, OCRSettings
+from .ocr.backend import loaded
+from .results import load_results
+from .subtitle import SubtitleGenerator
+from .timestamp import timestamp
+from .video import Video, VideoInfo, ffmpeg_available
+
+@pytest.mark.parametrize("cpus,decoders,ocr_workers,ocr_threads,want", [
+    (8, None, None, None, (4, 4, 1)),
+    (5, None, None, None, (3, 2, 1)),
+    (1, None, None, None, (1, 1, 1)),
+    (8, 6, None, None, (6, 2, 1)),
+    (8, None, 3, None, (5, 3, 1)),
+    (8, 12, None, None, (12, 1, 1)),
+    (8, 2, 2, None, (2, 2, 1)),
+    (8, None, None, 2, (4, 2, 2)),
+    (8, None, None, 8, (1, 1, 8)),
+    (8, 2, None, 3, (2, 2, 3)),
+    (8, None, 3, 2, (2, 3, 2)),
+])
+def test_worker_counts(cpus, decoders, ocr_workers, ocr_threads, want):
+    with patch("os.cpu_count", return_value=cpus):
+        assert worker_counts(decoders, ocr_workers, ocr_threads) == want
+
+class StubBackend:
+    """Reads the brightness of the cropped band, rounded to absorb
+    compression noise, as the text. The number is repeated so that texts
+    of different bands are not mistaken for OCR variants of each other."""
+    drop_score = 0.5
+
+    def __init__(self, settings):
+        pass
+
+    def detect(self, image):
+        if image.max() < 25:
+            return []
+        height, width = image.shape[:2]
+        return [np.array([[0, 0], [width, 0], [width, height], [0, height]], dtype=np.float32)]
+
+    def crop(self, image, box):
+        return image
+
+    def recognize(self, crops):
+        return [(" ".join([str(round(int(crop.max()) / 50) * 50)] * 3), 0.99) for crop in crops]
+
+def write_video(path, values: list[int], frames_per_value: int = 10):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 10, (320, 240))
+    for value in values:
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        frame[200:230, 100:220] = value
+        for _ in range(frames_per_value):
+            writer.write(frame)
+    writer.release()
+
+def test_process_videos_keeps_videos_separate(tmp_path):
+    first, second = tmp_path / "first.mp4", tmp_path / "second.mp4"
+    write_video(first, [0, 100, 200, 0])
+    write_video(second, [150, 0])
+    outputs = {}
+    done = []
+    with patch.dict(BACKENDS, {"stub": StubBackend}), patch.dict(loaded, clear=True):
+        with patch("glyphs.main.OCRSettings", functools.partial(OCRSettings, "stub")):
+            process_videos(
+                [str(first), str(second)],
+                lambda file: outputs.setdefault(file, io.StringIO()),
+                lambda file, output: done.append(file),
+                decoders=2, ocr_workers=1, chunk_size=10, preload=True,
+            )
+    assert sorted(done) == [str(first), str(second)]
+    subtitles = {file: [s.content for s in srt.parse(output.getvalue())] for file, output in outputs.items()}
+    assert subtitles[str(first)] == ["100 100 100", "200 200 200"]
+    assert subtitles[str(second)] == ["150 150 150"]
+
+def test_profile_counts_the_work_of_every_process(tmp_path):
+    video = tmp_path / "video.mp4"
+    write_video(video, [0, 100, 200, 0])
+    with patch.dict(BACKENDS, {"stub": StubBackend}), patch.dict(loaded, clear=True):
+        with patch("glyphs.main.OCRSettings", functools.partial(OCRSettings, "stub")):
+            process_video(str(video), decoders=2, ocr_workers=1, chunk_size=10, profile=str(tmp_path / "run"))
+    with open(tmp_path / "run.json") as f:
+        profile = json.load(f)
+    assert sorted(p["process"].split()[0] for p in profile["processes"]) == ["collector", "decoder", "decoder", "ocr"]
+    counters = profile["counters"]
+    assert counters["frames_decoded"] >= 40
+    assert counters["frames_selected"] == counters["ocr_frames"] + counters["frames_gated"]
+    assert counters["empty_results"] >= 1  # The black frames
+    assert {"decode", "select", "ocr", "write"} <= set(profile["stages"])
+    with open(tmp_path / "run.trace.json") as f:
+        assert len(json.load(f)["traceEvents"]) > 0
+
+def test_saved_results_are_remerged_into_the_same_subtitles(tmp_path):
+    video = tmp_path / "video.mp4"
+    write_video(video, [0, 100, 200, 0])
+    with patch.dict(BACKENDS, {"stub": StubBackend}), patch.dict(loaded, clear=True):
+        with patch("glyphs.main.OCRSettings", functools.partial(OCRSettings, "stub")):
+            output = process_video(str(video), decoders=2, ocr_workers=1, chunk_size=10, save_results=True)
+    results = load_results(results_path(str(video)))
+    assert len(results) >= 3  # The black, 100 and 200 frames
+    remerged = io.StringIO()
+    remerge_results(results, remerged)
+    assert remerged.getvalue() == output
+
+def extract(video, backend=StubBackend, **options) -> tuple[list[str], Exception | None]:
+    """Processes `video` with `backend`, returning its subtitles and the
+    exception raised at the end, if any."""
+    output = io.StringIO()
+    error = None
+    with patch.dict(BACKENDS, {"stub": backend}), patch.dict(loaded, clear=True):
+        with patch("glyphs.main.OCRSettings", functools.partial(OCRSettings, "stub")):
+            try:
+                process_videos([str(video)], lambda file: output, decoders=2, ocr_workers=1, chunk_size=10, preload=True, **options)
+            except Exception as e:
+                error = e
+    return [s.content for s in srt.parse(output.getvalue())], error
+
+def once(marker: str) -> bool:
+    """Returns True the first time it is called with `marker`, in any process."""
+    try:
+        open(marker, "x").close()
+        return True
+    except FileExistsError:
+        return False
+
+class DyingBackend(StubBackend):
+    """Kills its process on its first batch."""
+    marker = None
+
+    def recognize(self, crops):
+        if once(self.marker):
+            os._exit(1)
+        return super().recognize(crops)
+
+class StallingBackend(StubBackend):
+    """Hangs on its first batch."""
+    marker = None
+
+    def recognize(self, crops):
+        if once(self.marker):
+            time.sleep(3600)
+        return super().recognize(crops)
+
+class BadFrameBackend(StubBackend):
+    """Raises on every frame of the 200 band."""
+
+    def recognize(self, crops):
+        results = super().recognize(crops)
+        if any(text.startswith("200") for text, _ in results):
+            raise ValueError("bad frame")
+        return results
+
+class FailingVideo(Video):
+    """Raises once on the chunk starting at frame 10."""
+    marker = None
+
+    def __init__(self, file_path, start_idx, stop_idx=None):
+        if start_idx == 10 and once(self.marker):
+            raise IOError("cannot decode")
+        super().__init__(file_path, start_idx, stop_idx)
+
+@pytest.mark.parametrize("backend", [DyingBackend, StallingBackend])
+def test_failed_ocr_worker_is_replaced(tmp_path, capsys, backend):
+    video = tmp_path / "video.mp4"
+    write_video(video, [0, 100, 200, 0])
+    with patch.object(backend, "marker", str(tmp_path / "failed")):
+        subtitles, error = extract(video, backend, stall_timeout=1)
+    assert error is None
+    assert subtitles == ["100 100 100", "200 200 200"]
+    assert "WORKER FAILED: ocr worker" in capsys.readouterr().err
+
+def test_chunk_which_raises_is_retried(tmp_path, capsys):
+    video = tmp_path / "video.mp4"
+    write_video(video, [0, 100, 200, 0])
+    with patch("glyphs.main.Video", FailingVideo), patch.object(FailingVideo, "marker", str(tmp_path / "failed")):
+        subtitles, error = extract(video)
+    assert error is None
+    assert subtitles == ["100 100 100", "200 200 200"]
+    assert "RETRY: frames [10, 20)" in capsys.readouterr().err
+
+def test_chunk_which_keeps_failing_is_left_out(tmp_path, capsys):
+    video = tmp_path / "video.mp4"
+    write_video(video, [0, 100, 200, 0])
+    subtitles, error = extract(video, BadFrameBackend, batch_size=1)
+    assert subtitles == ["100 100 100"]
+    assert "gave up on 1 chunks" in str(error) and "bad frame" in str(error)
+    # The 200 band starts at the last frame of the chunk, which the next chunk only compares against
+    assert "FAILED: frames [10, 20)" in capsys.readouterr().err
+
+@pytest.mark.skipif(not ffmpeg_available(), reason="ffmpeg is not installed")
+def test_ffmpeg_decode_backend_finds_the_same_subtitles(tmp_path):
+    video = tmp_path / "video.mp4"
+    write_video(video, [0, 100, 200, 0])
+    subtitles, error = extract(video, decode_backend="ffmpeg")
+    assert error is None
+    assert subtitles == ["100 100 100", "200 200 200"]
+
+def test_ffmpeg_decode_backend_requires_ffmpeg(tmp_path):
+    video = tmp_path / "video.mp4"
+    write_video(video, [0, 100])
+    with patch("glyphs.main.ffmpeg_available", lambda: False):
+        subtitles, error = extract(video, decode_backend="ffmpeg")
+    assert "requires ffmpeg" in str(error)
+
+def stream(video, **options):
+    """Processes `video` as a live stream with StubBackend, returning its
+    output and StreamReport."""
+    output = io.StringIO()
+    with patch.dict(BACKENDS, {"stub": StubBackend}), patch.dict(loaded, clear=True):
+        with patch("glyphs.main.OCRSettings", functools.partial(OCRSettings, "stub")):
+            report = process_stream(str(video), output, ocr_workers=1, preload=True, **options)
+    return output.getvalue(), report
+
+@pytest.mark.skipif(not ffmpeg_available(), reason="ffmpeg is not installed")
+def test_stream_writes_subtitles_within_the_latency_budget(tmp_path):
+    video = tmp_path / "video.mp4"
+    write_video(video, [0, 100, 200, 0])
+    output, report = stream(video, latency=30)
+    subtitles = list(srt.parse(output))
+    assert [s.content for s in subtitles] == ["100 100 100", "200 200 200"]
+    assert subtitles[0].start == timestamp(seconds=1)
+    assert report.frames_read == 40
+    assert report.frames_late == 0
+    assert report.cues == 2
+    assert report.latency["max"] < 30
+
+@pytest.mark.skipif(not ffmpeg_available(), reason="ffmpeg is not installed")
+def test_stream_writes_webvtt(tmp_path):
+    video = tmp_path / "video.mp4"
+    write_video(video, [0, 100, 0])
+    output, _ = stream(video, subtitle_format="vtt", latency=30)
+    assert output == "WEBVTT\n\n1\n00:00:01.000 --> 00:00:02.000\n100 100 100\n\n"
+
+def test_subtitles_are_written_in_order_as_chunks_complete():
+    info = VideoInfo(height=240, width=320, fps=10, frame_count=30)
+    video = VideoState("video.mp4", info, [(0, 10), (10, 20), (20, None)], None, None, SubtitleGenerator())
+    output = io.StringIO()
+    def complete(chunk, texts):
+        video.chunk_subs[chunk] = {
+            frame: Subtitle(timestamp(seconds=frame / 10), text) for frame, text in texts.items()
+        }
+        video.completed.add(chunk)
+        video.emit(lambda file: output)
+
+    complete(1, {10: "two", 15: "three"})
+    assert video.writer is None  # Waits for the first chunk
+    complete(0, {0: "one", 5: "one"})
+    assert [s.content for s in srt.parse(output.getvalue())] == ["one", "two"]  # "three" may continue
+    assert video.chunk_subs == {}
+    complete(2, {20: ""})
+    assert [s.content for s in srt.parse(output.getvalue())] == ["one", "two", "three"]
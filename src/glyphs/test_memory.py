@@ -0,0 +1,27 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from .memory import memory_usage
+
+pytestmark = pytest.mark.skipif(memory_usage() is None, reason="memory usage is not reported on this system")
+
+def test_memory_usage_of_this_process():
+    usage = memory_usage()
+    assert 0 < usage.pss <= usage.rss
+    assert usage.shared <= usage.rss
+
+def report_memory(queue):
+    queue.put(memory_usage())
+
+def test_forked_process_shares_parent_pages():
+    pages = np.ones(64 * 1024 * 1024, dtype=np.uint8)  # Touched, so resident
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    child = context.Process(target=report_memory, args=(queue,))
+    child.start()
+    usage = queue.get()
+    child.join()
+    assert usage.shared >= pages.nbytes // 2
+    assert usage.pss < usage.rss - pages.nbytes // 4
@@ -0,0 +1,72 @@
+import json
+import time
+
+from .profiler import MAX_TRACE_SPANS, Profiler, aggregate, chrome_trace, write_profile
+
+def test_spans_are_timed_from_the_origin():
+    origin = time.perf_counter()
+    profiler = Profiler("decoder 0", origin=origin)
+    with profiler.span("decode"):
+        time.sleep(0.01)
+    with profiler.span("decode"):
+        pass
+    total = profiler.report.stages["decode"]
+    assert total.calls == 2
+    assert total.seconds >= 0.01
+    (stage, start, seconds), _ = profiler.report.spans
+    assert stage == "decode" and start >= 0 and seconds >= 0.01
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler("decoder 0", enabled=False)
+    with profiler.span("decode"):
+        pass
+    profiler.count("frames_decoded")
+    assert list(profiler.iterate("decode", [1, 2])) == [1, 2]
+    assert profiler.report.stages == {} and profiler.report.counters == {}
+
+def test_iterate_times_each_item():
+    profiler = Profiler("decoder 0")
+    assert list(profiler.iterate("decode", "abc")) == ["a", "b", "c"]
+    assert profiler.report.stages["decode"].calls == 4  # Including the step which found the end
+
+def test_trace_is_bounded_but_totals_are_not():
+    profiler = Profiler("decoder 0")
+    for _ in range(MAX_TRACE_SPANS + 5):
+        with profiler.span("select"):
+            pass
+    assert len(profiler.report.spans) == MAX_TRACE_SPANS
+    assert profiler.report.dropped_spans == 5
+    assert profiler.report.stages["select"].calls == MAX_TRACE_SPANS + 5
+
+def test_reports_are_aggregated_across_processes():
+    reports = []
+    for process in ["decoder 0", "decoder 1"]:
+        profiler = Profiler(process)
+        with profiler.span("decode"):
+            pass
+        profiler.count("frames_decoded", 10)
+        reports.append(profiler.report)
+    totals = aggregate(reports, wall_seconds=1.5)
+    assert totals["wall_seconds"] == 1.5
+    assert totals["stages"]["decode"]["calls"] == 2
+    assert totals["counters"] == {"frames_decoded": 20}
+    assert [p["process"] for p in totals["processes"]] == ["decoder 0", "decoder 1"]
+
+def test_chrome_trace_names_each_process():
+    profiler = Profiler("ocr 1")
+    with profiler.span("ocr"):
+        pass
+    events = chrome_trace([profiler.report])["traceEvents"]
+    assert events[0] == {"name": "process_name", "ph": "M", "pid": profiler.report.pid, "args": {"name": "ocr 1"}}
+    assert events[1]["name"] == "ocr" and events[1]["ph"] == "X" and events[1]["dur"] >= 0
+
+def test_profile_is_written_as_json(tmp_path):
+    profiler = Profiler("collector")
+    with profiler.span("write"):
+        pass
+    totals_path, trace_path = write_profile(str(tmp_path / "run"), [profiler.report], 1)
+    assert totals_path == str(tmp_path / "run.json")
+    with open(totals_path) as f:
+        assert json.load(f)["stages"]["write"]["calls"] == 1
+    with open(trace_path) as f:
+        assert len(json.load(f)["traceEvents"]) == 2
@@ -0,0 +1,87 @@
+import cv2
+import numpy as np
+import pytest
+
+from .frame_selector import FrameSelector
+from .scan import scan
+from .timestamp import timestamp
+
+class FakeVideo:
+    """Mimics Video over a list of subtitle strings, one per frame."""
+
+    def __init__(self, subtitles, start=0, stop=None):
+        self.subtitles = subtitles
+        self.position = start
+        self.stop = len(subtitles) if stop is None else min(stop, len(subtitles))
+        self.decoded = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.position >= self.stop:
+            raise StopIteration
+        frame = np.zeros((60, 320, 3), dtype=np.uint8)
+        cv2.putText(frame, self.subtitles[self.position], (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        self.position += 1
+        self.decoded += 1
+        return frame
+
+    def frame_number(self):
+        return self.position
+
+    def time(self):
+        return timestamp(milliseconds=40 * self.position)
+
+def selected_frames(subtitles, stride):
+    video = FakeVideo(subtitles)
+    frames = [number for number, _, _ in scan(video, FrameSelector(), lambda f: f, stride)]
+    return frames, video.decoded
+
+subtitles = ["a"] * 23 + ["bb"] * 30 + [""] * 17 + ["ccc"] * 40
+
+@pytest.mark.parametrize("stride", [2, 5, 8, 13])
+def test_strided_scan_matches_sequential_scan(stride):
+    want, decoded_all = selected_frames(subtitles, 1)
+    got, decoded = selected_frames(subtitles, stride)
+    assert got == want == [1, 24, 54, 71]
+    assert decoded == decoded_all == len(subtitles)  # Every frame is decoded exactly once
+
+def test_strided_scan_compares_fewer_frames():
+    comparisons = {}
+    for stride in [1, 8]:
+        selector = FrameSelector()
+        list(scan(FakeVideo(subtitles), selector, lambda f: f, stride))
+        comparisons[stride] = sum(selector.tier_exits.values())
+    assert comparisons[8] < comparisons[1] / 3
+
+def test_strided_scan_finds_consecutive_changes_in_one_interval():
+    got, _ = selected_frames(["a"] * 10 + ["bb"] * 2 + ["ccc"] * 10, 8)
+    assert got == [1, 11, 13]
+
+def test_progress_covers_every_frame():
+    progress = []
+    video = FakeVideo(subtitles)
+    list(scan(video, FrameSelector(), lambda f: f, 7, on_progress=progress.append))
+    assert sum(progress) == len(subtitles)
+
+def test_strided_scan_reports_progress_once_per_interval():
+    # The decoder applies OCR feedback in on_progress, so the filter must not
+    # change while an interval is bisected.
+    steps = []
+    list(scan(FakeVideo(subtitles), FrameSelector(), lambda f: f, 8, steps.append))
+    assert steps == [1] + [8] * 13 + [5]
+
+@pytest.mark.parametrize("stride", [1, 8])
+def test_overlapping_segments_match_a_single_scan(stride):
+    want, _ = selected_frames(subtitles, stride)
+    got = []
+    # Boundaries in the middle of a subtitle, just before and just after a change
+    bounds = [0, 10, 23, 24, 60, 120]
+    for start, stop in zip(bounds, bounds[1:]):
+        video = FakeVideo(subtitles, start, stop + 1)
+        got += [number for number, _, _ in scan(video, FrameSelector(), lambda f: f, stride, continued=start > 0)]
+    assert got == want
+
+def test_continued_segment_past_the_end_is_empty():
+    assert list(scan(FakeVideo(subtitles, len(subtitles)), FrameSelector(), lambda f: f, continued=True)) == []
@@ -0,0 +1,102 @@
+import io
+import srt
+
+from nltk import edit_distance
+
+from .subtitle import SrtWriter, SubtitleGenerator, VttWriter, banded_edit_distance
+from .timestamp import timestamp
+
+def generate(*contents: str) -> str:
+    generator = SubtitleGenerator()
+    for second, content in enumerate(contents):
+        generator.add_subtitle(timestamp(seconds=second), content)
+    return generator.create_srt()
+
+def test_repeated_text_is_merged_until_the_text_changes():
+    assert generate("hello", "hello", "world", "world") == (
+        "1\n00:00:00,000 --> 00:00:02,000\nhello\n\n"
+        "2\n00:00:02,000 --> 00:00:03,000\nworld\n\n"
+    )
+
+def test_banded_edit_distance_matches_edit_distance_within_the_limit():
+    pairs = [("", ""), ("", "abc"), ("kitten", "sitting"), ("对了", "寸了"), ("abcdef", "badcfe"), ("same", "same")]
+    for a, b in pairs:
+        distance = edit_distance(a, b)
+        for limit in range(8):
+            expected = distance if distance <= limit else limit + 1
+            assert banded_edit_distance(a, b, limit) == expected, (a, b, limit)
+
+def test_ocr_variants_are_merged_by_confidence():
+    generator = SubtitleGenerator()
+    frames = [
+        ("我们明天早上去看看肥", 0.3),
+        ("我们明天早上去看看吧", 0.95),
+        ("我们明天早上去看看肥", 0.3),
+        ("我们明天早上去看看肥", 0.3),
+        ("", 1.0),
+    ]
+    for second, (content, confidence) in enumerate(frames):
+        generator.add_subtitle(timestamp(seconds=second), content, confidence)
+    # A misread in the middle neither splits the subtitle nor wins by count.
+    assert generator.create_srt() == "1\n00:00:00,000 --> 00:00:04,000\n我们明天早上去看看吧\n\n"
+
+def test_short_or_different_texts_are_not_merged():
+    assert [s.content for s in srt.parse(generate("对了", "寸了", "hello there", "goodbye now", ""))] == [
+        "对了", "寸了", "hello there", "goodbye now",
+    ]
+
+def test_generators_do_not_share_subtitles():
+    first = generate("hello", "world")
+    assert generate("hello", "world") == first
+
+def test_popped_subtitles_are_forgotten():
+    generator = SubtitleGenerator()
+    for second, content in enumerate(["hello", "world", "again"]):
+        generator.add_subtitle(timestamp(seconds=second), content)
+    assert [s.content for s in generator.pop_subtitles()] == ["hello", "world"]
+    assert generator.pop_subtitles() == []
+    generator.finish()
+    assert [s.content for s in generator.pop_subtitles()] == ["again"]
+
+class CountingStream(io.StringIO):
+    flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+
+def test_incremental_srt_matches_compose():
+    subtitles = [
+        srt.Subtitle(1, timestamp(seconds=0), timestamp(seconds=1), "one"),
+        srt.Subtitle(2, timestamp(seconds=1), timestamp(seconds=1), "no duration"),
+        srt.Subtitle(3, timestamp(seconds=2), timestamp(seconds=3), "two"),
+        srt.Subtitle(4, timestamp(seconds=3), timestamp(seconds=4), "three"),
+    ]
+    output = CountingStream()
+    writer = SrtWriter(output, flush_interval=0)
+    writer.write(subtitles[:2])
+    writer.write([])
+    writer.write(subtitles[2:])
+    assert output.getvalue() == srt.compose(subtitles)
+    assert output.flushes == 3
+
+def test_incremental_srt_is_flushed_periodically():
+    output = CountingStream()
+    writer = SrtWriter(output, flush_interval=3600)
+    writer.write([srt.Subtitle(1, timestamp(seconds=0), timestamp(seconds=1), "one")])
+    assert output.flushes == 0
+    writer.flush()
+    assert output.flushes == 1
+
+def test_webvtt_cues_are_numbered_like_srt():
+    output = CountingStream()
+    writer = VttWriter(output, flush_interval=0)
+    writer.write([
+        srt.Subtitle(1, timestamp(seconds=1), timestamp(seconds=1), "no duration"),
+        srt.Subtitle(2, timestamp(minutes=61, seconds=2, milliseconds=5), timestamp(minutes=61, seconds=3), "one"),
+    ])
+    writer.write([srt.Subtitle(3, timestamp(hours=2), timestamp(hours=2, milliseconds=999), "two")])
+    assert output.getvalue() == (
+        "WEBVTT\n\n"
+        "1\n01:01:02.005 --> 01:01:03.000\none\n\n"
+        "2\n02:00:00.000 --> 02:00:00.999\ntwo\n\n"
+    )
@@ -0,0 +1,51 @@
+import cv2
+import numpy as np
+import pytest
+
+from .text_gate import TextGate
+
+def make_band(background):
+    rng = np.random.default_rng(0)
+    if background == "flat":
+        band = np.full((200, 1200, 3), 40, dtype=np.uint8)
+    elif background == "gradient":
+        band = np.zeros((200, 1200, 3), dtype=np.uint8)
+        band[:] = np.linspace(0, 255, 1200, dtype=np.uint8)[None, :, None]
+    elif background == "noise":
+        band = rng.integers(0, 60, (200, 1200, 3)).astype(np.uint8)
+    else:  # A scene cut to large shapes
+        band = np.full((200, 1200, 3), 90, dtype=np.uint8)
+        cv2.rectangle(band, (100, 20), (500, 180), (230, 230, 230), -1)
+        cv2.circle(band, (850, 100), 90, (10, 10, 10), -1)
+    return band
+
+def add_subtitle(band, text, color=(255, 255, 255), outline=(0, 0, 0)):
+    band = band.copy()
+    cv2.putText(band, text, (200, 120), cv2.FONT_HERSHEY_SIMPLEX, 2, outline, 9)
+    cv2.putText(band, text, (200, 120), cv2.FONT_HERSHEY_SIMPLEX, 2, color, 4)
+    return band
+
+BACKGROUNDS = ["flat", "gradient", "noise", "shapes"]
+
+@pytest.mark.parametrize("background", BACKGROUNDS)
+def test_subtitle_passes(background):
+    assert TextGate().has_text(add_subtitle(make_band(background), "Where are we going?"))
+
+@pytest.mark.parametrize("background", BACKGROUNDS)
+def test_background_without_text_is_rejected(background):
+    assert not TextGate().has_text(make_band(background))
+
+def test_dark_text_passes():
+    band = np.full((200, 1200, 3), 220, dtype=np.uint8)
+    assert TextGate().has_text(add_subtitle(band, "hello there", color=(20, 20, 20), outline=(20, 20, 20)))
+
+def test_short_subtitle_passes():
+    assert TextGate().has_text(add_subtitle(make_band("flat"), "Hey"))
+
+def test_thin_lines_and_specks_are_rejected():
+    band = make_band("flat")
+    cv2.line(band, (0, 30), (1200, 30), (255, 255, 255), 2)  # Letterbox edge
+    cv2.line(band, (600, 0), (600, 200), (255, 255, 255), 2)
+    for x in range(50, 1200, 100):
+        cv2.circle(band, (x, 150), 2, (255, 255, 255), -1)
+    assert not TextGate().has_text(band)
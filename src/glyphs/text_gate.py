@@ -0,0 +1,63 @@
+import cv2
+import numpy as np
+
+class TextGate:
+    """Cheaply checks whether a cropped frame may contain a subtitle.
+
+    Subtitles are lines of thin, high-contrast strokes. The strokes are
+    isolated with morphological top-hat and black-hat filters, which flatten
+    the background, and their connected components are kept when they are
+    text-sized: a letter, or a whole word once outlines join the letters.
+    The frame passes when the components on a common line together span at
+    least `min_text_width` text heights.
+
+    Rejecting a frame with text drops its subtitle, so the defaults lean
+    towards passing frames; benchmarks/tune_text_gate.py measures them
+    against OCR on a clip.
+    """
+
+    def __init__(
+            self,
+            contrast: int = 60,
+            stroke_width: int = 15,
+            min_text_height: int = 8,
+            min_text_width: float = 1,
+        ):
+        self.contrast = contrast  # Minimum brightness difference between a stroke and its background
+        self.min_text_height = min_text_height  # Pixels
+        self.min_text_width = min_text_width  # Multiple of the text height
+        # Strokes up to this many pixels wide are kept by the filters
+        self.kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (stroke_width, stroke_width))
+
+    def strokes(self, gray):
+        """Mask of the thin strokes which stand out from their surroundings."""
+        bright = cv2.morphologyEx(gray, cv2.MORPH_TOPHAT, self.kernel)
+        dark = cv2.morphologyEx(gray, cv2.MORPH_BLACKHAT, self.kernel)
+        return (np.maximum(bright, dark) >= self.contrast).astype(np.uint8)
+
+    def components(self, gray) -> np.ndarray:
+        """Returns the (x, y, width, height) of the text-sized stroke components."""
+        _, _, stats, _ = cv2.connectedComponentsWithStats(self.strokes(gray), connectivity=8)
+        stats = stats[1:, :4]  # The first component is the background
+        widths, heights = stats[:, 2], stats[:, 3]
+        text = (
+            (heights >= self.min_text_height)
+            & (heights <= 0.9 * gray.shape[0])
+            & (heights <= 4 * widths)  # Not a vertical line
+        )
+        return stats[text]
+
+    def has_text(self, frame) -> bool:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        components = self.components(gray)
+        if len(components) == 0:
+            return False
+        # Only components whose vertical centre is within half a text height
+        # of each other count towards a line, so scattered blobs do not add up.
+        centers = components[:, 1] + components[:, 3] / 2
+        height = np.median(components[:, 3])
+        width = max(
+            components[np.abs(centers - center) <= height / 2, 2].sum()
+            for center in centers
+        )
+        return bool(width >= self.min_text_width * height)
@@ -1,2 +1,3 @@
 from .video import Video
-from .util import count_frames
+from .ffmpeg import IDLE_TIMEOUT, FFmpegStream, FFmpegVideo, ffmpeg_available
+from .util import VideoInfo, crop_subtitle, keyframes, probe, subtitle_band_height
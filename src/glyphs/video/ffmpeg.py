@@ -0,0 +1,305 @@
+import numpy as np
+import re
+import shutil
+import subprocess
+
+from glyphs.timestamp import timestamp
+
+from .util import probe
+
+# The time of a frame in the log line which ffmpeg's showinfo filter writes for it
+PTS_TIME = re.compile(rb"\bpts_time:\s*(-?[0-9.]+)")
+
+# Seconds a followed file may stop growing before it is considered complete
+IDLE_TIMEOUT = 10
+
+def ffmpeg_available() -> bool:
+    return shutil.which("ffmpeg") is not None
+
+def next_pts_time(log) -> float | None:
+    """Reads the showinfo log of ffmpeg up to the line of the next frame, and
+    returns its time, or None if the log ends first."""
+    while True:
+        line = log.readline()
+        if not line:
+            return None
+        if b"showinfo" in line and (match := PTS_TIME.search(line)):
+            return float(match.group(1))
+
+def ffmpeg_command(
+        file_path: str,
+        seek_seconds: float,
+        frames: int | None,
+        roi: tuple[int, int, int, int] | None,
+        gray: bool,
+        threads: int,
+    ) -> list[str]:
+    """Builds the ffmpeg command which writes the raw frames of a video to stdout.
+
+    The frames are cropped to `roi` and converted to `gray` by ffmpeg, and
+    the showinfo filter logs the time of each frame to stderr.
+    """
+    filters = []
+    if roi is not None:
+        min_x, min_y, max_x, max_y = roi
+        filters.append(f"crop={max_x - min_x}:{max_y - min_y}:{min_x}:{min_y}:exact=1")
+    pixel_format = "gray" if gray else "bgr24"
+    filters += [f"format={pixel_format}", "showinfo"]
+    command = ["ffmpeg", "-hide_banner", "-nostdin", "-loglevel", "info", "-threads", str(threads)]
+    if seek_seconds > 0:
+        command += ["-ss", f"{seek_seconds:.6f}"]
+    command += ["-i", file_path, "-map", "0:v:0", "-vf", ",".join(filters), "-fps_mode", "passthrough"]
+    if frames is not None:
+        command += ["-frames:v", str(frames)]
+    return command + ["-f", "rawvideo", "-pix_fmt", pixel_format, "pipe:1"]
+
+class FFmpegVideo:
+    """Iterates over the frames [start_idx, stop_idx) of a video file, decoded
+    by an ffmpeg subprocess.
+
+    ffmpeg crops each frame to `roi` and converts it to grayscale with `gray`
+    before writing it to a pipe, so only the pixels which are used cross into
+    Python, and its decoder runs in its own process alongside the caller.
+    Each frame is read straight into a new array, since the callers keep some
+    frames, such as the reference of the FrameSelector. The time of each
+    frame comes from its timestamp in the stream.
+
+    Seeking is by timestamp, half a frame before `start_idx`, which is frame
+    accurate for constant frame rate videos. Like Video, `stop_idx` is only a
+    hint and iteration also stops at the end of the file. It raises if ffmpeg
+    fails.
+    """
+
+    def __init__(
+            self,
+            file_path: str,
+            start_idx: int,
+            stop_idx: int | None = None,
+            roi: tuple[int, int, int, int] | None = None,
+            gray: bool = False,
+            threads: int = 0,
+        ):
+        info = probe(file_path)
+        if info.width <= 0 or info.height <= 0:
+            raise Exception(f"cannot open video {file_path}")
+        self.__file = file_path
+        self.__fps = info.fps
+        self.__height = info.height
+        self.__width = info.width
+        self.__roi = roi
+        self.__gray = gray
+        self.__threads = threads
+        if roi is not None:
+            min_x, min_y, max_x, max_y = roi
+            self.__shape = (max_y - min_y, max_x - min_x)
+        else:
+            self.__shape = (info.height, info.width)
+        if not gray:
+            self.__shape += (3,)
+        self.__process = None
+        self.__stop_index = stop_idx
+        self.seek(start_idx)
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        """Stops ffmpeg."""
+        if self.__process is None:
+            return
+        if self.__process.poll() is None:
+            self.__process.kill()
+        self.__process.stdout.close()
+        self.__process.stderr.close()
+        self.__process.wait()
+        self.__process = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.__stop_index is not None and self.__frame_number >= self.__stop_index:
+            raise StopIteration
+        frame = np.empty(self.__shape, dtype=np.uint8)
+        if not self.__read(frame):
+            raise StopIteration
+        return frame
+
+    def __read(self, frame: np.ndarray) -> bool:
+        """Reads the next frame into `frame`, returning False at the end of the file."""
+        buffer = memoryview(frame).cast("B")
+        read = 0
+        while read < len(buffer):
+            count = self.__process.stdout.readinto(buffer[read:])
+            if not count:
+                self.__finish()
+                return False
+            read += count
+        self.__time = self.__next_time()
+        self.__frame_number += 1
+        return True
+
+    def __next_time(self) -> float:
+        """Returns the time of the frame just read, from the showinfo log."""
+        pts_time = next_pts_time(self.__process.stderr)
+        if pts_time is None:  # No log of the frame, so count from the start
+            return self.__seek_seconds + self.__frame_number / self.__fps if self.__fps > 0 else 0
+        return self.__seek_seconds + pts_time
+
+    def __finish(self):
+        """Ends the iteration at the end of the file, raising if ffmpeg failed."""
+        self.__stop_index = self.__frame_number
+        errors = self.__process.stderr.read().decode(errors="replace").strip().splitlines()
+        code = self.__process.wait()
+        self.close()
+        if code != 0:
+            reason = errors[-1] if errors else f"exit code {code}"
+            raise Exception(f"ffmpeg failed to decode {self.__file}: {reason}")
+
+    def skip(self, count: int):
+        """Advances up to `count` frames without returning them."""
+        frame = np.empty(self.__shape, dtype=np.uint8)
+        for _ in range(count):
+            if self.__stop_index is not None and self.__frame_number >= self.__stop_index:
+                return
+            if not self.__read(frame):
+                return
+
+    def seek(self, frame_number: int):
+        """Moves to `frame_number`, which is the next frame returned by the
+        iterator, by restarting ffmpeg there."""
+        self.close()
+        self.__frame_number = frame_number
+        # Half a frame early, so that rounding never skips the frame itself
+        seek = (frame_number - 0.5) / self.__fps if self.__fps > 0 and frame_number > 0 else 0
+        self.__seek_seconds = seek
+        self.__time = frame_number / self.__fps if self.__fps > 0 else 0
+        if self.__stop_index is not None and frame_number >= self.__stop_index:
+            return
+        frames = None if self.__stop_index is None else self.__stop_index - frame_number
+        command = ffmpeg_command(self.__file, seek, frames, self.__roi, self.__gray, self.__threads)
+        self.__process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def time(self) -> timestamp:
+        """The time of the frame returned last."""
+        return timestamp(seconds=self.__time)
+
+    def frame_number(self) -> int:
+        return self.__frame_number
+
+    def fps(self) -> float:
+        return self.__fps
+
+    def frame_height(self) -> int:
+        return self.__height
+
+    def frame_width(self) -> int:
+        return self.__width
+
+def stream_command(source: str, follow: bool, idle_timeout: float, threads: int) -> list[str]:
+    """Builds the ffmpeg command which writes the subtitle band of a video
+    stream to stdout, in grayscale, as YUV4MPEG2.
+
+    YUV4MPEG2 starts with the size of the frames, which is not known in
+    advance for a stream. A `source` of "-" reads stdin, and with `follow`
+    a file is read while it is still being written, until it has not grown
+    for `idle_timeout` seconds.
+    """
+    command = ["ffmpeg", "-hide_banner", "-nostdin", "-loglevel", "info", "-threads", str(threads)]
+    if follow:
+        command += ["-follow", "1", "-rw_timeout", str(round(idle_timeout * 1_000_000))]
+    band = "crop=iw:ih-trunc(ih*13/16):0:trunc(ih*13/16):exact=1"  # As in crop_subtitle
+    return command + [
+        "-i", "pipe:0" if source == "-" else source, "-map", "0:v:0",
+        "-vf", f"{band},format=gray,showinfo", "-fps_mode", "passthrough",
+        "-f", "yuv4mpegpipe", "-pix_fmt", "gray", "pipe:1",
+    ]
+
+class FFmpegStream:
+    """Iterates over the frames of a video which can only be read in order,
+    such as a pipe, stdin or a file which is still being written, decoded by
+    an ffmpeg subprocess.
+
+    Only the bottom band of each frame where subtitles usually are is read,
+    in grayscale. Nothing is known about the stream in advance, so its size
+    is read from the stream itself, and times are counted from its first
+    frame. Iteration stops when the stream ends, and raises if ffmpeg fails.
+    """
+
+    def __init__(self, source: str, follow: bool = False, idle_timeout: float = IDLE_TIMEOUT, threads: int = 0):
+        self.__process = None
+        self.__source = source
+        self.__frame_number = 0
+        self.__time = 0.0
+        self.__first_pts = None
+        command = stream_command(source, follow, idle_timeout, threads)
+        self.__process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        header = self.__process.stdout.readline()
+        if not header.startswith(b"YUV4MPEG2"):
+            self.__end()
+            raise Exception(f"no video stream in {source}")
+        fields = {field[:1]: field[1:] for field in header.split()[1:]}
+        self.shape = (int(fields[b"H"]), int(fields[b"W"]))
+        rate = fields.get(b"F", b"0:1").split(b":")
+        self.__fps = int(rate[0]) / int(rate[1]) if int(rate[1]) > 0 else 0
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        """Stops ffmpeg."""
+        if self.__process is None:
+            return
+        if self.__process.poll() is None:
+            self.__process.kill()
+        self.__process.stdout.close()
+        self.__process.stderr.close()
+        self.__process.wait()
+        self.__process = None
+
+    def __end(self):
+        """Stops at the end of the stream, raising if ffmpeg failed."""
+        errors = self.__process.stderr.read().decode(errors="replace").strip().splitlines()
+        code = self.__process.wait()
+        self.close()
+        if code != 0:
+            reason = errors[-1] if errors else f"exit code {code}"
+            raise Exception(f"ffmpeg failed to decode {self.__source}: {reason}")
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.__process is None:
+            raise StopIteration
+        if not self.__process.stdout.readline().startswith(b"FRAME"):
+            self.__end()
+            raise StopIteration
+        frame = np.empty(self.shape, dtype=np.uint8)
+        buffer = memoryview(frame).cast("B")
+        read = 0
+        while read < len(buffer):
+            count = self.__process.stdout.readinto(buffer[read:])
+            if not count:
+                self.__end()
+                raise StopIteration
+            read += count
+        pts_time = next_pts_time(self.__process.stderr)
+        if pts_time is None:
+            self.__time = self.__frame_number / self.__fps if self.__fps > 0 else self.__time
+        else:
+            if self.__first_pts is None:
+                self.__first_pts = pts_time
+            self.__time = pts_time - self.__first_pts
+        self.__frame_number += 1
+        return frame
+
+    def time(self) -> timestamp:
+        """The time of the frame returned last, since the first frame."""
+        return timestamp(seconds=self.__time)
+
+    def frame_number(self) -> int:
+        return self.__frame_number
+
+    def fps(self) -> float:
+        return self.__fps
@@ -0,0 +1,86 @@
+import cv2
+import numpy as np
+import pytest
+
+from .ffmpeg import FFmpegVideo, ffmpeg_available, ffmpeg_command
+from .video import Video
+
+needs_ffmpeg = pytest.mark.skipif(not ffmpeg_available(), reason="ffmpeg is not installed")
+
+# ffmpeg's grayscale is the luma plane, which differs from OpenCV's conversion by a few levels
+TOLERANCE = 3
+
+def write_numbered_video(path, frames, fps=25):
+    """Writes a video whose frame i is filled with gray level 8*i, so that
+    neighbouring frames differ by more than the TOLERANCE."""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (64, 48))
+    for i in range(frames):
+        writer.write(np.full((48, 64, 3), 8 * i, dtype=np.uint8))
+    writer.release()
+
+def test_command_crops_and_converts_before_the_pipe():
+    command = ffmpeg_command("video.mp4", 1.5, 10, (8, 10, 40, 30), True, 1)
+    assert command[command.index("-ss") + 1] == "1.500000"
+    assert command.index("-ss") < command.index("-i")  # Seeks the input, without decoding the frames before
+    assert command[command.index("-vf") + 1] == "crop=32:20:8:10:exact=1,format=gray,showinfo"
+    assert command[command.index("-frames:v") + 1] == "10"
+    assert command[-5:] == ["-f", "rawvideo", "-pix_fmt", "gray", "pipe:1"]
+
+def test_command_reads_whole_color_frames_to_the_end():
+    command = ffmpeg_command("video.mp4", 0, None, None, False, 0)
+    assert "-ss" not in command and "-frames:v" not in command
+    assert command[command.index("-vf") + 1] == "format=bgr24,showinfo"
+
+def opencv_frames(path, roi):
+    """The grayscale frames of a video cropped to `roi`, and their times, decoded by OpenCV."""
+    min_x, min_y, max_x, max_y = roi
+    video = Video(str(path), 0)
+    frames, times = [], []
+    for frame in video:
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)[min_y:max_y, min_x:max_x])
+        times.append(video.time())
+    return frames, times
+
+@needs_ffmpeg
+def test_frames_and_times_match_opencv(tmp_path):
+    path = tmp_path / "numbered.mp4"
+    write_numbered_video(path, 30)
+    roi = (8, 10, 40, 30)
+    frames, times = opencv_frames(path, roi)
+    video = FFmpegVideo(str(path), 0, roi=roi, gray=True)
+    for i, frame in enumerate(video):
+        assert frame.shape == (20, 32)
+        assert np.abs(frame.astype(int) - frames[i]).max() <= TOLERANCE
+        assert video.time() == times[i]
+    assert video.frame_number() == 30
+
+@needs_ffmpeg
+@pytest.mark.parametrize("start", [1, 17, 29])
+def test_segment_starts_on_its_first_frame(tmp_path, start):
+    path = tmp_path / "numbered.mp4"
+    write_numbered_video(path, 30)
+    roi = (0, 0, 64, 48)
+    frames, times = opencv_frames(path, roi)
+    video = FFmpegVideo(str(path), start, start + 5, roi=roi, gray=True)
+    segment = list(video)
+    assert len(segment) == min(5, 30 - start)
+    assert np.abs(segment[0].astype(int) - frames[start]).max() <= TOLERANCE
+    assert video.frame_number() == start + len(segment)
+
+@needs_ffmpeg
+def test_skip_and_seek(tmp_path):
+    path = tmp_path / "numbered.mp4"
+    write_numbered_video(path, 30)
+    video = FFmpegVideo(str(path), 0, 30)
+    video.skip(10)
+    assert video.frame_number() == 10
+    assert next(video).shape == (48, 64, 3)
+    video.seek(25)
+    assert len(list(video)) == 5
+
+@needs_ffmpeg
+def test_unreadable_video_raises(tmp_path):
+    path = tmp_path / "broken.mp4"
+    path.write_bytes(b"not a video")
+    with pytest.raises(Exception, match="cannot open video"):
+        FFmpegVideo(str(path), 0)
@@ -1,13 +1,40 @@
-from .util import count_frames, REWIND_FRAME_COUNT
+import cv2
+import numpy as np
+import pytest
+
+from .util import VideoInfo, crop_subtitle, keyframes, probe, subtitle_band_height
 from unittest.mock import patch, MagicMock
 
 @patch("cv2.VideoCapture")
-def test_count_frames(mock_video_capture):
-    num_frames = 200
-
+def test_probe(mock_video_capture):
     mock_video = MagicMock()
     mock_video_capture.return_value = mock_video
-    mock_video.get.return_value = num_frames
-    mock_video.read.side_effect = [(True,)] * REWIND_FRAME_COUNT + [(False,)]
+    properties = {
+        cv2.CAP_PROP_FRAME_HEIGHT: 1080.0,
+        cv2.CAP_PROP_FRAME_WIDTH: 1920.0,
+        cv2.CAP_PROP_FPS: 25.0,
+        cv2.CAP_PROP_FRAME_COUNT: 750.0,
+    }
+    mock_video.get.side_effect = properties.get
+
+    info = probe("/path/to/video.mkv")
+    assert info == VideoInfo(height=1080, width=1920, fps=25.0, frame_count=750)
+    assert info.duration() == 30
+
+def test_unknown_duration():
+    assert VideoInfo(height=1080, width=1920, fps=0, frame_count=0).duration() == 0
+
+@pytest.mark.parametrize("height", [480, 720, 1080, 1081])
+def test_subtitle_band_height_matches_crop(height):
+    image = np.zeros((height, 4, 3), dtype=np.uint8)
+    assert crop_subtitle(image, height).shape[0] == subtitle_band_height(height)
+
+@patch("shutil.which", return_value="/usr/bin/ffprobe")
+@patch("subprocess.run")
+def test_keyframes(mock_run, mock_which):
+    mock_run.return_value = MagicMock(stdout="K__\n___\n___\nK__\n___\n")
+    assert keyframes("/path/to/video.mkv") == [0, 3]
 
-    assert num_frames == count_frames("/path/to/video.mkv")
+@patch("shutil.which", return_value=None)
+def test_keyframes_without_ffprobe(mock_which):
+    assert keyframes("/path/to/video.mkv") is None
@@ -1,5 +1,6 @@
 from datetime import timedelta
 import cv2
+import numpy as np
 import pytest
 
 from .video import Video
@@ -70,3 +71,81 @@ def test_video_frame_height(mock_video_capture):
     video = Video(path, start_idx, stop_idx)
 
     assert video.frame_height() == 400
+
+@patch("cv2.VideoCapture")
+def test_video_skip(mock_video_capture):
+    mock_video = MagicMock()
+    mock_video_capture.return_value = mock_video
+    mock_video.grab.return_value = True
+
+    path = "/foo/bar/video.mp4"
+    start_idx, stop_idx = 100, 200
+    video = Video(path, start_idx, stop_idx)
+
+    video.skip(10)
+    assert video.frame_number() == 110
+    assert mock_video.grab.call_count == 10
+    mock_video.read.assert_not_called()
+
+    video.skip(1000)  # Skipping stops at the end of the segment
+    assert video.frame_number() == stop_idx
+
+@patch("cv2.VideoCapture")
+def test_video_iteration_stops_at_end_of_file(mock_video_capture):
+    mock_video = MagicMock()
+    mock_video_capture.return_value = mock_video
+    mock_video.read.side_effect = [(True, MagicMock())] * 3 + [(False, None)]
+    mock_video.grab.return_value = False
+
+    video = Video("/foo/bar/video.mp4", 100, 200)  # The segment end is past the end of the file
+    assert len(list(video)) == 3
+    assert video.frame_number() == 103
+    with pytest.raises(StopIteration):
+        next(video)
+    video.skip(10)
+    assert video.frame_number() == 103
+
+@patch("cv2.VideoCapture")
+def test_video_seek(mock_video_capture):
+    mock_video = MagicMock()
+    mock_video_capture.return_value = mock_video
+
+    path = "/foo/bar/video.mp4"
+    start_idx, stop_idx = 100, 200
+    video = Video(path, start_idx, stop_idx)
+    video.seek(150)
+
+    assert video.frame_number() == 150
+    mock_video.set.assert_called_with(cv2.CAP_PROP_POS_FRAMES, 150)
+
+def write_numbered_video(path, frames, fps=25):
+    """Writes a video whose frame i is filled with gray level 2*i."""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (64, 48))
+    for i in range(frames):
+        writer.write(np.full((48, 64, 3), 2 * i, dtype=np.uint8))
+    writer.release()
+
+def test_video_seek_is_frame_accurate(tmp_path):
+    path = tmp_path / "numbered.mp4"
+    write_numbered_video(path, 100)
+
+    sequential = Video(str(path), 0, 100)
+    frames = []
+    times = []
+    for frame in sequential:
+        frames.append(frame)
+        times.append(sequential.time())
+
+    for target in [0, 37, 63, 99]:
+        video = Video(str(path), 0, 100)
+        video.seek(target)
+        frame = next(video)
+        assert video.frame_number() == target + 1
+        assert np.array_equal(frame, frames[target])
+        assert video.time() == times[target]
+
+def test_video_without_stop_reads_to_end(tmp_path):
+    path = tmp_path / "numbered.mp4"
+    write_numbered_video(path, 30)
+    assert len(list(Video(str(path), 0))) == 30
+    assert len(list(Video(str(path), 20, 1000))) == 10
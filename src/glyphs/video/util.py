@@ -1,17 +1,59 @@
 import cv2
+import shutil
+import subprocess
 
-# Number of frames to rewind from the end of the video in count_frames().
-REWIND_FRAME_COUNT = 50
+from dataclasses import dataclass
 
-def count_frames(file):
-    """Determine the number of frames in a video via an approximate scan."""
+@dataclass
+class VideoInfo:
+    """Properties of a video from its container metadata."""
+    height: int
+    width: int
+    fps: float
+    # Number of frames claimed by the container. It is only a hint: it may be
+    # wrong, or 0 when the container does not record it.
+    frame_count: int
+
+    def duration(self) -> float:
+        """Estimated length of the video in seconds, or 0 if unknown."""
+        return self.frame_count / self.fps if self.fps > 0 else 0
+
+def keyframes(file) -> list[int] | None:
+    """Returns the indices of the keyframes of a video, or None if they cannot
+    be probed.
+
+    This lists the packets of the video stream with ffprobe, which is fast
+    since nothing is decoded. Packets are in decode order, so the indices are
+    exact for closed GOPs and may be a few frames early for open GOPs.
+    """
+    if shutil.which("ffprobe") is None:
+        return None
+    try:
+        output = subprocess.run(
+            ["ffprobe", "-v", "error", "-select_streams", "v:0", "-show_entries", "packet=flags", "-of", "csv=p=0", file],
+            capture_output=True, text=True, check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return [i for i, flags in enumerate(output.split()) if flags.startswith("K")]
+
+def probe(file) -> VideoInfo:
+    """Reads the metadata of a video without decoding any frames."""
     video = cv2.VideoCapture(file)
-    # The video metadata is typically quite close to the real value.
-    # Take the estimate, rewind a bit, and then count to obtain real value.
-    estimated_count = video.get(cv2.CAP_PROP_FRAME_COUNT)
-    count = estimated_count - REWIND_FRAME_COUNT
-    video.set(cv2.CAP_PROP_POS_FRAMES, count)
-    while video.read()[0]:
-        count += 1
+    info = VideoInfo(
+        height = int(video.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        width = int(video.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        fps = video.get(cv2.CAP_PROP_FPS),
+        frame_count = max(0, int(video.get(cv2.CAP_PROP_FRAME_COUNT))),
+    )
     video.release()
-    return int(count)
+    return info
+
+def subtitle_band_height(height: int) -> int:
+    """Height of the band returned by crop_subtitle() for a frame of `height`."""
+    return height - 13*height//16
+
+def crop_subtitle(image, height):
+    """Crops the fixed band at the bottom of the frame where subtitles usually
+    are. glyphs.roi can calibrate a tighter region from OCR results."""
+    return image[height - subtitle_band_height(height):height, :]
@@ -5,10 +5,15 @@ from datetime import timedelta
 from glyphs.timestamp import timestamp
 
 class Video:
+    """Iterates over the frames [start_idx, stop_idx) of a video file.
+
+    `stop_idx` is only a hint: iteration also stops cleanly at the end of the
+    file, and a `stop_idx` of None reads until then.
+    """
     __frame_number: int = 0
-    __stop_index: int = 0
+    __stop_index: int | None = None
 
-    def __init__(self, file_path: str, start_idx: int, stop_idx: int):
+    def __init__(self, file_path: str, start_idx: int, stop_idx: int | None = None):
         v = cv2.VideoCapture(file_path)
         self.__video = v
         self.__frame_number = start_idx
@@ -22,13 +27,30 @@ class Video:
         return self
 
     def __next__(self):
-        if self.__frame_number >= self.__stop_index:
+        if self.__stop_index is not None and self.__frame_number >= self.__stop_index:
             raise StopIteration
         success, frame = self.__video.read()
-        assert success  # If this fails, our __stop_index is invalid
+        if not success:  # End of the file
+            self.__stop_index = self.__frame_number
+            raise StopIteration
         self.__frame_number += 1
         return frame
 
+    def skip(self, count: int):
+        """Advances up to `count` frames without returning them."""
+        for _ in range(count):
+            if self.__stop_index is not None and self.__frame_number >= self.__stop_index:
+                return
+            if not self.__video.grab():
+                self.__stop_index = self.__frame_number
+                return
+            self.__frame_number += 1
+
+    def seek(self, frame_number: int):
+        """Moves to `frame_number`, which is the next frame returned by the iterator."""
+        self.__video.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+        self.__frame_number = frame_number
+
     # TODO: Convert this to a timestamp and propogate it through the system
     def time(self) -> timestamp:
         ms = self.__video.get(cv2.CAP_PROP_POS_MSEC)
@@ -37,5 +59,11 @@ class Video:
     def frame_number(self) -> int:
         return self.__frame_number
 
+    def fps(self) -> float:
+        return self.__video.get(cv2.CAP_PROP_FPS)
+
     def frame_height(self) -> int:
         return int(self.__video.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    def frame_width(self) -> int:
+        return int(self.__video.get(cv2.CAP_PROP_FRAME_WIDTH))